@@ -1,25 +1,26 @@
 from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
 
-from app.core.sse import sse_stream
+from app.core.sse import asse_stream
 from app.schemas.llm import ChatRequest, ChatResponse
-from app.core.container import get_llm_service
+from app.core.container import get_llm_service, get_response_cache_stats
 from app.services.llm_service import LLMService
 
 router = APIRouter(prefix="/llm")
 
 
 @router.post("/chat", response_model=ChatResponse)
-def chat(
+async def chat(
     req: ChatRequest,
     svc: LLMService = Depends(get_llm_service),
 ) -> ChatResponse:
-    reply, used_tag, used_version = svc.chat(
+    reply, used_tag, used_version = await svc.achat(
         prompt=req.prompt,
         tag=req.tag,
         version=req.version,
         system=req.system,
         vars=req.vars,
+        cache=req.cache,
     )
 
     return ChatResponse(
@@ -31,24 +32,31 @@ def chat(
 
 
 @router.post("/chat/stream")
-def chat_stream(
+async def chat_stream(
     req: ChatRequest,
     svc: LLMService = Depends(get_llm_service),
 ):
-    tokens, used_tag, used_version = svc.stream_tokens(
+    tokens, used_tag, used_version = await svc.astream_tokens(
         prompt=req.prompt,
         tag=req.tag,
         version=req.version,
         system=req.system,
         vars=req.vars,
+        cache=req.cache,
     )
 
     return StreamingResponse(
-        sse_stream(tokens),
+        asse_stream(tokens),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no",
         },
-    )
\ No newline at end of file
+    )
+
+
+@router.get("/cache/stats")
+def cache_stats() -> dict:
+    # exact / semantic 응답 캐시 hit 수, hit rate, 크기 + single-flight 로 합쳐진 요청 수 (꺼져 있으면 null)
+    return get_response_cache_stats()
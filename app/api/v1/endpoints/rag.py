@@ -1,23 +1,101 @@
 from __future__ import annotations
 
+import json
+from typing import AsyncIterator, Optional, Union
+
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 
-from app.schemas.rag import RagIngestRequest, RagIngestResponse, RagSearchRequest, RagSearchResponse, RagMatch
-from app.services.ingestion_service import IngestionService
+from app.core.config import settings
+from app.core.exceptions import BadRequest
+from app.core.sse import asse_stream, sse_event
+from app.rag.types import Diversity, RetrieveQuery, RetrieveResult, ScoredChunk
+from app.schemas.rag import (
+    RagBatchSearchRequest,
+    RagBatchSearchResponse,
+    RagChatRequest,
+    RagChatResponse,
+    RagContextUsage,
+    RagIngestRequest,
+    RagIngestJobResponse,
+    RagMatch,
+    RagSearchRequest,
+    RagSearchResponse,
+)
+from app.services.ingest_job_service import IngestJob, IngestJobService
+from app.services.rag_chat_service import RagChatPlan, RagChatService
 from app.services.rag_service import RagService
-from app.core.container import get_ingestion_service, get_rag_service
+from app.core.container import get_ingest_job_service, get_rag_chat_service, get_rag_service
 
 
 router = APIRouter(prefix="/rag")
 
 
-@router.post("/ingest", response_model=RagIngestResponse)
+def _diversity(req: Union[RagSearchRequest, RagChatRequest]) -> Optional[Diversity]:
+    if req.mode == "similarity" and req.max_per_doc is None and req.dedup_threshold is None:
+        return None
+    return Diversity(
+        mode=req.mode,
+        fetch_k=req.fetch_k,
+        lambda_mult=req.lambda_mult,
+        max_per_doc=req.max_per_doc,
+        dedup_threshold=req.dedup_threshold,
+    )
+
+
+def _job_response(job: IngestJob) -> RagIngestJobResponse:
+    return RagIngestJobResponse(
+        job_id=job.id,
+        status=job.status,
+        source=job.source,
+        total_documents=job.total_documents,
+        documents_done=job.documents_done,
+        skipped=job.skipped,
+        chunk_count=job.chunk_count,
+        added=job.added,
+        removed=job.removed,
+        unchanged=job.unchanged,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        queue_ms=job.queue_ms,
+        run_ms=job.run_ms,
+    )
+
+
+@router.post("/ingest", response_model=RagIngestJobResponse, status_code=202)
 def ingest(
     req: RagIngestRequest,
-    svc: IngestionService = Depends(get_ingestion_service),
+    svc: IngestJobService = Depends(get_ingest_job_service),
+):
+    if req.text is None:
+        job = svc.submit_path(req.source)
+    else:
+        job = svc.submit_text(source_id=req.source, text=req.text, metadata=req.metadata)
+    return _job_response(job)
+
+
+@router.get("/ingest/{job_id}", response_model=RagIngestJobResponse)
+def ingest_status(
+    job_id: str,
+    svc: IngestJobService = Depends(get_ingest_job_service),
 ):
-    r = svc.ingest(source=req.source)
-    return RagIngestResponse(document_id=r.document_id, chunk_count=r.chunk_count)
+    return _job_response(svc.get(job_id))
+
+
+def _match(m: ScoredChunk) -> RagMatch:
+    return RagMatch(
+        chunk_id=m.chunk.id,
+        document_id=m.chunk.doc_id,
+        score=m.score,
+        text=m.chunk.text,
+        metadata=dict(m.chunk.metadata),
+    )
+
+
+def _search_response(r: RetrieveResult) -> RagSearchResponse:
+    return RagSearchResponse(query=r.query, matches=[_match(m) for m in r.matches])
 
 
 @router.post("/search", response_model=RagSearchResponse)
@@ -25,17 +103,101 @@ def search(
     req: RagSearchRequest,
     svc: RagService = Depends(get_rag_service),
 ):
-    r = svc.search(query=req.query, top_k=req.top_k, filters=req.filters, score_threshold=req.score_threshold)
-    return RagSearchResponse(
-        query=r.query,
-        matches=[
-            RagMatch(
-                chunk_id=m.chunk.id,
-                document_id=m.chunk.document_id,
-                score=m.score,
-                text=m.chunk.text,
-                metadata=m.chunk.metadata,
-            )
-            for m in r.matches
-        ],
-    )
\ No newline at end of file
+    r = svc.search(
+        query=req.query,
+        top_k=req.top_k,
+        filters=req.filters,
+        score_threshold=req.score_threshold,
+        diversity=_diversity(req),
+    )
+    return _search_response(r)
+
+
+@router.post("/search/batch", response_model=RagBatchSearchResponse)
+def search_batch(
+    req: RagBatchSearchRequest,
+    svc: RagService = Depends(get_rag_service),
+):
+    if len(req.queries) > settings.RAG_SEARCH_BATCH_MAX:
+        raise BadRequest(
+            message="Too many queries in one batch",
+            details={"max": settings.RAG_SEARCH_BATCH_MAX, "got": len(req.queries)},
+        )
+    results = svc.search_batch([
+        RetrieveQuery(query=q.query, top_k=q.top_k, filters=q.filters, score_threshold=q.score_threshold)
+        for q in req.queries
+    ])
+    return RagBatchSearchResponse(results=[_search_response(r) for r in results])
+
+
+def _chat_kwargs(req: RagChatRequest) -> dict:
+    return dict(
+        tag=req.tag,
+        version=req.version,
+        system=req.system,
+        vars=req.vars,
+        query=req.query,
+        top_k=req.top_k or settings.RAG_CHAT_TOP_K,
+        filters=req.filters,
+        score_threshold=req.score_threshold,
+        diversity=_diversity(req),
+        max_context_tokens=req.max_context_tokens,
+        cache=req.cache,
+    )
+
+
+def _context_usage(plan: RagChatPlan) -> RagContextUsage:
+    c = plan.context
+    return RagContextUsage(
+        tokens=c.tokens,
+        budget=c.budget,
+        prompt_tokens=plan.prompt_tokens,
+        chunks=len(c.chunks),
+        truncated=c.truncated,
+        duplicates=c.duplicates,
+        dropped=c.dropped,
+    )
+
+
+@router.post("/chat", response_model=RagChatResponse)
+async def chat(
+    req: RagChatRequest,
+    svc: RagChatService = Depends(get_rag_chat_service),
+):
+    r = await svc.achat(req.prompt, **_chat_kwargs(req))
+    return RagChatResponse(
+        reply=r.reply,
+        provider=svc.provider_name(),
+        tag=r.plan.prepared.tag,
+        version=r.plan.prepared.version,
+        context=_context_usage(r.plan),
+        sources=[_match(m) for m in r.plan.context.chunks],
+    )
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    req: RagChatRequest,
+    svc: RagChatService = Depends(get_rag_chat_service),
+):
+    tokens, plan = await svc.astream(req.prompt, **_chat_kwargs(req))
+
+    async def events() -> AsyncIterator[str]:
+        # 토큰 전에 어떤 컨텍스트를 썼는지 먼저 보냄 (본문 제외)
+        meta = {
+            "context": _context_usage(plan).model_dump(),
+            "sources": [{"chunk_id": m.chunk.id, "document_id": m.chunk.doc_id, "score": m.score} for m in plan.context.chunks],
+        }
+        yield sse_event(json.dumps(meta, ensure_ascii=False), event="context")
+        async for event in asse_stream(tokens):
+            yield event
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
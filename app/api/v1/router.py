@@ -1,7 +1,8 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import health, llm, prompts
+from app.api.v1.endpoints import health, llm, prompts, rag
 
 router = APIRouter()
 router.include_router(health.router, tags=["health"])
 router.include_router(llm.router, tags=["llm"])
-router.include_router(prompts.router, tags=["prompts"])
\ No newline at end of file
+router.include_router(prompts.router, tags=["prompts"])
+router.include_router(rag.router, tags=["rag"])
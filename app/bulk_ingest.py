@@ -0,0 +1,51 @@
+"""
+대량 backfill CLI (BulkIngestionService: 청킹/임베딩은 프로세스 풀, 쓰기는 배치)
+
+    python -m app.bulk_ingest PATH [PATH ...]
+
+PATH 는 디렉터리 / .jsonl / 일반 파일. 큰 파일은 스트리밍 ingest
+RAG_LOADER_STATE_PATH 가 있으면 변경 없는 파일은 건너뛰고, 끝나면 상태를 저장
+API 와 같은 인덱스에 쓰려면 ingest_worker 와 같은 스토어 설정(mmap / 스냅샷)으로 실행
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import sys
+
+from app.core.container import close_vectorstore, get_bulk_ingestion_service, get_bulk_loader, save_file_state
+from app.services.bulk_ingestion_service import BulkIngestStats
+
+
+def _progress(stats: BulkIngestStats) -> None:
+    print(
+        f"\rdocs={stats.documents} chunks={stats.chunks} added={stats.added} removed={stats.removed} "
+        f"({stats.docs_per_s:.1f} docs/s)",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.bulk_ingest")
+    parser.add_argument("paths", nargs="+", help="directory / .jsonl / file")
+    args = parser.parse_args()
+
+    loaders = [(path, get_bulk_loader(path)) for path in args.paths]
+    documents = itertools.chain.from_iterable(loader.iter_documents(source=path) for path, loader in loaders)
+    try:
+        stats = get_bulk_ingestion_service().ingest(documents, on_progress=_progress)
+        save_file_state()
+    finally:
+        close_vectorstore()
+    print(file=sys.stderr)
+    skipped = sum(loader.skipped for _, loader in loaders)
+    print(
+        f"documents={stats.documents} skipped={skipped} chunks={stats.chunks} added={stats.added} "
+        f"removed={stats.removed} unchanged={stats.unchanged} elapsed={stats.elapsed_s:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
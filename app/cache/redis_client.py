@@ -4,16 +4,33 @@ from typing import Optional
 from app.core.config import settings
 
 _redis: Optional[redis.Redis] = None
+_redis_bytes: Optional[redis.Redis] = None
 
 
 def get_redis() -> redis.Redis:
     global _redis
     if _redis is None:
         _redis = redis.Redis.from_url(
-            settings.REDIS_DSN,
+            settings.REDIS_URL,
             decode_responses=True,
             socket_connect_timeout=2,
             socket_timeout=2,
             health_check_interval=30,
         )
-    return _redis
\ No newline at end of file
+    return _redis
+
+
+def get_redis_bytes() -> redis.Redis:
+    """
+    바이너리 payload (float32 벡터 등) 용 클라이언트: decode_responses=False
+    """
+    global _redis_bytes
+    if _redis_bytes is None:
+        _redis_bytes = redis.Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=False,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+            health_check_interval=30,
+        )
+    return _redis_bytes
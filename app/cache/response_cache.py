@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional
+
+import redis
+
+from app.providers.llm_provider import COMPLETION_CONFIG_KEYS, Message
+
+
+def response_key(
+    *,
+    provider: str,
+    model: str,
+    messages: List[Message],
+    llm_config: Optional[Mapping[str, Any]] = None,
+) -> str:
+    """
+    (provider, model, 최종 메시지, 응답에 영향을 주는 llm_config 키) 의 안정적인 해시
+    - dict 순서와 무관하게 같은 key (sort_keys)
+    - cache / max_context_tokens 처럼 응답 자체와 무관한 설정은 제외
+    """
+    cfg = llm_config or {}
+    payload = {
+        "provider": provider,
+        "model": cfg.get("model") or model,
+        "messages": [[m["role"], m["content"]] for m in messages],
+        "config": {k: cfg[k] for k in COMPLETION_CONFIG_KEYS if cfg.get(k) is not None},
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=20).hexdigest()
+
+
+class ResponseCache:
+    """
+    LLM 응답 exact-match 캐시
+    key = {prefix}:{response_key}
+    - 1차: 프로세스 내 LRU (max_entries 개)
+    - 2차(옵션): Redis (TTL). 워커/재시작 간 공유
+    - Redis 장애는 miss 로 취급 (응답 경로를 막지 않음)
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1000,
+        redis_client: Optional[redis.Redis] = None,
+        ttl_seconds: int = 3600,
+        prefix: str = "llm:resp",
+    ):
+        self._max_entries = max_entries
+        self._redis = redis_client
+        self._ttl = ttl_seconds
+        self._prefix = prefix
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.redis_errors = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "redis_errors": self.redis_errors,
+            "size": len(self._lru),
+        }
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self._prefix}:{key}"
+
+    def _lru_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            reply = self._lru.get(key)
+            if reply is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+            return reply
+
+    def _remember(self, key: str, reply: str) -> None:
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            self._lru[key] = reply
+            self._lru.move_to_end(key)
+            while len(self._lru) > self._max_entries:
+                self._lru.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        reply = self._lru_get(key)
+        if reply is not None:
+            return reply
+        reply = self._redis_get(key)
+        if reply is None:
+            self.misses += 1
+            return None
+        self.redis_hits += 1
+        self._remember(key, reply)
+        return reply
+
+    def set(self, key: str, reply: str) -> None:
+        self._remember(key, reply)
+        self._redis_set(key, reply)
+
+    async def aget(self, key: str) -> Optional[str]:
+        reply = self._lru_get(key)
+        if reply is not None:
+            return reply
+        if self._redis is None:
+            self.misses += 1
+            return None
+        # Redis 조회는 blocking 클라이언트라 이벤트 루프 밖에서
+        reply = await asyncio.to_thread(self._redis_get, key)
+        if reply is None:
+            self.misses += 1
+            return None
+        self.redis_hits += 1
+        self._remember(key, reply)
+        return reply
+
+    async def aset(self, key: str, reply: str) -> None:
+        self._remember(key, reply)
+        if self._redis is not None:
+            await asyncio.to_thread(self._redis_set, key, reply)
+
+    def _redis_get(self, key: str) -> Optional[str]:
+        if self._redis is None:
+            return None
+        try:
+            raw = self._redis.get(self._redis_key(key))
+        except redis.RedisError:
+            self.redis_errors += 1
+            return None
+        if raw is None:
+            return None
+        return raw.decode("utf-8") if isinstance(raw, bytes) else raw
+
+    def _redis_set(self, key: str, reply: str) -> None:
+        if self._redis is None:
+            return
+        try:
+            self._redis.setex(self._redis_key(key), self._ttl, reply)
+        except redis.RedisError:
+            self.redis_errors += 1
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.rag.embedders.base import Embedder
+from app.rag.embedders.caching_embedder import normalize_text
+from app.rag.types import Chunk
+from app.rag.vectorstores.base import VectorStore
+from app.rag.vectorstores.memory_vectorstore import MemoryVectorStore
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry:
+    reply: str
+    created_at: float
+
+
+class SemanticCache:
+    """
+    LLM 응답 semantic 캐시 (표현만 다른 같은 질문)
+    - 마지막 user 메시지를 Embedder 로 임베딩해서 전용 벡터 스토어(기본 MemoryVectorStore, cosine)에 저장
+    - 조회는 filters 로 같은 (tag, version, context) 안에서만 top-1 검색 -> 유사도 >= threshold 면 저장된 응답
+      context = 마지막 메시지를 뺀 나머지(시스템/few-shot) + provider/model/llm_config 의 해시
+    - 응답 본문은 스토어 metadata 가 아니라 별도 dict 에 (metadata 색인에 긴 문자열이 들어가지 않게)
+    - 오래된 순으로 max_entries 개까지, ttl_seconds 지난 항목은 조회 시/저장 시 제거
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        *,
+        store: Optional[VectorStore] = None,
+        threshold: float = 0.95,
+        max_entries: int = 10000,
+        ttl_seconds: float = 86400,
+    ):
+        self._embedder = embedder
+        self._store = store if store is not None else MemoryVectorStore(dim=embedder.dim, metric="cosine")
+        self._threshold = threshold
+        self._max_entries = max(1, max_entries)
+        self._ttl = ttl_seconds
+        # 삽입 순 = 오래된 순 (age / size eviction 둘 다 앞에서부터)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "size": len(self._entries),
+        }
+
+    @staticmethod
+    def _scope(tag: Optional[str], version: Optional[int], context: str) -> Dict[str, Any]:
+        # None 은 metadata 색인/필터에서 다루기 애매해서 빈 값으로
+        return {"tag": tag or "", "version": version or 0, "context": context}
+
+    def lookup(self, text: str, *, tag: Optional[str], version: Optional[int], context: str) -> Optional[str]:
+        vector = self._embedder.embed_query(normalize_text(text))
+        with self._lock:
+            self._expire(time.monotonic())
+            matches = self._store.similarity_search(
+                query_vector=vector,
+                top_k=1,
+                filters=self._scope(tag, version, context),
+                score_threshold=self._threshold,
+            )
+            entry = self._entries.get(matches[0].chunk.id) if matches else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry.reply
+
+    def add(self, text: str, reply: str, *, tag: Optional[str], version: Optional[int], context: str) -> None:
+        text = normalize_text(text)
+        scope = self._scope(tag, version, context)
+        entry_id = hashlib.blake2b(f"{context}\x00{tag}\x00{version}\x00{text}".encode("utf-8"), digest_size=16).hexdigest()
+        vector = self._embedder.embed_query(text)
+        chunk = Chunk(id=entry_id, doc_id=entry_id, text=text, metadata=scope)
+        with self._lock:
+            self._store.upsert(source_id=entry_id, chunks=[chunk], vectors=[vector])
+            self._entries.pop(entry_id, None)
+            self._entries[entry_id] = _Entry(reply=reply, created_at=time.monotonic())
+            self.stores += 1
+            while len(self._entries) > self._max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _expire(self, now: float) -> None:
+        if self._ttl <= 0:
+            return
+        while self._entries:
+            entry_id, entry = next(iter(self._entries.items()))
+            if now - entry.created_at < self._ttl:
+                break
+            self._drop(entry_id)
+            self.expired += 1
+
+    def _drop(self, entry_id: str) -> None:
+        self._entries.pop(entry_id, None)
+        self._store.delete(source_id=entry_id)
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _StreamBuffer:
+    """
+    진행 중인 스트림 하나의 토큰 버퍼. 구독자는 0 번째부터 읽고, 끝나면 done (+ error)
+    """
+
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.cancelled = False
+        # sync 는 Condition, async 는 토큰마다 교체되는 Event 로 깨움
+        self.cond = threading.Condition()
+        self.changed: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        if self.changed is not None:
+            ev, self.changed = self.changed, asyncio.Event()
+            ev.set()
+
+
+class SingleFlight:
+    """
+    같은 key 로 진행 중인 upstream 호출을 하나로 합침 (프로세스 단위, 요청별 LLMService 가 공유)
+    - do / ado: 처음 온 요청만 fn 을 실행하고, 끝나기 전에 온 요청은 같은 결과(또는 같은 예외)를 받음
+    - stream / astream: upstream 스트림은 별도 pump(스레드 / task)가 버퍼에 쌓고,
+      구독자는 버퍼의 처음부터 읽은 뒤 live tail 을 따라감 (늦게 온 요청도 전체 응답을 받음)
+      구독자가 모두 끊기면 pump 를 멈추고 upstream 스트림을 닫음
+    - 호출이 끝나면 key 를 지움 (결과 재사용은 응답 캐시 몫)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._streams: Dict[str, _StreamBuffer] = {}
+        self._astreams: Dict[str, _StreamBuffer] = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls) + len(self._tasks) + len(self._streams) + len(self._astreams),
+        }
+
+    # -- sync --
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stream(self, key: str, fn: Callable[[], Iterator[str]]) -> Iterator[str]:
+        with self._lock:
+            buf = self._streams.get(key)
+            if buf is None:
+                buf = self._streams[key] = _StreamBuffer()
+                self.leaders += 1
+                threading.Thread(target=self._pump, args=(key, buf, fn), name="llm-single-flight", daemon=True).start()
+            else:
+                self.coalesced += 1
+            with buf.cond:
+                buf.subscribers += 1
+        return self._follow(key, buf)
+
+    def _pump(self, key: str, buf: _StreamBuffer, fn: Callable[[], Iterator[str]]) -> None:
+        tokens: Optional[Iterator[str]] = None
+        try:
+            tokens = fn()
+            for t in tokens:
+                with buf.cond:
+                    buf.tokens.append(t)
+                    buf.cond.notify_all()
+                    if buf.cancelled:
+                        break
+        except Exception as e:
+            buf.error = e
+        finally:
+            close = getattr(tokens, "close", None)
+            if buf.cancelled and close is not None:
+                close()
+            with self._lock:
+                if self._streams.get(key) is buf:
+                    del self._streams[key]
+            with buf.cond:
+                buf.done = True
+                buf.cond.notify_all()
+
+    def _follow(self, key: str, buf: _StreamBuffer) -> Iterator[str]:
+        i = 0
+        try:
+            while True:
+                with buf.cond:
+                    while i >= len(buf.tokens) and not buf.done:
+                        buf.cond.wait()
+                    new = buf.tokens[i:]
+                    done = buf.done
+                for t in new:
+                    yield t
+                i += len(new)
+                if done:
+                    if buf.error is not None:
+                        raise buf.error
+                    return
+        finally:
+            self._unsubscribe(key, buf, self._streams)
+
+    def _unsubscribe(self, key: str, buf: _StreamBuffer, table: Dict[str, _StreamBuffer]) -> None:
+        with self._lock:
+            with buf.cond:
+                buf.subscribers -= 1
+                if buf.subscribers > 0 or buf.done:
+                    return
+                # 아무도 안 듣는 스트림은 중단. 새로 오는 요청은 새 호출로
+                buf.cancelled = True
+            if table.get(key) is buf:
+                del table[key]
+        if buf.task is not None:
+            buf.task.cancel()
+
+    # -- async (이벤트 루프 안에서만 호출) --
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._task_done(key, t))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        # 한 요청이 취소돼도 (클라이언트 끊김) 다른 대기자를 위해 호출은 계속
+        return await asyncio.shield(task)
+
+    def _task_done(self, key: str, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # 대기자가 모두 취소된 경우 "never retrieved" 경고 방지
+
+    def astream(self, key: str, fn: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        buf = self._astreams.get(key)
+        if buf is None:
+            buf = self._astreams[key] = _StreamBuffer()
+            buf.changed = asyncio.Event()
+            buf.task = asyncio.ensure_future(self._apump(key, buf, fn))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        buf.subscribers += 1
+        return self._afollow(key, buf)
+
+    async def _apump(self, key: str, buf: _StreamBuffer, fn: Callable[[], AsyncIterator[str]]) -> None:
+        try:
+            async for t in fn():
+                buf.tokens.append(t)
+                buf.notify()
+        except Exception as e:
+            buf.error = e
+        finally:
+            if self._astreams.get(key) is buf:
+                del self._astreams[key]
+            buf.done = True
+            buf.notify()
+
+    async def _afollow(self, key: str, buf: _StreamBuffer) -> AsyncIterator[str]:
+        i = 0
+        try:
+            while True:
+                while i < len(buf.tokens):
+                    yield buf.tokens[i]
+                    i += 1
+                if buf.done:
+                    if buf.error is not None:
+                        raise buf.error
+                    return
+                await buf.changed.wait()
+        finally:
+            self._unsubscribe(key, buf, self._astreams)
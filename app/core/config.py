@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -13,6 +15,92 @@ class Settings(BaseSettings):
 
     GROQ_API_KEY: str
     GROQ_MODEL: str = "llama-3.1-8b-instant"
+    GROQ_BASE_URL: Optional[str] = None  # 없으면 SDK 기본값 (로컬 stub 서버 테스트용)
+    GROQ_MAX_RETRIES: int = 2
+
+    # provider HTTP 연결 풀 (프로세스당 provider 하나씩 공유)
+    LLM_PROVIDER: str = "groq"
+    LLM_HTTP_MAX_CONNECTIONS: int = 1000  # 동시 upstream 요청 상한 (HTTP/1.1 은 스트림 하나가 연결 하나)
+    LLM_HTTP_MAX_KEEPALIVE: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_HTTP2: bool = True  # h2 패키지가 설치된 경우에만
+    LLM_HTTP_TIMEOUT: float = 60.0
+
+    # LLM 응답 캐시 (exact-match / semantic). llm_config.temperature == 0 인 요청만 대상
+    # 요청의 cache=false 나 llm_config.cache=false 로 끔
+    LLM_RESPONSE_CACHE_ENABLED: bool = True
+    LLM_RESPONSE_CACHE_SIZE: int = 1000  # 프로세스 내 LRU. 0 이면 Redis 만
+    LLM_RESPONSE_CACHE_REDIS: bool = False
+    LLM_RESPONSE_CACHE_TTL_SECONDS: int = 3600
+
+    # semantic 캐시: 마지막 user 메시지 임베딩이 이 값 이상 (cosine) 비슷하면 이전 응답 재사용
+    LLM_SEMANTIC_CACHE_ENABLED: bool = False
+    LLM_SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    LLM_SEMANTIC_CACHE_SIZE: int = 10000
+    LLM_SEMANTIC_CACHE_TTL_SECONDS: int = 86400  # 0 이면 나이로는 제거하지 않음
+
+    # 같은 요청이 동시에 여러 개면 upstream 호출 하나로 합침 (cache=false 요청은 제외)
+    LLM_SINGLE_FLIGHT: bool = True
+
+    EMBEDDER: str = "hashing"  # hashing | dummy
+    EMBEDDING_DIM: int = 256
+    EMBEDDING_CACHE_SIZE: int = 10000  # 0 이면 캐시 끔
+    EMBEDDING_CACHE_REDIS: bool = False
+    EMBEDDING_CACHE_TTL_SECONDS: int = 86400
+    EMBEDDING_BATCH_MAX: int = 64
+    EMBEDDING_BATCH_WAIT_MS: float = 2.0  # 0 이면 micro-batching 끔
+
+    RAG_VECTORSTORE: str = "memory"  # memory | hnsw | ivfpq | mmap
+    RAG_METRIC: str = "cosine"  # cosine | dot | l2
+    HNSW_M: int = 16
+    HNSW_EF_CONSTRUCTION: int = 200
+    HNSW_EF_SEARCH: int = 64
+    IVFPQ_NLIST: int = 256
+    IVFPQ_M: int = 8
+    IVFPQ_NPROBE: int = 8
+    IVFPQ_RERANK: bool = False
+    RAG_STORE_PATH: str = "./vector_data"
+    RAG_STORE_READONLY: bool = False
+    RAG_STORE_REFRESH_SECONDS: float = 1.0
+    RAG_STORE_COMPACT_WAL_BYTES: int = 64 * 1024 * 1024
+    RAG_SHARDS: int = 1  # >1 이면 source_id 해시로 나눈 shard 들을 병렬 검색 (mmap 은 RAG_STORE_PATH/shard-{i})
+    # memory/hnsw/ivfpq 스토어를 워커 간에 스냅샷으로 복제 (mmap 은 자체 WAL 공유라 불필요)
+    # 스냅샷은 pickle 이라 로드 = 임의 코드 실행. 이 디렉터리는 서비스 계정만 쓸 수 있어야 함 (신뢰 경계)
+    RAG_SNAPSHOT_PATH: Optional[str] = None
+    RAG_SNAPSHOT_PUBLISH_SECONDS: float = 5.0  # 0 이면 쓰기마다 공개
+    RAG_SNAPSHOT_KEEP: int = 3
+
+    # vector | hybrid (BM25 + vector). hybrid 는 /v1/rag/search 점수가 fusion 점수(rrf 는 ~0.016 규모)로 바뀌고
+    # score_threshold 는 dense 쪽에만 적용됨. BM25 색인은 이 프로세스의 쓰기로만 채워짐 (mmap 재시작 직후엔 비어 있음)
+    RAG_RETRIEVER: str = "vector"
+    RAG_HYBRID_FUSION: str = "rrf"  # rrf | weighted
+    RAG_HYBRID_ALPHA: float = 0.5  # dense 쪽 가중치
+    RAG_SEARCH_BATCH_MAX: int = 256  # /rag/search/batch 한 번에 받는 쿼리 수
+
+    # /rag/chat 컨텍스트 budget (PromptDefinition.llm_config 에 max_context_tokens / max_tokens 가 없을 때)
+    LLM_CONTEXT_TOKENS: int = 8192
+    LLM_MAX_TOKENS: int = 1024
+    RAG_CHAT_TOP_K: int = 8
+    RAG_CONTEXT_MIN_CHUNK_TOKENS: int = 64  # 남은 budget 이 이보다 작으면 마지막 청크를 잘라 넣지 않음
+
+    # 스트리밍 청커 (ingest_stream)
+    RAG_CHUNK_SIZE: int = 1000
+    RAG_CHUNK_OVERLAP: int = 200
+    RAG_CHUNK_UNIT: str = "chars"  # chars | tokens
+
+    # python -m app.bulk_ingest PATH 로 실행하는 backfill 설정
+    BULK_INGEST_WORKERS: int = 4  # 0 이면 프로세스 풀 없이 인라인
+    BULK_INGEST_DOCS_PER_TASK: int = 32
+    BULK_INGEST_UPSERT_BATCH: int = 4096
+
+    INGEST_QUEUE_BACKEND: str = "memory"  # memory | redis
+    INGEST_WORKERS: int = 1  # API 프로세스 안의 워커 스레드 수. 0 이면 python -m app.ingest_worker 로 따로 실행
+    INGEST_MAX_QUEUED: int = 1000
+    INGEST_JOB_TTL_SECONDS: int = 86400
+    INGEST_LEASE_SECONDS: int = 600  # redis: 이 시간 동안 진행 저장이 없으면 워커가 죽은 것으로 보고 작업을 다시 queue 로
+    RAG_LOADER_ROOT: Optional[str] = None  # 경로 ingest 허용 루트. 없으면 text ingest 만
+    RAG_LOADER_STATE_PATH: Optional[str] = None  # 파일 mtime/size/hash 기록 (저장형 스토어와 함께)
+    RAG_STREAM_INGEST_BYTES: int = 8 * 1024 * 1024  # 이 크기 이상인 파일은 본문을 올리지 않고 스트리밍 ingest
 
     class Config:
         env_file = ".env"
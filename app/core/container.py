@@ -1,28 +1,208 @@
-from typing import Iterator
+import os
+import threading
+from typing import Any, Dict, Iterator, Optional
 
+from fastapi import Depends
 from sqlalchemy.orm import Session
 
 from app.cache.prompt_cache import PromptCache
+from app.cache.redis_client import get_redis, get_redis_bytes
+from app.cache.response_cache import ResponseCache
+from app.cache.semantic_cache import SemanticCache
+from app.cache.single_flight import SingleFlight
 from app.core.config import settings
 from app.db.session import SessionLocal
 from app.providers.groq_provider import GroqProvider
+from app.providers.registry import HttpPoolConfig, ProviderRegistry
 from app.rag.chunkers.simple_chunker import SimpleChunker
+from app.rag.chunkers.streaming_chunker import StreamingChunker
+from app.rag.embedders.base import Embedder
+from app.rag.embedders.batching_embedder import BatchingEmbedder
+from app.rag.embedders.caching_embedder import CachingEmbedder
 from app.rag.embedders.dummy_embedder import DummyEmbedder
+from app.rag.embedders.hashing_embedder import HashingEmbedder
+from app.rag.loaders.base import DocumentLoader
+from app.rag.loaders.directory_loader import loader_for
+from app.rag.loaders.file_state import FileStateIndex
+from app.rag.retrievers.base import Retriever
+from app.rag.retrievers.bm25_index import BM25Index
+from app.rag.retrievers.hybrid_retriever import HybridRetriever
+from app.services.bulk_ingestion_service import BulkIngestionService
+from app.services.ingest_job_service import (
+    IngestJobQueue,
+    IngestJobService,
+    IngestWorkerPool,
+    InProcessJobQueue,
+    RedisJobQueue,
+)
 from app.services.ingestion_service import IngestionService
 from app.services.llm_service import LLMService
 from app.services.prompt_service import PromptService
+from app.services.rag_chat_service import RagChatService
+from app.services.rag_service import RagService
+from app.services.retrieval_service import RetrievalService
+from app.rag.vectorstores.base import VectorStore
+from app.rag.vectorstores.hnsw_vectorstore import HNSWVectorStore
+from app.rag.vectorstores.ivfpq_vectorstore import IVFPQVectorStore
+from app.rag.vectorstores.lexical_store import LexicalIndexedStore
 from app.rag.vectorstores.memory_vectorstore import MemoryVectorStore
+from app.rag.vectorstores.mmap_vectorstore import MmapVectorStore
+from app.rag.vectorstores.sharded_vectorstore import ShardedVectorStore
+from app.rag.vectorstores.snapshot_vectorstore import SnapshotVectorStore
 
 _cache = PromptCache()
 
-_memory_vs = MemoryVectorStore()
+_providers = ProviderRegistry(HttpPoolConfig(
+    max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+    keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+    http2=settings.LLM_HTTP2,
+    timeout=settings.LLM_HTTP_TIMEOUT,
+))
+_providers.register("groq", lambda http_client, async_http_client: GroqProvider(
+    api_key=settings.GROQ_API_KEY,
+    model=settings.GROQ_MODEL,
+    base_url=settings.GROQ_BASE_URL,
+    http_client=http_client,
+    async_http_client=async_http_client,
+    max_retries=settings.GROQ_MAX_RETRIES,
+))
+
+_response_cache: Optional[ResponseCache] = None
+if settings.LLM_RESPONSE_CACHE_ENABLED:
+    _response_cache = ResponseCache(
+        max_entries=settings.LLM_RESPONSE_CACHE_SIZE,
+        redis_client=get_redis() if settings.LLM_RESPONSE_CACHE_REDIS else None,
+        ttl_seconds=settings.LLM_RESPONSE_CACHE_TTL_SECONDS,
+    )
+
+_single_flight: Optional[SingleFlight] = SingleFlight() if settings.LLM_SINGLE_FLIGHT else None
+
+
+def _build_base_embedder() -> Embedder:
+    kind = settings.EMBEDDER
+    if kind == "hashing":
+        return HashingEmbedder(dim=settings.EMBEDDING_DIM)
+    if kind == "dummy":
+        return DummyEmbedder(dim=settings.EMBEDDING_DIM)
+    raise ValueError(f"unknown EMBEDDER: {kind!r}")
+
+
+def _build_embedder() -> Embedder:
+    embedder = _build_base_embedder()
+    # 캐시 miss 만 batcher 로 가도록 cache 가 바깥
+    if settings.EMBEDDING_BATCH_WAIT_MS > 0:
+        embedder = BatchingEmbedder(
+            embedder,
+            max_batch=settings.EMBEDDING_BATCH_MAX,
+            max_wait_ms=settings.EMBEDDING_BATCH_WAIT_MS,
+        )
+    if settings.EMBEDDING_CACHE_SIZE > 0 or settings.EMBEDDING_CACHE_REDIS:
+        embedder = CachingEmbedder(
+            embedder,
+            max_entries=settings.EMBEDDING_CACHE_SIZE,
+            redis_client=get_redis_bytes() if settings.EMBEDDING_CACHE_REDIS else None,
+            ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS,
+        )
+    return embedder
+
+
+def _build_vectorstore(shard: Optional[int] = None) -> VectorStore:
+    kind = settings.RAG_VECTORSTORE
+    if kind == "memory":
+        return MemoryVectorStore(metric=settings.RAG_METRIC)
+    if kind == "hnsw":
+        return HNSWVectorStore(
+            metric=settings.RAG_METRIC,
+            M=settings.HNSW_M,
+            ef_construction=settings.HNSW_EF_CONSTRUCTION,
+            ef_search=settings.HNSW_EF_SEARCH,
+        )
+    if kind == "ivfpq":
+        return IVFPQVectorStore(
+            metric=settings.RAG_METRIC,
+            nlist=settings.IVFPQ_NLIST,
+            m=settings.IVFPQ_M,
+            nprobe=settings.IVFPQ_NPROBE,
+            rerank=settings.IVFPQ_RERANK,
+        )
+    if kind == "mmap":
+        path = settings.RAG_STORE_PATH
+        if shard is not None:
+            path = os.path.join(path, f"shard-{shard}")
+        return MmapVectorStore(
+            path,
+            dim=settings.EMBEDDING_DIM,
+            metric=settings.RAG_METRIC,
+            readonly=settings.RAG_STORE_READONLY,
+            refresh_interval=settings.RAG_STORE_REFRESH_SECONDS,
+            compact_wal_bytes=settings.RAG_STORE_COMPACT_WAL_BYTES,
+        )
+    raise ValueError(f"unknown RAG_VECTORSTORE: {kind!r}")
+
+
+def _build_ingest_queue() -> IngestJobQueue:
+    kind = settings.INGEST_QUEUE_BACKEND
+    if kind == "memory":
+        return InProcessJobQueue(max_queued=settings.INGEST_MAX_QUEUED)
+    if kind == "redis":
+        return RedisJobQueue(
+            get_redis(),
+            ttl_seconds=settings.INGEST_JOB_TTL_SECONDS,
+            max_queued=settings.INGEST_MAX_QUEUED,
+            lease_seconds=settings.INGEST_LEASE_SECONDS,
+        )
+    raise ValueError(f"unknown INGEST_QUEUE_BACKEND: {kind!r}")
+
+
+_embedder = _build_embedder()
+if settings.RAG_SHARDS > 1:
+    _memory_vs: VectorStore = ShardedVectorStore(_build_vectorstore, n_shards=settings.RAG_SHARDS)
+else:
+    _memory_vs = _build_vectorstore()
+if settings.RAG_RETRIEVER == "hybrid":
+    # 스토어 쓰기가 BM25 색인에도 반영되도록 감쌈
+    _memory_vs = LexicalIndexedStore(_memory_vs, BM25Index())
+elif settings.RAG_RETRIEVER != "vector":
+    raise ValueError(f"unknown RAG_RETRIEVER: {settings.RAG_RETRIEVER!r}")
+if settings.RAG_SNAPSHOT_PATH:
+    if settings.RAG_VECTORSTORE == "mmap":
+        raise ValueError("RAG_SNAPSHOT_PATH is for in-memory stores; mmap already shares its WAL")
+    # BM25 색인까지 포함해서 통째로 스냅샷 -> 워커들이 같은 버전을 서비스
+    _memory_vs = SnapshotVectorStore(
+        _memory_vs,
+        settings.RAG_SNAPSHOT_PATH,
+        readonly=settings.RAG_STORE_READONLY,
+        refresh_interval=settings.RAG_STORE_REFRESH_SECONDS,
+        publish_interval=settings.RAG_SNAPSHOT_PUBLISH_SECONDS,
+        keep=settings.RAG_SNAPSHOT_KEEP,
+    )
+_ingest_queue = _build_ingest_queue()
+_file_state = FileStateIndex(settings.RAG_LOADER_STATE_PATH)
+_ingest_workers: Optional[IngestWorkerPool] = None
+_ingest_workers_lock = threading.Lock()
+
+# 과거 프롬프트 전용 인덱스 (문서 스토어와 별개, 같은 임베더)
+_semantic_cache: Optional[SemanticCache] = None
+if settings.LLM_SEMANTIC_CACHE_ENABLED:
+    _semantic_cache = SemanticCache(
+        _embedder,
+        threshold=settings.LLM_SEMANTIC_CACHE_THRESHOLD,
+        max_entries=settings.LLM_SEMANTIC_CACHE_SIZE,
+        ttl_seconds=settings.LLM_SEMANTIC_CACHE_TTL_SECONDS,
+    )
 
 def get_llm_service() -> Iterator[LLMService]:
     db = SessionLocal()
     try:
         prompt_service = PromptService(db=db, cache=_cache)
-        provider = GroqProvider(api_key=settings.GROQ_API_KEY, model=settings.GROQ_MODEL)
-        yield LLMService(provider=provider, prompt_service=prompt_service)
+        yield LLMService(
+            provider=_providers.get(settings.LLM_PROVIDER),
+            prompt_service=prompt_service,
+            response_cache=_response_cache,
+            semantic_cache=_semantic_cache,
+            single_flight=_single_flight,
+        )
     finally:
         db.close()
 
@@ -36,6 +216,98 @@ def get_prompt_service() -> Iterator[PromptService]:
 def get_ingestion_service() -> IngestionService:
     return IngestionService(
         chunker=SimpleChunker(),
-        embedder=DummyEmbedder(dim=8),
+        embedder=_embedder,
+        vectorstore=_memory_vs,
+        stream_chunker=StreamingChunker(
+            size=settings.RAG_CHUNK_SIZE,
+            overlap=settings.RAG_CHUNK_OVERLAP,
+            unit=settings.RAG_CHUNK_UNIT,
+        ),
+    )
+
+def get_ingest_worker_pool(workers: int) -> IngestWorkerPool:
+    return IngestWorkerPool(
+        _ingest_queue,
+        get_ingestion_service(),
+        workers=workers,
+        file_state=_file_state,
+        stream_bytes=settings.RAG_STREAM_INGEST_BYTES,
+    )
+
+def get_ingest_job_service() -> IngestJobService:
+    # 워커 스레드는 첫 요청 때 시작 (import 만으로 스레드를 띄우지 않음)
+    global _ingest_workers
+    if _ingest_workers is None and settings.INGEST_WORKERS > 0:
+        with _ingest_workers_lock:
+            if _ingest_workers is None:
+                _ingest_workers = get_ingest_worker_pool(settings.INGEST_WORKERS)
+                _ingest_workers.start()
+    return IngestJobService(_ingest_queue, loader_root=settings.RAG_LOADER_ROOT)
+
+def get_bulk_ingestion_service() -> BulkIngestionService:
+    # 워커 프로세스로 pickle 되므로 cache/batcher 래핑 없는 embedder 사용
+    return BulkIngestionService(
+        chunker=SimpleChunker(),
+        embedder=_build_base_embedder(),
         vectorstore=_memory_vs,
-    )
\ No newline at end of file
+        workers=settings.BULK_INGEST_WORKERS,
+        docs_per_task=settings.BULK_INGEST_DOCS_PER_TASK,
+        upsert_batch=settings.BULK_INGEST_UPSERT_BATCH,
+        stream_chunker=StreamingChunker(
+            size=settings.RAG_CHUNK_SIZE,
+            overlap=settings.RAG_CHUNK_OVERLAP,
+            unit=settings.RAG_CHUNK_UNIT,
+        ),
+    )
+
+def get_bulk_loader(path: str) -> DocumentLoader:
+    # API 경로 작업과 같은 file_state 를 써서 변경 없는 파일은 backfill 에서도 skip
+    return loader_for(path, state=_file_state, stream_bytes=settings.RAG_STREAM_INGEST_BYTES)
+
+def save_file_state() -> None:
+    _file_state.save()
+
+def _build_retriever() -> Retriever:
+    # 스냅샷 복제 중이면 요청 하나는 한 버전만 보도록 현재 스토어를 잡아서 사용
+    store = _memory_vs.current if isinstance(_memory_vs, SnapshotVectorStore) else _memory_vs
+    dense = RetrievalService(embedder=_embedder, store=store)
+    if not isinstance(store, LexicalIndexedStore):
+        return dense
+    return HybridRetriever(
+        dense=dense,
+        lexical=store.lexical,
+        embedder=_embedder,
+        fusion=settings.RAG_HYBRID_FUSION,
+        alpha=settings.RAG_HYBRID_ALPHA,
+    )
+
+def get_rag_service() -> RagService:
+    return RagService(retrieval=_build_retriever())
+
+def get_rag_chat_service(llm: LLMService = Depends(get_llm_service)) -> RagChatService:
+    return RagChatService(
+        llm,
+        get_rag_service(),
+        default_context_tokens=settings.LLM_CONTEXT_TOKENS,
+        default_max_tokens=settings.LLM_MAX_TOKENS,
+        min_chunk_tokens=settings.RAG_CONTEXT_MIN_CHUNK_TOKENS,
+    )
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    return {
+        "exact": _response_cache.stats() if _response_cache is not None else None,
+        "semantic": _semantic_cache.stats() if _semantic_cache is not None else None,
+        "single_flight": _single_flight.stats() if _single_flight is not None else None,
+    }
+
+def close_vectorstore() -> None:
+    # 스냅샷 복제 중이면 아직 공개 안 된 쓰기까지 공개 (프로세스 종료 전)
+    if isinstance(_memory_vs, SnapshotVectorStore):
+        _memory_vs.close()
+
+
+def close_providers() -> None:
+    _providers.close()
+
+async def aclose_providers() -> None:
+    await _providers.aclose()
@@ -29,4 +29,8 @@ class RateLimited(AppError):
 
 class Unauthorized(AppError):
     def __init__(self, message: str = "Unauthorized", details: Optional[dict[str, Any]] = None):
-        super().__init__(code="UNAUTHORIZED", message=message, status_code=401, details=details)
\ No newline at end of file
+        super().__init__(code="UNAUTHORIZED", message=message, status_code=401, details=details)
+
+class NotFound(AppError):
+    def __init__(self, message: str = "Not found", details: Optional[dict[str, Any]] = None):
+        super().__init__(code="NOT_FOUND", message=message, status_code=404, details=details)
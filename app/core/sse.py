@@ -1,66 +1,103 @@
 from __future__ import annotations
 import json
-from typing import Iterator, Optional
+import re
+from typing import AsyncIterator, Iterator, List, Optional
 from app.core.exceptions import AppError
 
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
 def sse_event(data: str, event: Optional[str] = None) -> str:
     lines = []
     if event:
         lines.append(f"event: {event}")
-    lines.append(f"data: {data}")
+    # 여러 줄이면 줄마다 data: (클라이언트가 "\n" 으로 다시 합침). \r 도 SSE 에선 줄 끝
+    lines.extend(f"data: {line}" for line in _LINE_BREAK.split(data))
     return "\n".join(lines) + "\n\n"
 
+def _error_event(e: Exception) -> str:
+    if isinstance(e, AppError):
+        payload = {"code": e.code, "message": e.message, "details": e.details or {}}
+    else:
+        payload = {
+            "code": "INTERNAL_ERROR",
+            "message": "Internal server error",
+            "details": {"type": e.__class__.__name__},
+        }
+    return sse_event(json.dumps(payload, ensure_ascii=False), event="error")
+
+class _TokenBuffer:
+    """
+    토큰을 모아서 flush_chars 이상이거나 줄바꿈이 오면 token 이벤트 하나로
+    """
+
+    def __init__(self, flush_chars: int, flush_on_newline: bool):
+        self._flush_chars = flush_chars
+        self._flush_on_newline = flush_on_newline
+        self._buf: List[str] = []
+        self._len = 0
+
+    def add(self, t: str) -> Optional[str]:
+        self._buf.append(t)
+        self._len += len(t)
+        if self._len >= self._flush_chars or (self._flush_on_newline and "\n" in t):
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[str]:
+        if not self._buf:
+            return None
+        chunk = "".join(self._buf)
+        self._buf.clear()
+        self._len = 0
+        return sse_event(chunk, event="token")
+
 def sse_stream(
     tokens: Iterator[str],
     *,
     flush_chars: int = 64,
     flush_on_newline: bool = True,
 ) -> Iterator[str]:
-    buf: list[str] = []
-    buf_len = 0
-
-    def flush() -> Optional[str]:
-        nonlocal buf_len
-        if not buf:
-            return None
-        chunk = "".join(buf)
-        buf.clear()
-        buf_len = 0
-        return sse_event(chunk, event="token")
-
+    buf = _TokenBuffer(flush_chars, flush_on_newline)
     try:
         for t in tokens:
             if not t:
                 continue
+            out = buf.add(t)
+            if out:
+                yield out
 
-            buf.append(t)
-            buf_len += len(t)
+        out = buf.flush()
+        if out:
+            yield out
+
+        yield sse_event("done", event="done")
 
-            if buf_len >= flush_chars or (flush_on_newline and "\n" in t):
-                out = flush()
-                if out:
-                    yield out
+    except Exception as e:
+        yield _error_event(e)
+
+async def asse_stream(
+    tokens: AsyncIterator[str],
+    *,
+    flush_chars: int = 64,
+    flush_on_newline: bool = True,
+) -> AsyncIterator[str]:
+    """
+    sse_stream 의 async 버전 (이벤트 루프에서 토큰을 기다리므로 스레드를 잡지 않음)
+    """
+    buf = _TokenBuffer(flush_chars, flush_on_newline)
+    try:
+        async for t in tokens:
+            if not t:
+                continue
+            out = buf.add(t)
+            if out:
+                yield out
 
-        out = flush()
+        out = buf.flush()
         if out:
             yield out
 
         yield sse_event("done", event="done")
 
-    except AppError as e:
-        payload = json.dumps(
-            {"code": e.code, "message": e.message, "details": e.details or {}},
-            ensure_ascii=False,
-        )
-        yield sse_event(payload, event="error")
-
     except Exception as e:
-        payload = json.dumps(
-            {
-                "code": "INTERNAL_ERROR",
-                "message": "Internal server error",
-                "details": {"type": e.__class__.__name__},
-            },
-            ensure_ascii=False,
-        )
-        yield sse_event(payload, event="error")
\ No newline at end of file
+        yield _error_event(e)
@@ -0,0 +1,32 @@
+"""
+API 프로세스와 분리된 ingest 워커 (INGEST_QUEUE_BACKEND=redis 에서 사용)
+
+    INGEST_WORKERS=0 uvicorn app.main:app ...   # API 는 enqueue 만
+    python -m app.ingest_worker                 # 별도 프로세스에서 처리
+
+API 와 워커가 같은 인덱스를 보려면 RAG_VECTORSTORE=mmap (WAL 공유) 이거나
+RAG_SNAPSHOT_PATH 를 같이 쓰고 API 쪽은 RAG_STORE_READONLY=true (스냅샷 복제)
+"""
+from __future__ import annotations
+
+import signal
+import threading
+
+from app.core.config import settings
+from app.core.container import close_vectorstore, get_ingest_worker_pool
+
+
+def main() -> None:
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    pool = get_ingest_worker_pool(max(1, settings.INGEST_WORKERS))
+    pool.start()
+    stop.wait()
+    pool.stop()
+    close_vectorstore()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,20 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from app.api.router import router as api_router
+from app.core.container import aclose_providers, close_vectorstore
 from app.core.error_handlers import install_exception_handlers
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    close_vectorstore()
+    await aclose_providers()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="llm-api")
+    app = FastAPI(title="llm-api", lifespan=lifespan)
     install_exception_handlers(app)
     app.include_router(api_router)
     return app
@@ -1,23 +1,49 @@
 from __future__ import annotations
 
-from typing import Iterator, Optional, List
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional
 
-from groq import Groq
+import httpx
+from groq import AsyncGroq, Groq
 from groq._exceptions import APIError, BadRequestError, RateLimitError, AuthenticationError
 
 from app.core.config import settings
 from app.core.exceptions import BadRequest, RateLimited, Unauthorized, UpstreamError
-from app.providers.llm_provider import LLMProvider, Message
+from app.providers.llm_provider import COMPLETION_CONFIG_KEYS, LLMProvider, Message
 
 
 class GroqProvider(LLMProvider):
-    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
-        self._client = Groq(api_key=api_key or settings.GROQ_API_KEY)
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        *,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.Client] = None,
+        async_http_client: Optional[httpx.AsyncClient] = None,
+        max_retries: int = 2,
+    ):
+        # http_client 를 넘기면 그 연결 풀을 공유 (ProviderRegistry). 없으면 SDK 기본 클라이언트
+        self._client = Groq(
+            api_key=api_key or settings.GROQ_API_KEY,
+            base_url=base_url or settings.GROQ_BASE_URL,
+            http_client=http_client,
+            max_retries=max_retries,
+        )
+        self._aclient = AsyncGroq(
+            api_key=api_key or settings.GROQ_API_KEY,
+            base_url=base_url or settings.GROQ_BASE_URL,
+            http_client=async_http_client,
+            max_retries=max_retries,
+        )
         self._model = model or settings.GROQ_MODEL
 
     def name(self) -> str:
         return "groq"
 
+    @property
+    def model_id(self) -> str:
+        return self._model
+
     def chat(self, prompt: str) -> str:
         try:
             resp = self._client.chat.completions.create(
@@ -54,26 +80,63 @@ class GroqProvider(LLMProvider):
         except APIError as e:
             raise UpstreamError(message="Upstream provider error", details={"upstream": "groq", "error": str(e)})
 
-    def chat_messages(self, messages: List[Message]) -> str:
+    def _completion_kwargs(self, llm_config: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+        cfg = llm_config or {}
+        kwargs: Dict[str, Any] = {"model": cfg.get("model") or self._model}
+        for key in COMPLETION_CONFIG_KEYS:
+            if cfg.get(key) is not None:
+                kwargs[key] = cfg[key]
+        return kwargs
+
+    def chat_messages(self, messages: List[Message], *, llm_config: Optional[Mapping[str, Any]] = None) -> str:
         try:
             resp = self._client.chat.completions.create(
-                model=self._model,
                 messages=messages,
+                **self._completion_kwargs(llm_config),
             )
             return resp.choices[0].message.content or ""
         except Exception as e:
             raise UpstreamError(details={"upstream": "groq", "type": e.__class__.__name__})
 
-    def stream_messages(self, messages: List[Message]) -> Iterator[str]:
+    def stream_messages(self, messages: List[Message], *, llm_config: Optional[Mapping[str, Any]] = None) -> Iterator[str]:
         try:
             stream = self._client.chat.completions.create(
-                model=self._model,
                 messages=messages,
                 stream=True,
+                **self._completion_kwargs(llm_config),
             )
             for chunk in stream:
                 delta = chunk.choices[0].delta
                 if delta and delta.content:
                     yield delta.content
         except Exception as e:
-            raise UpstreamError(details={"upstream": "groq", "type": e.__class__.__name__})
\ No newline at end of file
+            raise UpstreamError(details={"upstream": "groq", "type": e.__class__.__name__})
+
+    async def achat_messages(self, messages: List[Message], *, llm_config: Optional[Mapping[str, Any]] = None) -> str:
+        try:
+            resp = await self._aclient.chat.completions.create(
+                messages=messages,
+                **self._completion_kwargs(llm_config),
+            )
+            return resp.choices[0].message.content or ""
+        except Exception as e:
+            raise UpstreamError(details={"upstream": "groq", "type": e.__class__.__name__})
+
+    async def astream_messages(
+        self,
+        messages: List[Message],
+        *,
+        llm_config: Optional[Mapping[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        try:
+            stream = await self._aclient.chat.completions.create(
+                messages=messages,
+                stream=True,
+                **self._completion_kwargs(llm_config),
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta
+                if delta and delta.content:
+                    yield delta.content
+        except Exception as e:
+            raise UpstreamError(details={"upstream": "groq", "type": e.__class__.__name__})
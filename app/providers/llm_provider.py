@@ -1,6 +1,7 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Iterator, List, Literal, TypedDict
+import asyncio
+from typing import Any, AsyncIterator, Iterator, List, Literal, Mapping, Optional, TypedDict
 
 Role = Literal["system", "user", "assistant"]
 
@@ -8,11 +9,21 @@ class Message(TypedDict):
     role: Role
     content: str
 
+# PromptDefinition.llm_config 중 completion 요청으로 넘기는 키 (model 제외)
+COMPLETION_CONFIG_KEYS = ("temperature", "max_tokens", "top_p", "stop", "seed", "frequency_penalty", "presence_penalty")
+
 class LLMProvider(ABC):
     @abstractmethod
     def name(self) -> str:
         raise NotImplementedError
 
+    @property
+    def model_id(self) -> str:
+        """
+        기본 모델 이름 (llm_config.model 이 없을 때). 응답 캐시 key 에 사용
+        """
+        return ""
+
     @abstractmethod
     def chat(self, prompt: str) -> str:
         raise NotImplementedError
@@ -22,9 +33,32 @@ class LLMProvider(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def chat_messages(self, messages: List[Message]) -> str:
+    def chat_messages(self, messages: List[Message], *, llm_config: Optional[Mapping[str, Any]] = None) -> str:
         raise NotImplementedError
 
     @abstractmethod
-    def stream_messages(self, messages: List[Message]) -> Iterator[str]:
-        raise NotImplementedError
\ No newline at end of file
+    def stream_messages(self, messages: List[Message], *, llm_config: Optional[Mapping[str, Any]] = None) -> Iterator[str]:
+        raise NotImplementedError
+
+    async def achat_messages(self, messages: List[Message], *, llm_config: Optional[Mapping[str, Any]] = None) -> str:
+        """
+        기본 구현은 blocking chat_messages 를 스레드에서 실행. async 클라이언트가 있는 provider 는 override
+        """
+        return await asyncio.to_thread(self.chat_messages, messages, llm_config=llm_config)
+
+    async def astream_messages(
+        self,
+        messages: List[Message],
+        *,
+        llm_config: Optional[Mapping[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        기본 구현은 blocking stream_messages 를 토큰마다 스레드에서 next() (override 권장)
+        """
+        it = iter(self.stream_messages(messages, llm_config=llm_config))
+        done = object()
+        while True:
+            token = await asyncio.to_thread(next, it, done)
+            if token is done:
+                return
+            yield token
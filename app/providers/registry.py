@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.providers.llm_provider import LLMProvider
+
+
+@dataclass(frozen=True)
+class HttpPoolConfig:
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0  # 초. 이보다 오래 놀던 연결은 닫음
+    http2: bool = True  # h2 패키지가 없으면 HTTP/1.1 로
+    timeout: float = 60.0
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _limits(pool: HttpPoolConfig) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=pool.max_connections,
+        max_keepalive_connections=pool.max_keepalive_connections,
+        keepalive_expiry=pool.keepalive_expiry,
+    )
+
+
+def build_http_client(pool: HttpPoolConfig) -> httpx.Client:
+    return httpx.Client(limits=_limits(pool), http2=pool.http2 and http2_available(), timeout=pool.timeout)
+
+
+def build_async_http_client(pool: HttpPoolConfig) -> httpx.AsyncClient:
+    return httpx.AsyncClient(limits=_limits(pool), http2=pool.http2 and http2_available(), timeout=pool.timeout)
+
+
+def _close_async(client: httpx.AsyncClient) -> None:
+    # sync close() 용. 이벤트 루프 안이면 완료를 기다릴 수 없으니 aclose() 를 await 할 것
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(client.aclose())
+    else:
+        loop.create_task(client.aclose())
+
+
+# factory(sync 클라이언트, async 클라이언트) -> provider
+ProviderFactory = Callable[[httpx.Client, httpx.AsyncClient], LLMProvider]
+
+
+class ProviderRegistry:
+    """
+    프로세스당 provider 인스턴스를 이름별로 하나만 만들어 공유
+    - provider 마다 keep-alive 연결 풀(httpx.Client / AsyncClient)을 하나씩 갖고, 요청마다 TCP/TLS 연결을 새로 맺지 않음
+    - factory(http_client, async_http_client) 는 처음 get(name) 할 때 한 번만 호출
+    """
+
+    def __init__(self, pool: Optional[HttpPoolConfig] = None):
+        self._pool = pool or HttpPoolConfig()
+        self._factories: Dict[str, ProviderFactory] = {}
+        self._providers: Dict[str, LLMProvider] = {}
+        self._clients: Dict[str, Tuple[httpx.Client, httpx.AsyncClient]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self) -> HttpPoolConfig:
+        return self._pool
+
+    def register(self, name: str, factory: ProviderFactory) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            self._providers.pop(name, None)
+
+    def get(self, name: str) -> LLMProvider:
+        provider = self._providers.get(name)
+        if provider is not None:
+            return provider
+        with self._lock:
+            provider = self._providers.get(name)
+            if provider is None:
+                factory = self._factories.get(name)
+                if factory is None:
+                    raise ValueError(f"unknown LLM provider: {name!r}")
+                clients = (build_http_client(self._pool), build_async_http_client(self._pool))
+                provider = factory(*clients)
+                self._clients[name] = clients
+                self._providers[name] = provider
+            return provider
+
+    def _take_clients(self) -> List[Tuple[httpx.Client, httpx.AsyncClient]]:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._providers.clear()
+        return clients
+
+    def close(self) -> None:
+        """
+        이벤트 루프 밖(스크립트/워커 프로세스)에서 종료할 때
+        """
+        for client, aclient in self._take_clients():
+            client.close()
+            _close_async(aclient)
+
+    async def aclose(self) -> None:
+        """
+        이벤트 루프 안(FastAPI lifespan)에서 종료할 때. async 클라이언트가 실제로 닫힐 때까지 기다림
+        """
+        for client, aclient in self._take_clients():
+            client.close()
+            await aclient.aclose()
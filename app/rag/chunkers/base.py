@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 from app.rag.types import Document, Chunk
 
 
 class Chunker(ABC):
     @abstractmethod
     def chunk(self, doc: Document) -> List[Chunk]:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def iter_chunks(self, doc: Document) -> Iterator[Chunk]:
+        """
+        청크를 하나씩 생성. 기본 구현은 chunk() 결과를 그대로 흘려보냄
+        """
+        yield from self.chunk(doc)
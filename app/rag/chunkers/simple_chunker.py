@@ -1,24 +1,25 @@
 from __future__ import annotations
 
-from typing import List
+import io
+from types import MappingProxyType
+from typing import Iterator, List
 from app.rag.types import Document, Chunk
 from app.rag.chunkers.base import Chunker
 
 
 class SimpleChunker(Chunker):
     def chunk(self, doc: Document) -> List[Chunk]:
-        parts = [p.strip() for p in doc.text.split("\n") if p.strip()]
-        if not parts:
-            parts = [doc.text.strip()]
+        return list(self.iter_chunks(doc))
 
-        chunks: List[Chunk] = []
-        for i, t in enumerate(parts):
-            chunks.append(
-                Chunk(
-                    id=f"{doc.id}::chunk::{i}",
-                    doc_id=doc.id,
-                    text=t,
-                    metadata=dict(doc.metadata),
-                )
-            )
-        return chunks
\ No newline at end of file
+    def iter_chunks(self, doc: Document) -> Iterator[Chunk]:
+        # 모든 청크가 같은 읽기 전용 metadata 를 공유 (청크마다 dict 복사 X)
+        metadata = MappingProxyType(dict(doc.metadata))
+        i = 0
+        for line in io.StringIO(doc.text):
+            t = line.strip()
+            if not t:
+                continue
+            yield Chunk(id=f"{doc.id}::chunk::{i}", doc_id=doc.id, text=t, metadata=metadata)
+            i += 1
+        if i == 0:
+            yield Chunk(id=f"{doc.id}::chunk::0", doc_id=doc.id, text=doc.text.strip(), metadata=metadata)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import io
+import re
+from collections import deque
+from types import MappingProxyType
+from typing import Any, Iterable, Iterator, List, Mapping, Optional, TextIO, Union
+
+from app.rag.types import Document, Chunk
+from app.rag.chunkers.base import Chunker
+
+TextSource = Union[TextIO, Iterable[str]]
+
+# 토큰 = 공백이 아닌 연속 문자열 + 뒤따르는 공백 (join 하면 원문 복원)
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+_READ_CHARS = 64 * 1024
+
+
+def _blocks(source: TextSource, block_chars: int) -> Iterator[str]:
+    """
+    파일 핸들은 고정 크기 블록으로, 그 외 iterable 은 원소 단위로 읽음
+    """
+    read = getattr(source, "read", None)
+    if read is not None:
+        while True:
+            block = read(block_chars)
+            if not block:
+                return
+            yield block
+    else:
+        for block in source:
+            if block:
+                yield block
+
+
+class StreamingChunker(Chunker):
+    """
+    size/overlap 슬라이딩 윈도우 청커. 입력을 블록 단위로 읽어 메모리는 O(size + 블록), 시간은 입력 길이에 선형
+    - unit="chars": 문자 수 기준
+    - unit="tokens": 공백 단위 토큰 수 기준 (단어 중간에서 잘리지 않음, block_chars 보다 긴 토큰만 예외)
+    - 한 문서의 모든 청크는 같은 읽기 전용 metadata 매핑을 공유
+    """
+
+    def __init__(
+        self,
+        *,
+        size: int = 1000,
+        overlap: int = 200,
+        unit: str = "chars",
+        block_chars: int = _READ_CHARS,
+    ):
+        if size <= 0:
+            raise ValueError("size must be positive")
+        if not 0 <= overlap < size:
+            raise ValueError("overlap must be in [0, size)")
+        if unit not in ("chars", "tokens"):
+            raise ValueError(f"unknown unit: {unit!r}")
+        self._size = size
+        self._overlap = overlap
+        self._unit = unit
+        self._block_chars = block_chars
+
+    def chunk(self, doc: Document) -> List[Chunk]:
+        return list(self.iter_chunks(doc))
+
+    def iter_chunks(self, doc: Document) -> Iterator[Chunk]:
+        return self.iter_stream(io.StringIO(doc.text), doc_id=doc.id, metadata=doc.metadata)
+
+    def iter_stream(
+        self,
+        source: TextSource,
+        *,
+        doc_id: str,
+        metadata: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[Chunk]:
+        """
+        텍스트 스트림/파일 핸들/문자열 iterable 을 끝까지 읽으며 청크를 하나씩 생성
+        """
+        shared = MappingProxyType(dict(metadata or {}))
+        windows = self._char_windows(source) if self._unit == "chars" else self._token_windows(source)
+        i = 0
+        for text in windows:
+            text = text.strip()
+            if not text:
+                continue
+            yield Chunk(id=f"{doc_id}::chunk::{i}", doc_id=doc_id, text=text, metadata=shared)
+            i += 1
+
+    def _char_windows(self, source: TextSource) -> Iterator[str]:
+        step = self._size - self._overlap
+        buf = ""
+        start = 0  # buf 안에서 다음 윈도우 시작 위치 (윈도우마다 buf 를 다시 자르지 않음)
+        emitted = False
+        for block in _blocks(source, self._block_chars):
+            # 남은 꼬리(< size)와 새 블록만 이어 붙임 -> 블록당 O(size + 블록)
+            buf = buf[start:] + block
+            start = 0
+            while len(buf) - start >= self._size:
+                yield buf[start:start + self._size]
+                emitted = True
+                start += step
+        tail = buf[start:]
+        # 마지막 윈도우: overlap 부분만 남았으면 이미 앞 청크에 포함됨
+        if tail and (not emitted or len(tail) > self._overlap):
+            yield tail
+
+    def _token_windows(self, source: TextSource) -> Iterator[str]:
+        step = self._size - self._overlap
+        window: deque[str] = deque()
+        pending = ""
+        emitted = False
+        for block in _blocks(source, self._block_chars):
+            tokens = _TOKEN.findall(pending + block)
+            # 블록 끝 토큰은 다음 블록과 이어질 수 있으니 보류
+            pending = tokens.pop() if tokens and not tokens[-1][-1].isspace() else ""
+            if len(pending) >= self._block_chars:
+                # 공백 없는 긴 토큰은 block_chars 에서 강제로 끊음 -> pending 재스캔이 O(블록) 으로 유지
+                tokens.append(pending)
+                pending = ""
+            for tok in tokens:
+                window.append(tok)
+                if len(window) == self._size:
+                    yield "".join(window)
+                    emitted = True
+                    for _ in range(step):
+                        window.popleft()
+        if pending:
+            window.append(pending)
+        if window and (not emitted or len(window) > self._overlap):
+            yield "".join(window)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, List, Mapping, Optional, Sequence, Set
+
+from app.rag.types import ScoredChunk
+
+# 토크나이저 없이 쓰는 근사치: 영문/숫자 덩어리는 4글자당 1토큰, 그 외 공백 아닌 문자(한글/CJK/기호)는 글자당 1토큰
+_PIECE = re.compile(r"[A-Za-z0-9_]+|[^\sA-Za-z0-9_]")
+_SPACE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    BPE 토크나이저 결과보다 약간 크게 나오는 보수적 추정 (budget 초과 방지)
+    """
+    n = 0
+    for m in _PIECE.finditer(text):
+        size = m.end() - m.start()
+        n += math.ceil(size / 4) if size > 1 else 1
+    return n
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    추정 토큰 max_tokens 이하가 되도록 조각 경계에서 자름
+    """
+    n = 0
+    end = 0
+    for m in _PIECE.finditer(text):
+        size = m.end() - m.start()
+        cost = math.ceil(size / 4) if size > 1 else 1
+        if n + cost > max_tokens:
+            break
+        n += cost
+        end = m.end()
+    return text[:end]
+
+
+def context_budget(
+    llm_config: Optional[Mapping[str, Any]],
+    *,
+    prompt_tokens: int,
+    default_context_tokens: int,
+    default_max_tokens: int,
+    cap: Optional[int] = None,
+) -> int:
+    """
+    컨텍스트에 쓸 수 있는 토큰 = 모델 창(max_context_tokens) - 답변 예약(max_tokens) - 나머지 프롬프트
+    llm_config.rag_context_tokens 또는 cap(요청값)이 있으면 그보다 크지 않게
+    """
+    cfg = llm_config or {}
+    window = int(cfg.get("max_context_tokens") or default_context_tokens)
+    reserve = int(cfg.get("max_tokens") or default_max_tokens)
+    budget = window - reserve - prompt_tokens
+    for limit in (cfg.get("rag_context_tokens"), cap):
+        if limit is not None:
+            budget = min(budget, int(limit))
+    return max(0, budget)
+
+
+@dataclass(frozen=True)
+class PackedContext:
+    text: str
+    tokens: int
+    budget: int
+    chunks: List[ScoredChunk] = field(default_factory=list)
+    truncated: bool = False
+    duplicates: int = 0
+    dropped: int = 0
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.blake2b(_SPACE.sub(" ", text).strip().lower().encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _format(i: int, m: ScoredChunk, text: str) -> str:
+    return f"[{i}] ({m.chunk.doc_id})\n{text}"
+
+
+def pack_context(
+    matches: Sequence[ScoredChunk],
+    budget: int,
+    *,
+    min_chunk_tokens: int = 64,
+    separator: str = "\n\n",
+) -> PackedContext:
+    """
+    점수 높은 청크부터 budget 안에 채움
+    - 같은 청크 id / 공백·대소문자만 다른 본문 / 이미 고른 청크에 포함되는 본문은 중복으로 건너뜀
+    - 다음 청크가 통째로 안 들어가면, 남은 budget 이 min_chunk_tokens 이상일 때만 잘라서 넣고 끝
+    - 반환 tokens 는 최종 컨텍스트 문자열의 추정 토큰 수
+    """
+    picked: List[ScoredChunk] = []
+    parts: List[str] = []
+    picked_texts: List[str] = []
+    seen_ids: Set[str] = set()
+    seen_prints: Set[str] = set()
+    sep_tokens = estimate_tokens(separator)
+    used = 0
+    duplicates = 0
+    truncated = False
+
+    ordered = sorted(matches, key=lambda x: -x.score)
+    consumed = 0
+    for m in ordered:
+        text = m.chunk.text.strip()
+        fp = _fingerprint(text)
+        if not text or m.chunk.id in seen_ids or fp in seen_prints or any(text in t for t in picked_texts):
+            duplicates += 1
+            consumed += 1
+            continue
+
+        sep = sep_tokens if parts else 0
+        block = _format(len(picked) + 1, m, text)
+        cost = estimate_tokens(block) + sep
+        if used + cost > budget:
+            room = budget - used - sep - estimate_tokens(_format(len(picked) + 1, m, ""))
+            if room >= min_chunk_tokens:
+                block = _format(len(picked) + 1, m, truncate_to_tokens(text, room))
+                parts.append(block)
+                picked.append(m)
+                used += estimate_tokens(block) + sep
+                truncated = True
+                consumed += 1
+            break
+
+        parts.append(block)
+        picked.append(m)
+        seen_ids.add(m.chunk.id)
+        seen_prints.add(fp)
+        picked_texts.append(text)
+        used += cost
+        consumed += 1
+
+    context = separator.join(parts)
+    return PackedContext(
+        text=context,
+        tokens=estimate_tokens(context),
+        budget=budget,
+        chunks=picked,
+        truncated=truncated,
+        duplicates=duplicates,
+        dropped=len(ordered) - consumed,
+    )
@@ -2,10 +2,36 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from typing import List
-from app.rag.types import Chunk, Vector
+
+import numpy as np
+
+from app.rag.types import Chunk
 
 
 class Embedder(ABC):
+    """
+    임베딩 계약: 배치 단위 embed_texts 가 기본이고, 청크/쿼리는 그 위에 얹음
+    반환은 항상 float32 ndarray ((n, dim) 또는 (dim,))
+    """
+
+    @property
+    @abstractmethod
+    def dim(self) -> int:
+        raise NotImplementedError
+
+    @property
+    def model_id(self) -> str:
+        """
+        캐시 키 등에 쓰는 모델 식별자. 출력이 바뀌는 설정이 있으면 여기에 포함
+        """
+        return type(self).__name__
+
     @abstractmethod
-    def embed_chunks(self, chunks: List[Chunk]) -> List[Vector]:
-        raise NotImplementedError
\ No newline at end of file
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def embed_chunks(self, chunks: List[Chunk]) -> np.ndarray:
+        return self.embed_texts([c.text for c in chunks])
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed_texts([text])[0]
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.rag.embedders.base import Embedder
+
+
+class BatchingEmbedder(Embedder):
+    """
+    동시 요청 micro-batching 스케줄러
+    - 여러 스레드의 embed_texts/embed_query 호출을 큐에 모아서 max_wait_ms 동안
+      (또는 max_batch 개가 찰 때까지) 기다린 뒤 inner.embed_texts 한 번으로 처리
+    - 각 호출자는 자기 몫의 행을 Future 로 돌려받음
+    - max_batch 이상인 큰 배치(ingest 등)는 큐를 거치지 않고 바로 inner 로 보냄
+    """
+
+    def __init__(self, inner: Embedder, *, max_batch: int = 64, max_wait_ms: float = 2.0):
+        self._inner = inner
+        self._max_batch = max(1, max_batch)
+        self._max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self.batches = 0
+        self.batched_items = 0
+
+    @property
+    def dim(self) -> int:
+        return self._inner.dim
+
+    @property
+    def model_id(self) -> str:
+        return self._inner.model_id
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+        if len(texts) >= self._max_batch:
+            return self._inner.embed_texts(texts)
+
+        self._ensure_worker()
+        fut: Future = Future()
+        self._queue.put((texts, fut))
+        return fut.result()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0][0])
+            deadline = time.monotonic() + self._max_wait
+            while size < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item[0])
+            self._flush(batch)
+
+    def _flush(self, batch: List[Tuple[List[str], Future]]) -> None:
+        texts = [t for item, _ in batch for t in item]
+        try:
+            vectors = self._inner.embed_texts(texts)
+        except BaseException as e:
+            for _, fut in batch:
+                fut.set_exception(e)
+            return
+
+        self.batches += 1
+        self.batched_items += len(texts)
+        start = 0
+        for item, fut in batch:
+            fut.set_result(vectors[start:start + len(item)])
+            start += len(item)
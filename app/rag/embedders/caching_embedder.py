@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+import redis
+
+from app.rag.embedders.base import Embedder
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class CachingEmbedder(Embedder):
+    """
+    임베더 캐시 래퍼
+    key = emb:{model_id}:{dim}:{blake2b(정규화 텍스트)}
+    - inner 에도 정규화 텍스트를 넘김 (같은 key 에는 항상 같은 입력의 벡터가 저장되도록)
+    - 1차: 프로세스 내 LRU (max_entries 개)
+    - 2차(옵션): Redis, float32 바이트 그대로 저장 (TTL)
+    - 배치 안의 중복 텍스트는 한 번만 임베딩. Redis 장애는 miss 로 취급
+    """
+
+    def __init__(
+        self,
+        inner: Embedder,
+        *,
+        max_entries: int = 10000,
+        redis_client: Optional[redis.Redis] = None,
+        ttl_seconds: int = 86400,
+    ):
+        self._inner = inner
+        self._max_entries = max_entries
+        self._redis = redis_client
+        self._ttl = ttl_seconds
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.redis_errors = 0
+
+    @property
+    def dim(self) -> int:
+        return self._inner.dim
+
+    @property
+    def model_id(self) -> str:
+        return self._inner.model_id
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "redis_errors": self.redis_errors,
+            "size": len(self._lru),
+        }
+
+    def _key(self, normalized: str) -> str:
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+        return f"emb:{self.model_id}:{self.dim}:{digest}"
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        normalized = [normalize_text(t) for t in texts]
+        keys = [self._key(t) for t in normalized]
+        found: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            for k in keys:
+                v = self._lru.get(k)
+                if v is not None:
+                    self._lru.move_to_end(k)
+                    found[k] = v
+            self.hits += sum(1 for k in keys if k in found)
+
+        pending = list(dict.fromkeys(k for k in keys if k not in found))
+        if pending and self._redis is not None:
+            from_redis = self._redis_get(pending)
+            found.update(from_redis)
+            pending = [k for k in pending if k not in from_redis]
+            with self._lock:
+                self.redis_hits += sum(1 for k in keys if k in from_redis)
+            self._remember(from_redis)
+
+        if pending:
+            text_of = dict(zip(keys, normalized))
+            vectors = self._inner.embed_texts([text_of[k] for k in pending])
+            fresh = {k: self._freeze(v) for k, v in zip(pending, vectors)}
+            found.update(fresh)
+            with self._lock:
+                self.misses += sum(1 for k in keys if k in fresh)
+            self._remember(fresh)
+            if self._redis is not None:
+                self._redis_set(fresh)
+
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, k in enumerate(keys):
+            out[i] = found[k]
+        return out
+
+    @staticmethod
+    def _freeze(v: np.ndarray) -> np.ndarray:
+        v = np.array(v, dtype=np.float32)
+        v.setflags(write=False)
+        return v
+
+    def _remember(self, items: Dict[str, np.ndarray]) -> None:
+        if not items or self._max_entries <= 0:
+            return
+        with self._lock:
+            for k, v in items.items():
+                self._lru[k] = v
+                self._lru.move_to_end(k)
+            while len(self._lru) > self._max_entries:
+                self._lru.popitem(last=False)
+
+    def _redis_get(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        try:
+            raws = self._redis.mget(keys)
+        except redis.RedisError:
+            self._redis_error()
+            return {}
+        out: Dict[str, np.ndarray] = {}
+        for k, raw in zip(keys, raws):
+            if raw and len(raw) == self.dim * 4:
+                out[k] = self._freeze(np.frombuffer(raw, dtype=np.float32))
+        return out
+
+    def _redis_set(self, items: Dict[str, np.ndarray]) -> None:
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for k, v in items.items():
+                pipe.setex(k, self._ttl, v.tobytes())
+            pipe.execute()
+        except redis.RedisError:
+            self._redis_error()
+
+    def _redis_error(self) -> None:
+        with self._lock:
+            self.redis_errors += 1
@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 from typing import List
-from app.rag.types import Chunk, Vector
+
+import numpy as np
+
 from app.rag.embedders.base import Embedder
 
 
@@ -10,13 +12,16 @@ class DummyEmbedder(Embedder):
     def __init__(self, dim: int = 8):
         self._dim = dim
 
-    def embed_chunks(self, chunks: List[Chunk]) -> List[Vector]:
-        out: List[Vector] = []
-        for c in chunks:
-            s = c.text
-            total = sum(ord(ch) for ch in s)
-            v = []
-            for i in range(self._dim):
-                v.append(((total + i * 31) % 1000) / 1000.0)
-            out.append(v)
-        return out
\ No newline at end of file
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        # 텍스트별 코드포인트 합 (utf-32 버퍼를 한 번에 합산)
+        totals = np.fromiter(
+            (int(np.frombuffer(t.encode("utf-32-le"), dtype=np.uint32).sum()) for t in texts),
+            dtype=np.int64,
+            count=len(texts),
+        )
+        offsets = np.arange(self._dim, dtype=np.int64) * 31
+        return (((totals[:, None] + offsets[None, :]) % 1000) / 1000.0).astype(np.float32)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import re
+import zlib
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+
+from app.rag.embedders.base import Embedder
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@lru_cache(maxsize=1 << 18)
+def _feature_hash(feature: str) -> int:
+    return zlib.crc32(feature.encode("utf-8"))
+
+
+class HashingEmbedder(Embedder):
+    """
+    결정적(deterministic) 오프라인 임베더: feature hashing
+    - 소문자 토큰의 1..ngram n-gram 을 crc32 로 dim 버킷에 해시 (상위 비트로 부호 결정)
+    - 배치 전체를 (행, 버킷, 부호) 평탄 배열로 모은 뒤 bincount 한 번으로 행렬 생성, L2 정규화
+    - 같은 단어를 공유하는 텍스트끼리 cosine 이 커서 부하 테스트/CI 에서 의미 있는 검색 결과가 나옴
+    """
+
+    def __init__(self, dim: int = 256, ngram: int = 2):
+        if dim <= 0:
+            raise ValueError("dim must be positive")
+        self._dim = dim
+        self._ngram = max(1, ngram)
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    @property
+    def model_id(self) -> str:
+        return f"hashing-crc32-ngram{self._ngram}"
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        n = len(texts)
+        rows: List[int] = []
+        hashes: List[int] = []
+        for i, text in enumerate(texts):
+            tokens = _TOKEN_RE.findall(text.lower())
+            feats = list(tokens)
+            for k in range(2, self._ngram + 1):
+                feats.extend(" ".join(tokens[j:j + k]) for j in range(len(tokens) - k + 1))
+            rows.extend([i] * len(feats))
+            hashes.extend(_feature_hash(f) for f in feats)
+
+        if not hashes:
+            return np.zeros((n, self._dim), dtype=np.float32)
+
+        h = np.asarray(hashes, dtype=np.uint32)
+        buckets = (h % self._dim).astype(np.int64)
+        signs = np.where(h & 0x80000000, 1.0, -1.0)
+        flat = np.asarray(rows, dtype=np.int64) * self._dim + buckets
+        m = np.bincount(flat, weights=signs, minlength=n * self._dim).reshape(n, self._dim)
+
+        norms = np.linalg.norm(m, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        return (m / norms).astype(np.float32)
@@ -1,17 +1,32 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from app.rag.types import Document
+from typing import Iterator
+from app.core.exceptions import BadRequest
+from app.rag.types import LoadedDocument
 
 
 class DocumentLoader(ABC):
     @abstractmethod
-    def load(self, *, source: str) -> Document:
+    def iter_documents(self, *, source: str) -> Iterator[LoadedDocument]:
         """
+        source 에서 Document 를 하나씩 생성 (코퍼스 전체를 메모리에 올리지 않음)
         source 예:
         - 파일 경로
-        - URL
-        - DB key
-        - raw text id 등
+        - 디렉터리 경로
+        - JSONL 파일 경로
+        큰 파일은 본문 대신 StreamedDocument 로 줄 수 있음
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def load(self, *, source: str) -> LoadedDocument:
+        """
+        문서가 정확히 하나인 source 용
+        """
+        docs = self.iter_documents(source=source)
+        first = next(docs, None)
+        if first is None:
+            raise BadRequest(message="No document to load", details={"source": source})
+        if next(docs, None) is not None:
+            raise BadRequest(message="Source has multiple documents", details={"source": source})
+        return first
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import fnmatch
+import os
+from typing import Iterator, Optional, Sequence
+
+from app.core.exceptions import BadRequest
+from app.rag.loaders.base import DocumentLoader
+from app.rag.loaders.file_loader import FileLoader
+from app.rag.loaders.file_state import FileStateIndex
+from app.rag.loaders.jsonl_loader import JsonlLoader
+from app.rag.types import LoadedDocument
+
+DEFAULT_PATTERNS = ("*.txt", "*.md", "*.rst", "*.log", "*.csv", "*.json", "*.jsonl", "*.html")
+
+
+def walk_files(root: str, *, patterns: Sequence[str] = DEFAULT_PATTERNS, recursive: bool = True) -> Iterator[str]:
+    """
+    root 아래 patterns 에 맞는 파일 경로를 이름순으로 하나씩 (숨김 파일/디렉터리 제외)
+    """
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        with os.scandir(d) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        subdirs = []
+        for e in entries:
+            if e.name.startswith("."):
+                continue
+            if e.is_dir(follow_symlinks=False):
+                if recursive:
+                    subdirs.append(e.path)
+            elif e.is_file() and any(fnmatch.fnmatch(e.name, p) for p in patterns):
+                yield e.path
+        stack.extend(reversed(subdirs))
+
+
+class DirectoryLoader(DocumentLoader):
+    """
+    디렉터리 트리를 순회하며 파일마다 Document 생성
+    - *.jsonl 은 JsonlLoader (줄마다 문서), 나머지는 FileLoader (파일마다 문서)
+    - 같은 FileStateIndex 를 공유해서 변경 없는 파일은 건너뜀
+    """
+
+    def __init__(
+        self,
+        *,
+        patterns: Sequence[str] = DEFAULT_PATTERNS,
+        recursive: bool = True,
+        encoding: str = "utf-8",
+        state: Optional[FileStateIndex] = None,
+        stream_bytes: Optional[int] = None,
+    ):
+        self._patterns = tuple(patterns)
+        self._recursive = recursive
+        self._files = FileLoader(encoding=encoding, state=state, stream_bytes=stream_bytes)
+        self._jsonl = JsonlLoader(state=state)
+
+    @property
+    def skipped(self) -> int:
+        return self._files.skipped + self._jsonl.skipped
+
+    def iter_documents(self, *, source: str) -> Iterator[LoadedDocument]:
+        if not os.path.isdir(source):
+            raise BadRequest(message="Directory not found", details={"source": source})
+        for path in walk_files(source, patterns=self._patterns, recursive=self._recursive):
+            loader = self._jsonl if path.endswith(".jsonl") else self._files
+            yield from loader.iter_documents(source=path)
+
+
+def loader_for(
+    path: str,
+    *,
+    state: Optional[FileStateIndex] = None,
+    stream_bytes: Optional[int] = None,
+) -> DocumentLoader:
+    """
+    경로 종류(디렉터리 / .jsonl / 그 외 파일)에 맞는 loader
+    stream_bytes 이상인 파일은 StreamedDocument 로 (JSONL 은 줄 단위 문서라 해당 없음)
+    """
+    if os.path.isdir(path):
+        return DirectoryLoader(state=state, stream_bytes=stream_bytes)
+    if path.endswith(".jsonl"):
+        return JsonlLoader(state=state)
+    return FileLoader(state=state, stream_bytes=stream_bytes)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import codecs
+import functools
+import mmap
+import os
+from typing import Any, Dict, Iterator, Optional
+
+from app.core.exceptions import BadRequest
+from app.rag.loaders.base import DocumentLoader
+from app.rag.loaders.file_state import FileStateIndex
+from app.rag.types import Document, LoadedDocument, StreamedDocument
+
+_DECODE_BLOCK = 1 << 20
+
+
+def iter_text(
+    path: str,
+    *,
+    encoding: str = "utf-8",
+    errors: str = "replace",
+    block_bytes: int = _DECODE_BLOCK,
+) -> Iterator[str]:
+    """
+    파일을 mmap 으로 열고 block_bytes 씩 incremental decode
+    (멀티바이트 문자가 블록 경계에 걸려도 decoder 가 이어 붙임)
+    StreamingChunker.iter_stream (IngestionService.ingest_stream) 에 그대로 넘기면 큰 파일도 본문을 통째로 올리지 않음
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for off in range(0, size, block_bytes):
+                text = decoder.decode(mm[off:off + block_bytes])
+                if text:
+                    yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def file_metadata(path: str) -> Dict[str, Any]:
+    """
+    파일 문서 metadata. 청크 id 해시에 metadata 가 들어가므로 size/mtime 처럼 편집마다 바뀌는 값은 넣지 않음
+    (넣으면 한 줄만 고쳐도 모든 청크가 새 id -> 전체 재임베딩)
+    """
+    return {
+        "path": path,
+        "file_name": os.path.basename(path),
+        "ext": os.path.splitext(path)[1].lower(),
+    }
+
+
+class FileLoader(DocumentLoader):
+    """
+    파일 하나 -> Document 하나 (id = 경로)
+    state 를 주면 mtime/size/hash 가 그대로인 파일은 건너뜀 (아무것도 yield 안 함)
+    stream_bytes 이상인 파일은 본문을 읽지 않고 StreamedDocument (iter_text 로 블록 단위 decode)
+    """
+
+    def __init__(
+        self,
+        *,
+        encoding: str = "utf-8",
+        errors: str = "replace",
+        state: Optional[FileStateIndex] = None,
+        stream_bytes: Optional[int] = None,
+    ):
+        self._encoding = encoding
+        self._errors = errors
+        self._state = state
+        self._stream_bytes = stream_bytes
+        self.skipped = 0
+
+    def iter_documents(self, *, source: str) -> Iterator[LoadedDocument]:
+        try:
+            st = os.stat(source)
+        except FileNotFoundError:
+            raise BadRequest(message="File not found", details={"source": source})
+
+        digest = None
+        if self._state is not None:
+            unchanged, digest = self._state.check(source, st)
+            if unchanged:
+                self.skipped += 1
+                return
+
+        if self._stream_bytes is not None and st.st_size >= self._stream_bytes:
+            yield StreamedDocument(
+                id=source,
+                metadata=file_metadata(source),
+                open=functools.partial(iter_text, source, encoding=self._encoding, errors=self._errors),
+            )
+        else:
+            text = "".join(iter_text(source, encoding=self._encoding, errors=self._errors))
+            yield Document(id=source, text=text, metadata=file_metadata(source))
+        # 호출 측이 다음 문서를 요청했다 = 이 문서 처리가 끝남 -> 그때 기록
+        if self._state is not None:
+            self._state.mark(source, st, digest)
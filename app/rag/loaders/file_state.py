@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+_HASH_BLOCK = 1 << 20
+
+
+def file_digest(path: str) -> str:
+    """
+    파일 내용 blake2b. mmap 으로 블록 단위 해시 (파일 전체를 bytes 로 복사하지 않음)
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return h.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                for off in range(0, size, _HASH_BLOCK):
+                    h.update(view[off:off + _HASH_BLOCK])
+            finally:
+                view.release()
+    return h.hexdigest()
+
+
+class FileStateIndex:
+    """
+    path -> (mtime_ns, size, hash). 변경 없는 파일을 다시 읽지 않기 위한 기록
+    - mtime/size 가 같으면 읽지 않고 unchanged
+    - 다르면 해시를 비교 (touch 만 된 파일은 해시가 같아 unchanged, 기록만 갱신)
+    - path 를 주면 save() 때 JSON 으로 저장하고 다음 실행에서 이어서 사용
+      (저장형 벡터 스토어와 함께 쓸 것: in-memory 스토어면 재시작 후 파일이 건너뛰어짐)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._files: Dict[str, Tuple[int, int, str]] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._files = {k: (int(v[0]), int(v[1]), str(v[2])) for k, v in json.load(f).items()}
+
+    def check(self, path: str, st: os.stat_result) -> Tuple[bool, Optional[str]]:
+        """
+        (unchanged, digest). mtime/size 로 판정되면 digest 는 None (해시 계산 안 함)
+        """
+        with self._lock:
+            prev = self._files.get(path)
+        if prev is not None and prev[0] == st.st_mtime_ns and prev[1] == st.st_size:
+            return True, None
+        digest = file_digest(path)
+        if prev is not None and prev[2] == digest:
+            self.mark(path, st, digest)
+            return True, digest
+        return False, digest
+
+    def mark(self, path: str, st: os.stat_result, digest: str) -> None:
+        with self._lock:
+            self._files[path] = (st.st_mtime_ns, st.st_size, digest)
+
+    def save(self) -> None:
+        if not self._path:
+            return
+        with self._lock:
+            data = {k: list(v) for k, v in self._files.items()}
+        os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+        tmp = f"{self._path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self._path)
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
-from app.rag.types import RetrieveResult
+from typing import Any, Dict, List, Optional, Sequence
+from app.rag.types import Diversity, RetrieveQuery, RetrieveResult
 
 
 class Retriever(ABC):
@@ -14,5 +14,15 @@ class Retriever(ABC):
         top_k: int,
         filters: Optional[Dict[str, Any]] = None,
         score_threshold: Optional[float] = None,
+        diversity: Optional[Diversity] = None,
     ) -> RetrieveResult:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def retrieve_batch(self, queries: Sequence[RetrieveQuery]) -> List[RetrieveResult]:
+        """
+        여러 쿼리를 한 번에. 기본 구현은 retrieve 반복
+        """
+        return [
+            self.retrieve(query=q.query, top_k=q.top_k, filters=q.filters, score_threshold=q.score_threshold)
+            for q in queries
+        ]
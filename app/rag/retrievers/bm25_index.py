@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.rag.types import Chunk, ScoredChunk
+from app.rag.vectorstores.chunk_table import ChunkTable
+from app.rag.vectorstores.metadata_index import MetadataIndex
+from app.rag.vectorstores.scoring import top_k_indices
+
+# 단어 + 하이픈/점/콜론으로 이어진 식별자 (E-1042, user.id, ERR_CONN_RESET, v1.2.3)
+_TOKEN = re.compile(r"\w+(?:[-.:/]\w+)*")
+_PART = re.compile(r"\w+")
+
+
+def tokenize(text: str, *, expand: bool = True) -> List[str]:
+    """
+    소문자 토큰. 색인 때(expand=True) 복합 식별자는 통째로 + 구성 단어로도 넣음
+    ("E-1042" -> ["e-1042", "e", "1042"]) -> "E-1042" 정확 검색, "1042" 부분 검색 모두 매칭
+    쿼리는 expand=False: "e" 처럼 거의 모든 문서에 있는 조각으로 posting 을 훑지 않게
+    """
+    out: List[str] = []
+    for m in _TOKEN.finditer(text.lower()):
+        tok = m.group()
+        out.append(tok)
+        if expand and not tok.isalnum() and "_" not in tok:
+            out.extend(_PART.findall(tok))
+    return out
+
+
+class BM25Index:
+    """
+    청크 텍스트 BM25 역색인
+    - term -> posting (문서 번호 array('i'), tf array('i'))
+    - 삭제는 tombstone + df 감소, 죽은 문서가 절반을 넘으면 rebuild
+    - 검색은 쿼리 term 들의 posting 만 모아 numpy 로 점수 합산 (전체 문서 스캔 X)
+      lock 안에서는 posting/통계 사본만 뜨고 점수 계산은 lock 밖 -> 검색끼리, 검색과 ingest 가 서로 막지 않음
+    - 행 -> 청크는 ChunkTable (열 지향, Chunk 객체를 들고 있지 않음). top-k 에서만 Chunk 생성
+    - filters 는 MetadataIndex 로 (벡터 스토어와 같은 문법)
+    """
+
+    def __init__(self, *, k1: float = 1.2, b: float = 0.75):
+        self._k1 = k1
+        self._b = b
+        self._lock = threading.RLock()
+        self._reset()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 스냅샷(pickle) 용: lock 은 빼고 복원할 때 새로 만듦
+        state = dict(self.__dict__)
+        state.pop("_lock")
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def _reset(self) -> None:
+        self._docs: Dict[str, array] = {}
+        self._tfs: Dict[str, array] = {}
+        self._df: Dict[str, int] = {}
+        self._lengths = array("i")
+        self._alive = bytearray()
+        self._table = ChunkTable()
+        self._rows_by_source: Dict[str, List[int]] = {}
+        self._meta = MetadataIndex()
+        self._total_len = 0
+        self._n_alive = 0
+        # 검색용 numpy 사본 (lengths, alive). 쓰기가 있으면 다음 검색 때 다시 만듦
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return self._n_alive
+
+    def add(self, source_id: str, chunks: Iterable[Chunk]) -> None:
+        with self._lock:
+            for c in chunks:
+                self._add_locked(source_id, c)
+
+    def remove(self, source_id: str, chunk_ids: Optional[Set[str]] = None) -> None:
+        """
+        source_id 의 청크 중 chunk_ids 만 (None 이면 전부) 삭제
+        """
+        with self._lock:
+            rows = self._rows_by_source.get(source_id)
+            if not rows:
+                return
+            gone = [r for r in rows if chunk_ids is None or self._table.id(r) in chunk_ids]
+            kept = [r for r in rows if chunk_ids is not None and self._table.id(r) not in chunk_ids]
+            if kept:
+                self._rows_by_source[source_id] = kept
+            else:
+                self._rows_by_source.pop(source_id)
+            for r in gone:
+                self._remove_row_locked(r)
+            dead = len(self._table) - self._n_alive
+            if dead > 1024 and dead * 2 > len(self._table):
+                self._rebuild_locked()
+
+    def search(self, query: str, *, top_k: int, filters: Optional[Dict[str, Any]] = None) -> List[ScoredChunk]:
+        terms = set(tokenize(query, expand=False))
+        if not terms or top_k <= 0:
+            return []
+        # lock 안: 쿼리 term 의 posting 사본과 통계만. 테이블/색인은 행 [0, n) 이 바뀌지 않으니 참조만 잡음
+        with self._lock:
+            n = len(self._table)
+            n_alive = self._n_alive
+            if n_alive == 0:
+                return []
+            avgdl = self._total_len / n_alive
+            lengths, alive = self._search_arrays_locked()
+            table, meta = self._table, self._meta
+            postings = [
+                (self._df[t], self._docs[t].tobytes(), self._tfs[t].tobytes())
+                for t in terms
+                if self._df.get(t, 0) > 0
+            ]
+        if not postings:
+            return []
+
+        rows_parts: List[np.ndarray] = []
+        weights_parts: List[np.ndarray] = []
+        for df, doc_bytes, tf_bytes in postings:
+            rows = np.frombuffer(doc_bytes, dtype=np.int32)
+            tf = np.frombuffer(tf_bytes, dtype=np.int32).astype(np.float32)
+            idf = math.log(1.0 + (n_alive - df + 0.5) / (df + 0.5))
+            norm = self._k1 * (1.0 - self._b + self._b * lengths[rows] / avgdl)
+            rows_parts.append(rows)
+            weights_parts.append(idf * tf * (self._k1 + 1.0) / (tf + norm))
+
+        rows = np.concatenate(rows_parts)
+        weights = np.concatenate(weights_parts)
+        if rows.size * 8 >= n:
+            # posting 이 많으면 전체 길이 bincount 가 정렬(unique)보다 빠름
+            dense = np.bincount(rows, weights=weights, minlength=n)
+            cand = np.flatnonzero(dense)
+            scores = dense[cand].astype(np.float32)
+        else:
+            cand, inverse = np.unique(rows, return_inverse=True)
+            scores = np.bincount(inverse, weights=weights).astype(np.float32)
+
+        keep = alive[cand]
+        if filters:
+            keep &= meta.resolve(filters, n)[cand]
+        cand, scores = cand[keep], scores[keep]
+
+        out: List[ScoredChunk] = []
+        for i in top_k_indices(scores, top_k):
+            out.append(ScoredChunk(chunk=table.chunk(int(cand[i])), score=float(scores[i])))
+        return out
+
+    def _search_arrays_locked(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._arrays is None:
+            self._arrays = (
+                np.frombuffer(self._lengths.tobytes(), dtype=np.int32),
+                np.frombuffer(bytes(self._alive), dtype=np.bool_),
+            )
+        return self._arrays
+
+    def _add_locked(self, source_id: str, chunk: Chunk) -> None:
+        self._arrays = None
+        row = len(self._table)
+        tokens = tokenize(chunk.text)
+        counts: Dict[str, int] = {}
+        for t in tokens:
+            counts[t] = counts.get(t, 0) + 1
+        for t, tf in counts.items():
+            docs = self._docs.get(t)
+            if docs is None:
+                docs = self._docs[t] = array("i")
+                self._tfs[t] = array("i")
+            docs.append(row)
+            self._tfs[t].append(tf)
+            self._df[t] = self._df.get(t, 0) + 1
+
+        self._table.append((chunk,))
+        self._lengths.append(len(tokens))
+        self._alive.append(1)
+        self._rows_by_source.setdefault(source_id, []).append(row)
+        self._meta.add(row, chunk.metadata)
+        self._total_len += len(tokens)
+        self._n_alive += 1
+
+    def _remove_row_locked(self, row: int) -> None:
+        self._arrays = None
+        for t in set(tokenize(self._table.chunk(row).text)):
+            self._df[t] -= 1
+        self._alive[row] = 0
+        self._total_len -= self._lengths[row]
+        self._n_alive -= 1
+
+    def _rebuild_locked(self) -> None:
+        live = [(source_id, self._table.chunks(rows)) for source_id, rows in self._rows_by_source.items()]
+        self._reset()
+        for source_id, chunks in live:
+            for c in chunks:
+                self._add_locked(source_id, c)
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.rag.embedders.base import Embedder
+from app.rag.retrievers.base import Retriever
+from app.rag.retrievers.bm25_index import BM25Index
+from app.rag.retrievers.mmr import fetch_size, rerank
+from app.rag.types import Chunk, Diversity, RetrieveQuery, RetrieveResult, ScoredChunk
+
+FUSIONS = ("rrf", "weighted")
+
+
+def _minmax(matches: List[ScoredChunk]) -> Dict[str, float]:
+    if not matches:
+        return {}
+    lo = min(m.score for m in matches)
+    hi = max(m.score for m in matches)
+    span = hi - lo
+    return {m.chunk.id: (m.score - lo) / span if span > 0 else 1.0 for m in matches}
+
+
+class HybridRetriever(Retriever):
+    """
+    dense(벡터) + lexical(BM25) 결과를 융합
+    - 각자 top_k * candidate_factor 개 후보를 뽑은 뒤
+    - fusion="rrf": sum(w / (rrf_k + rank))  (점수 스케일 무관, 기본)
+    - fusion="weighted": 리스트별 min-max 정규화 후 alpha * dense + (1 - alpha) * lexical
+    - score_threshold 는 dense 검색에만 적용 (BM25 점수와 스케일이 다름)
+    - 반환 score 는 융합 점수. diversity 가 있으면 융합 후보 fetch_k 개를 mmr.rerank 로 다양화 (embedder 로 후보 임베딩)
+    """
+
+    def __init__(
+        self,
+        *,
+        dense: Retriever,
+        lexical: BM25Index,
+        embedder: Embedder,
+        fusion: str = "rrf",
+        alpha: float = 0.5,
+        rrf_k: int = 60,
+        candidate_factor: int = 4,
+    ):
+        if fusion not in FUSIONS:
+            raise ValueError(f"unknown fusion: {fusion!r}")
+        self._dense = dense
+        self._lexical = lexical
+        self._embedder = embedder
+        self._fusion = fusion
+        self._alpha = alpha
+        self._rrf_k = rrf_k
+        self._candidate_factor = max(1, candidate_factor)
+
+    def retrieve(
+        self,
+        *,
+        query: str,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+        diversity: Optional[Diversity] = None,
+    ) -> RetrieveResult:
+        keep = top_k if diversity is None else fetch_size(top_k, diversity)
+        k = keep * self._candidate_factor
+        dense = self._dense.retrieve(query=query, top_k=k, filters=filters, score_threshold=score_threshold).matches
+        lexical = self._lexical.search(query, top_k=k, filters=filters)
+        matches = self.fuse(dense, lexical, top_k=keep)
+        if diversity is not None:
+            matches = rerank(matches, top_k=top_k, diversity=diversity, embedder=self._embedder)
+        return RetrieveResult(query=query, matches=matches, used_top_k=top_k, score_threshold=score_threshold)
+
+    def retrieve_batch(self, queries: Sequence[RetrieveQuery]) -> List[RetrieveResult]:
+        """
+        dense 는 retrieve_batch 한 번 (배치 임베딩 + 행렬곱), BM25 는 쿼리별
+        """
+        dense = self._dense.retrieve_batch([replace(q, top_k=q.top_k * self._candidate_factor) for q in queries])
+        out: List[RetrieveResult] = []
+        for q, d in zip(queries, dense):
+            lexical = self._lexical.search(q.query, top_k=q.top_k * self._candidate_factor, filters=q.filters)
+            out.append(RetrieveResult(
+                query=q.query,
+                matches=self.fuse(d.matches, lexical, top_k=q.top_k),
+                used_top_k=q.top_k,
+                score_threshold=q.score_threshold,
+            ))
+        return out
+
+    def fuse(self, dense: List[ScoredChunk], lexical: List[ScoredChunk], *, top_k: int) -> List[ScoredChunk]:
+        chunks: Dict[str, Chunk] = {}
+        scores: Dict[str, float] = {}
+        if self._fusion == "rrf":
+            for weight, matches in ((self._alpha, dense), (1.0 - self._alpha, lexical)):
+                for rank, m in enumerate(matches, start=1):
+                    chunks.setdefault(m.chunk.id, m.chunk)
+                    scores[m.chunk.id] = scores.get(m.chunk.id, 0.0) + weight / (self._rrf_k + rank)
+        else:
+            for weight, matches in ((self._alpha, dense), (1.0 - self._alpha, lexical)):
+                for m in matches:
+                    chunks.setdefault(m.chunk.id, m.chunk)
+                for cid, s in _minmax(matches).items():
+                    scores[cid] = scores.get(cid, 0.0) + weight * s
+
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:top_k]
+        return [ScoredChunk(chunk=chunks[cid], score=s) for cid, s in ranked]
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.rag.embedders.base import Embedder
+from app.rag.types import Diversity, ScoredChunk
+from app.rag.vectorstores.scoring import normalize_rows
+
+
+def _relevance(matches: Sequence[ScoredChunk]) -> np.ndarray:
+    """
+    검색 점수를 [0, 1] 로 min-max (metric/융합 점수 스케일과 무관하게 유사도 항과 맞춤)
+    """
+    s = np.asarray([m.score for m in matches], dtype=np.float32)
+    span = float(s.max() - s.min()) if s.size else 0.0
+    return (s - s.min()) / span if span > 0 else np.ones_like(s)
+
+
+def diversify(
+    matches: Sequence[ScoredChunk],
+    vectors: Optional[np.ndarray],
+    *,
+    top_k: int,
+    options: Diversity,
+) -> List[ScoredChunk]:
+    """
+    점수 내림차순 후보 matches (+ 같은 순서의 벡터) 에서 top_k 개 선택
+    - 후보끼리 cosine 유사도 행렬을 한 번에 구한 뒤 greedy 선택 (선택마다 O(m) 벡터 연산)
+    - 반환 score 는 원래 검색 점수
+    """
+    m = len(matches)
+    if m == 0 or top_k <= 0:
+        return []
+
+    sim: Optional[np.ndarray] = None
+    if vectors is not None and options.needs_vectors:
+        v = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        sim = v @ v.T
+
+    rel = _relevance(matches)
+    if options.mode == "mmr" and sim is not None:
+        lam = float(options.lambda_mult)
+        base = lam * rel
+        penalty_w = 1.0 - lam
+    else:
+        base = rel
+        penalty_w = 0.0
+
+    codes: Dict[str, int] = {}
+    doc_codes = np.asarray([codes.setdefault(mt.chunk.doc_id, len(codes)) for mt in matches])
+    per_doc = np.zeros(len(codes), dtype=np.int64)
+    available = np.ones(m, dtype=bool)
+    max_sim = np.zeros(m, dtype=np.float32)
+    picked: List[int] = []
+
+    while len(picked) < top_k and available.any():
+        scores = base - penalty_w * max_sim if penalty_w else base.copy()
+        scores[~available] = -np.inf
+        i = int(np.argmax(scores))
+        available[i] = False
+        picked.append(i)
+
+        doc = doc_codes[i]
+        per_doc[doc] += 1
+        if options.max_per_doc is not None and per_doc[doc] >= options.max_per_doc:
+            available &= doc_codes != doc
+
+        if sim is not None:
+            max_sim = np.maximum(max_sim, sim[i])
+            if options.dedup_threshold is not None:
+                available &= sim[i] < options.dedup_threshold
+
+    return [matches[i] for i in picked]
+
+
+def fetch_size(top_k: int, diversity: Diversity) -> int:
+    """
+    다양화 전에 뽑을 후보 수
+    """
+    return max(top_k, diversity.fetch_k or top_k * 4)
+
+
+def rerank(
+    matches: List[ScoredChunk],
+    *,
+    top_k: int,
+    diversity: Diversity,
+    embedder: Embedder,
+    vectors: Optional[np.ndarray] = None,
+) -> List[ScoredChunk]:
+    """
+    후보 matches 를 MMR/per-doc cap/중복 제거로 top_k 개로 줄임
+    스토어가 벡터를 주지 않으면 후보 텍스트를 다시 임베딩 (embedder 캐시에 걸리는 경우가 대부분)
+    """
+    if diversity.needs_vectors and vectors is None and matches:
+        vectors = embedder.embed_texts([m.chunk.text for m in matches])
+    return diversify(matches, vectors, top_k=top_k, options=diversity)
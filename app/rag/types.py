@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import AbstractSet, Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Union
 
 
-Metadata = Dict[str, Any]
+# 청크끼리 같은 (읽기 전용) 매핑을 공유할 수 있으므로 Mapping 으로 취급
+Metadata = Mapping[str, Any]
 
 
 @dataclass(frozen=True)
@@ -15,6 +16,21 @@ class Document:
 
 
 @dataclass(frozen=True)
+class StreamedDocument:
+    """
+    본문을 한 번에 올리지 않는 문서 (큰 파일). open() 은 텍스트 블록 iterator
+    -> IngestionService.ingest_stream 으로 처리
+    """
+    id: str
+    metadata: Metadata
+    open: Callable[[], Iterator[str]]
+
+
+# loader 가 내놓는 문서
+LoadedDocument = Union[Document, StreamedDocument]
+
+
+@dataclass(frozen=True, slots=True)
 class Chunk:
     id: str
     doc_id: str
@@ -22,7 +38,7 @@ class Chunk:
     metadata: Metadata
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ScoredChunk:
     chunk: Chunk
     score: float
@@ -32,6 +48,51 @@ class ScoredChunk:
 class IngestResult:
     doc_id: str
     chunk_count: int
+    added: int = 0
+    removed: int = 0
+    unchanged: int = 0
+
+
+@dataclass(frozen=True)
+class ChunkDelta:
+    """
+    VectorStore.apply_deltas 한 건: source_id 에서 remove_ids 를 지우고 chunks 를 추가
+    """
+    source_id: str
+    chunks: List[Chunk]
+    vectors: Sequence[Vector]
+    remove_ids: AbstractSet[str] = frozenset()
+
+
+@dataclass(frozen=True)
+class Diversity:
+    """
+    검색 결과 다양화 옵션
+    - mode="mmr": fetch_k 개 후보에서 maximal marginal relevance 로 top_k 선택
+      lambda_mult=1 이면 관련도만, 0 이면 다양성만
+    - max_per_doc: 한 doc_id 에서 최대 몇 개까지
+    - dedup_threshold: 이미 고른 청크와 cosine 유사도가 이 값 이상이면 중복으로 제외
+    """
+    mode: str = "similarity"  # similarity | mmr
+    fetch_k: Optional[int] = None
+    lambda_mult: float = 0.5
+    max_per_doc: Optional[int] = None
+    dedup_threshold: Optional[float] = None
+
+    @property
+    def needs_vectors(self) -> bool:
+        return self.mode == "mmr" or self.dedup_threshold is not None
+
+
+@dataclass(frozen=True)
+class RetrieveQuery:
+    """
+    배치 검색의 쿼리 하나 (쿼리마다 top_k / filters / threshold 가 다를 수 있음)
+    """
+    query: str
+    top_k: int = 5
+    filters: Optional[Dict[str, Any]] = None
+    score_threshold: Optional[float] = None
 
 
 @dataclass(frozen=True)
@@ -1,11 +1,95 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import List
-from app.rag.types import Chunk, Vector
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.rag.types import Chunk, ChunkDelta, ScoredChunk, Vector
 
 
 class VectorStore(ABC):
     @abstractmethod
     def upsert(self, *, source_id: str, chunks: List[Chunk], vectors: List[Vector]) -> None:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, *, source_id: str) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def chunk_ids(self, *, source_id: str) -> Set[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def apply_delta(
+        self,
+        *,
+        source_id: str,
+        chunks: List[Chunk],
+        vectors: List[Vector],
+        remove_ids: Iterable[str],
+    ) -> None:
+        """
+        source_id 의 청크 중 remove_ids 만 지우고 chunks 를 추가 (나머지 청크/벡터는 그대로 유지)
+        """
+        raise NotImplementedError
+
+    def apply_deltas(self, deltas: Sequence[ChunkDelta]) -> None:
+        """
+        여러 source 의 delta 를 한 번에 반영 (bulk ingestion 용). 기본 구현은 apply_delta 반복
+        """
+        for d in deltas:
+            self.apply_delta(source_id=d.source_id, chunks=d.chunks, vectors=d.vectors, remove_ids=d.remove_ids)
+
+    @abstractmethod
+    def similarity_search(
+        self,
+        *,
+        query_vector: Vector,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[ScoredChunk]:
+        raise NotImplementedError
+
+    def similarity_search_batch(
+        self,
+        *,
+        query_vectors: Sequence[Vector],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[List[ScoredChunk]]:
+        """
+        여러 쿼리를 한 번에 검색. 기본 구현은 쿼리별 similarity_search 반복
+        """
+        return [
+            self.similarity_search(
+                query_vector=q,
+                top_k=top_k,
+                filters=filters,
+                score_threshold=score_threshold,
+            )
+            for q in query_vectors
+        ]
+
+    def similarity_search_with_vectors(
+        self,
+        *,
+        query_vector: Vector,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> Tuple[List[ScoredChunk], Optional[np.ndarray]]:
+        """
+        검색 결과 + 결과 청크의 저장 벡터 (len(matches), dim). MMR 등 재정렬용
+        벡터를 바로 꺼낼 수 없는 스토어는 None (호출 측이 재임베딩)
+        """
+        matches = self.similarity_search(
+            query_vector=query_vector,
+            top_k=top_k,
+            filters=filters,
+            score_threshold=score_threshold,
+        )
+        return matches, None
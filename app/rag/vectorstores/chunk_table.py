@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import json
+from array import array
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from app.rag.types import Chunk
+
+
+class _StringColumn:
+    """
+    문자열 열: UTF-8 바이트를 한 bytearray 에 이어 붙이고 offsets(array('q')) 로 경계 기록
+    문자열당 오버헤드 = offset 8바이트 (str 객체 ~50바이트 + 포인터 대신)
+    """
+
+    __slots__ = ("_data", "_offsets")
+
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = array("q", [0])
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def append(self, s: str) -> None:
+        self._data += s.encode("utf-8")
+        self._offsets.append(len(self._data))
+
+    def get(self, i: int) -> str:
+        return self._data[self._offsets[i]:self._offsets[i + 1]].decode("utf-8")
+
+    def nbytes(self) -> int:
+        return len(self._data) + self._offsets.itemsize * len(self._offsets)
+
+
+class _Interner:
+    """
+    반복되는 값 (doc_id, metadata) 을 정수 코드로. 값 하나당 한 번만 저장
+    """
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+
+    def code(self, key: Any, make_value=None) -> int:
+        c = self._codes.get(key)
+        if c is None:
+            c = self._codes[key] = len(self.values)
+            self.values.append(make_value() if make_value is not None else key)
+        return c
+
+
+def _metadata_key(md: Mapping[str, Any]) -> str:
+    return json.dumps(dict(md), sort_keys=True, ensure_ascii=False, default=str)
+
+
+class ChunkTable:
+    """
+    스토어 내부용 열 지향 청크 테이블 (행 번호 = 스토어 행 번호)
+    - id / text: _StringColumn, doc_id / metadata: interning 후 array('i') 코드
+    - 검색은 행 번호만 다루고, 최종 top-k 에서만 chunk(row) 로 Chunk 객체를 만듦
+    - metadata 는 내용이 같으면 하나의 읽기 전용 매핑을 공유
+    - 삭제는 스토어의 alive 마스크로 처리하고, compaction 때 take(rows) 로 새 테이블
+    """
+
+    __slots__ = ("_ids", "_texts", "_docs", "_doc_codes", "_metas", "_meta_codes", "_last_md", "_last_md_code")
+
+    def __init__(self):
+        self._ids = _StringColumn()
+        self._texts = _StringColumn()
+        self._docs = _Interner()
+        self._doc_codes = array("i")
+        self._metas = _Interner()
+        self._meta_codes = array("i")
+        self._last_md: Optional[Mapping[str, Any]] = None
+        self._last_md_code = -1
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def append(self, chunks: Iterable[Chunk]) -> int:
+        """
+        청크들을 뒤에 추가하고 첫 행 번호를 반환
+        """
+        start = len(self)
+        for c in chunks:
+            self._ids.append(c.id)
+            self._texts.append(c.text)
+            self._doc_codes.append(self._docs.code(c.doc_id))
+            self._meta_codes.append(self._metadata_code(c.metadata))
+        return start
+
+    def _metadata_code(self, md: Mapping[str, Any]) -> int:
+        # 같은 문서의 청크는 보통 같은 매핑 객체를 공유 -> 직렬화 없이 바로 재사용
+        if md is self._last_md:
+            return self._last_md_code
+        code = self._metas.code(_metadata_key(md), lambda: MappingProxyType(dict(md)))
+        self._last_md, self._last_md_code = md, code
+        return code
+
+    def id(self, row: int) -> str:
+        return self._ids.get(row)
+
+    def metadata(self, row: int) -> Mapping[str, Any]:
+        return self._metas.values[self._meta_codes[row]]
+
+    def chunk(self, row: int) -> Chunk:
+        return Chunk(
+            id=self._ids.get(row),
+            doc_id=self._docs.values[self._doc_codes[row]],
+            text=self._texts.get(row),
+            metadata=self.metadata(row),
+        )
+
+    def chunks(self, rows: Iterable[int]) -> List[Chunk]:
+        return [self.chunk(r) for r in rows]
+
+    def take(self, rows: Sequence[int]) -> "ChunkTable":
+        """
+        rows 순서대로 골라 새 테이블 (compaction 용). intern 된 값은 다시 intern
+        """
+        out = ChunkTable()
+        out.append(self.chunk(r) for r in rows)
+        return out
+
+    def nbytes(self) -> int:
+        """
+        열 버퍼 크기 (intern 된 doc_id / metadata 객체 제외)
+        """
+        return (
+            self._ids.nbytes()
+            + self._texts.nbytes()
+            + self._doc_codes.itemsize * len(self._doc_codes)
+            + self._meta_codes.itemsize * len(self._meta_codes)
+        )
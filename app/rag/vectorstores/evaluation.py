@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+from app.rag.vectorstores.base import VectorStore
+from app.rag.vectorstores.scoring import VectorLike
+
+
+def recall_at_k(
+    store: VectorStore,
+    exact: VectorStore,
+    query_vectors: Sequence[VectorLike],
+    *,
+    k: int = 10,
+) -> float:
+    """
+    근사 스토어(store)의 top-k 가 정확 스토어(exact)의 top-k 를 얼마나 포함하는지 평균
+    두 스토어에는 같은 청크가 들어있어야 함
+    """
+    total = 0
+    hit = 0
+    for q in query_vectors:
+        truth = {m.chunk.id for m in exact.similarity_search(query_vector=q, top_k=k)}
+        if not truth:
+            continue
+        got = {m.chunk.id for m in store.similarity_search(query_vector=q, top_k=k)}
+        hit += len(truth & got)
+        total += len(truth)
+    return hit / total if total else 1.0
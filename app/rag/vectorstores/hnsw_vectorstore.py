@@ -0,0 +1,466 @@
+from __future__ import annotations
+
+import heapq
+import math
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from app.rag.types import Chunk, ScoredChunk, Vector
+from app.rag.vectorstores.base import VectorStore
+from app.rag.vectorstores.chunk_table import ChunkTable
+from app.rag.vectorstores.metadata_index import MetadataIndex
+from app.rag.vectorstores.scoring import (
+    Metric,
+    as_matrix,
+    as_vector,
+    check_metric,
+    prepare_query,
+    prepare_rows,
+    score_rows,
+    top_k_indices,
+)
+
+
+class _Graph(NamedTuple):
+    """
+    검색이 한 번 읽어서 끝까지 쓰는 그래프 상태 (MemoryVectorStore._Generation 과 같은 방식)
+    - 노드 [0, size) 의 벡터/alive 는 이 상태 안에서 바뀌지 않음. 삭제/재할당은 새 배열로
+    - links 의 이웃 리스트는 삽입 중에 늘어나지만, 검색은 size 이상인 노드를 건너뜀
+    """
+    vectors: Optional[np.ndarray]
+    alive: np.ndarray
+    size: int
+    dead: int
+    # links[node][level] = 이웃 노드 번호 리스트
+    links: List[List[List[int]]]
+    table: ChunkTable
+    meta: MetadataIndex
+    entry: int
+    max_level: int
+
+
+class HNSWVectorStore(VectorStore):
+    """
+    HNSW(Hierarchical Navigable Small World) 근사 최근접 이웃 스토어 (pure Python + NumPy)
+    - M: 노드당 이웃 수 (layer 0 은 2*M)
+    - ef_construction: 삽입 시 후보 리스트 크기 (클수록 그래프 품질↑, 삽입 속도↓)
+    - ef_search: 검색 시 후보 리스트 크기 (클수록 recall↑, 지연↑)
+    - upsert 는 증분 삽입. 삭제는 tombstone 으로 처리하고 그래프 탐색에는 계속 사용
+    - filters: MetadataIndex 후보가 brute_force_limit 이하면 그 행만 정확 검색,
+      많으면 그래프 탐색 결과를 후보 마스크로 거름
+    - 쓰기는 _write_lock 으로 직렬화하고 완성된 상태를 self._graph 로 공개 (참조 한 번 대입)
+      검색은 self._graph 를 한 번 읽어서 사용
+    """
+
+    def __init__(
+        self,
+        *,
+        dim: Optional[int] = None,
+        metric: Metric = "cosine",
+        M: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        seed: int = 0,
+        initial_capacity: int = 1024,
+        brute_force_limit: int = 20000,
+    ):
+        if M < 2:
+            raise ValueError("M must be >= 2")
+        self._metric: Metric = check_metric(metric)
+        self._dim: Optional[int] = dim
+        self.M = M
+        self.ef_construction = max(ef_construction, M)
+        self.ef_search = ef_search
+        self.brute_force_limit = brute_force_limit
+        self._max_m0 = 2 * M
+        self._level_mult = 1.0 / math.log(M)
+        self._rng = np.random.default_rng(seed)
+
+        self._capacity = max(1, initial_capacity)
+        self._graph = _Graph(
+            vectors=None,
+            alive=np.zeros(self._capacity, dtype=bool),
+            size=0,
+            dead=0,
+            links=[],
+            table=ChunkTable(),
+            meta=MetadataIndex(),
+            entry=-1,
+            max_level=-1,
+        )
+        self._nodes_by_source: Dict[str, List[int]] = {}
+
+        self._write_lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 스냅샷(pickle) 용: lock 은 빼고 복원할 때 새로 만듦
+        with self._write_lock:
+            state = dict(self.__dict__)
+        state.pop("_write_lock")
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._write_lock = threading.Lock()
+
+    @property
+    def metric(self) -> Metric:
+        return self._metric
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._dim
+
+    def __len__(self) -> int:
+        g = self._graph
+        return g.size - g.dead
+
+    def upsert(self, *, source_id: str, chunks: List[Chunk], vectors: List[Vector]) -> None:
+        if len(chunks) != len(vectors):
+            raise ValueError("chunks and vectors length mismatch")
+        m = as_matrix(vectors, self._dim) if chunks else None
+
+        with self._write_lock:
+            self._delete_locked(source_id)
+            self._append_locked(source_id, chunks, m)
+
+    def delete(self, *, source_id: str) -> int:
+        with self._write_lock:
+            return self._delete_locked(source_id)
+
+    def chunk_ids(self, *, source_id: str) -> Set[str]:
+        with self._write_lock:
+            table = self._graph.table
+            return {table.id(n) for n in self._nodes_by_source.get(source_id, ())}
+
+    def apply_delta(
+        self,
+        *,
+        source_id: str,
+        chunks: List[Chunk],
+        vectors: List[Vector],
+        remove_ids: Iterable[str],
+    ) -> None:
+        if len(chunks) != len(vectors):
+            raise ValueError("chunks and vectors length mismatch")
+        m = as_matrix(vectors, self._dim) if chunks else None
+        remove = set(remove_ids)
+
+        with self._write_lock:
+            nodes = self._nodes_by_source.get(source_id, [])
+            if remove and nodes:
+                table = self._graph.table
+                gone = [n for n in nodes if table.id(n) in remove]
+                kept = [n for n in nodes if table.id(n) not in remove]
+                if kept:
+                    self._nodes_by_source[source_id] = kept
+                else:
+                    self._nodes_by_source.pop(source_id)
+                self._remove_nodes_locked(gone)
+            self._append_locked(source_id, chunks, m)
+
+    def _append_locked(self, source_id: str, chunks: List[Chunk], m: Optional[np.ndarray]) -> None:
+        if m is None:
+            return
+        if self._dim is None:
+            self._dim = int(m.shape[1])
+        m = prepare_rows(m, self._metric)
+
+        nodes = self._nodes_by_source.setdefault(source_id, [])
+        for chunk, v in zip(chunks, m):
+            # 노드 하나씩 공개: 검색은 삽입이 끝난 노드까지만 봄
+            self._graph = self._insert(self._graph, chunk, v)
+            nodes.append(self._graph.size - 1)
+
+    def similarity_search(
+        self,
+        *,
+        query_vector: Vector,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[ScoredChunk]:
+        g = self._graph
+        live = g.size - g.dead
+        if g.entry < 0 or live == 0 or top_k <= 0:
+            return []
+
+        q = prepare_query(as_vector(query_vector, self._dim), self._metric)
+        size = g.size
+        mask = None
+        if filters:
+            mask = g.meta.resolve(filters, size) & g.alive[:size]
+            rows = np.flatnonzero(mask)
+            if rows.size <= self.brute_force_limit:
+                return self._exact_search(g, q, rows, top_k, score_threshold)
+
+        ef = max(self.ef_search, top_k)
+        if g.dead:
+            # tombstone 비율만큼 후보를 늘려서 살아있는 결과 수를 유지
+            ef = int(ef * size / live) + 1
+        if mask is not None:
+            # 필터를 통과하는 비율만큼 후보를 늘림
+            ef = int(ef * size / max(1, int(mask.sum()))) + 1
+
+        found = self._search(g, q, ef)
+
+        out: List[ScoredChunk] = []
+        for dist, node in found:
+            if not g.alive[node]:
+                continue
+            if mask is not None and not mask[node]:
+                continue
+            score = -dist
+            if score_threshold is not None and score < score_threshold:
+                break
+            out.append(ScoredChunk(chunk=g.table.chunk(node), score=score))
+            if len(out) >= top_k:
+                break
+        return out
+
+    def _exact_search(
+        self,
+        g: _Graph,
+        q: np.ndarray,
+        rows: np.ndarray,
+        top_k: int,
+        score_threshold: Optional[float],
+    ) -> List[ScoredChunk]:
+        if rows.size == 0:
+            return []
+        scores = score_rows(g.vectors[rows], q, self._metric)
+        out: List[ScoredChunk] = []
+        for i in top_k_indices(scores, top_k):
+            s = float(scores[i])
+            if score_threshold is not None and s < score_threshold:
+                break
+            out.append(ScoredChunk(chunk=g.table.chunk(int(rows[i])), score=s))
+        return out
+
+    def _delete_locked(self, source_id: str) -> int:
+        nodes = self._nodes_by_source.pop(source_id, None)
+        if not nodes:
+            return 0
+        self._remove_nodes_locked(nodes)
+        return len(nodes)
+
+    def _remove_nodes_locked(self, nodes: List[int]) -> None:
+        if not nodes:
+            return
+        g = self._graph
+        # 진행 중인 검색이 보는 alive 는 그대로 두고 새 배열로
+        alive = g.alive.copy()
+        alive[nodes] = False
+        g = g._replace(alive=alive, dead=g.dead + len(nodes))
+        if g.dead > 1024 and g.dead * 2 > g.size:
+            self._rebuild_locked(g)
+        else:
+            self._graph = g
+
+    def _rebuild_locked(self, g: _Graph) -> None:
+        """
+        tombstone 이 절반을 넘으면 살아있는 노드만으로 그래프를 다시 만듦
+        """
+        fresh = HNSWVectorStore(
+            dim=self._dim,
+            metric=self._metric,
+            M=self.M,
+            ef_construction=self.ef_construction,
+            ef_search=self.ef_search,
+            initial_capacity=max(self._capacity, g.size - g.dead),
+            brute_force_limit=self.brute_force_limit,
+        )
+        fresh._rng = self._rng
+        built = fresh._graph
+        nodes_by_source: Dict[str, List[int]] = {}
+        for source_id, nodes in self._nodes_by_source.items():
+            ids = []
+            for n in nodes:
+                built = fresh._insert(built, g.table.chunk(n), g.vectors[n])
+                ids.append(built.size - 1)
+            nodes_by_source[source_id] = ids
+
+        # 검색 스레드가 중간 상태를 보지 않도록 완성된 그래프를 참조 한 번으로 교체
+        self._nodes_by_source = nodes_by_source
+        self._graph = built
+
+    def _distances(self, g: _Graph, q: np.ndarray, nodes: List[int]) -> np.ndarray:
+        """
+        거리 = -유사도 (작을수록 가까움). cosine/dot 은 -내적, l2 는 유클리드 거리
+        """
+        rows = g.vectors[nodes]
+        if self._metric == "l2":
+            diff = rows - q
+            return np.sqrt(np.einsum("ij,ij->i", diff, diff))
+        return -(rows @ q)
+
+    def _insert(self, g: _Graph, chunk: Chunk, v: np.ndarray) -> _Graph:
+        """
+        노드 하나를 넣은 새 상태를 반환 (쓰기 lock 안에서만 호출)
+        이웃 리스트는 제자리에서 갱신되지만 새 노드 번호(= g.size)는 공개 전 상태의 검색에서 건너뜀
+        """
+        node = g.size
+        g = self._reserve(g, node + 1)
+        g.vectors[node] = v
+        g.alive[node] = True
+
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        g.links.append([[] for _ in range(level + 1)])
+        g.table.append((chunk,))
+        g.meta.add(node, chunk.metadata)
+        g = g._replace(size=node + 1)
+
+        if g.entry < 0:
+            return g._replace(entry=node, max_level=level)
+
+        ep = g.entry
+        ep_dist = float(self._distances(g, v, [ep])[0])
+        for lc in range(g.max_level, level, -1):
+            ep, ep_dist = self._greedy(g, v, ep, ep_dist, lc)
+
+        entry_points = [(ep_dist, ep)]
+        for lc in range(min(level, g.max_level), -1, -1):
+            candidates = self._search_layer(g, v, entry_points, self.ef_construction, lc)
+            max_m = self._max_m0 if lc == 0 else self.M
+            neighbours = self._select_neighbours(g, candidates, self.M)
+            g.links[node][lc] = neighbours
+            for nb in neighbours:
+                nb_links = g.links[nb][lc]
+                nb_links.append(node)
+                if len(nb_links) > max_m:
+                    self._shrink(g, nb, lc, max_m)
+            entry_points = candidates
+
+        if level > g.max_level:
+            g = g._replace(entry=node, max_level=level)
+        return g
+
+    def _shrink(self, g: _Graph, node: int, level: int, max_m: int) -> None:
+        links = g.links[node][level]
+        d = self._distances(g, g.vectors[node], links)
+        cands = sorted(zip(d.tolist(), links))
+        # 리스트를 통째로 바꿔 끼움 (읽는 쪽은 이전 리스트나 새 리스트 중 하나를 봄)
+        g.links[node][level] = self._select_neighbours(g, cands, max_m)
+
+    def _select_neighbours(self, g: _Graph, candidates: List[Tuple[float, int]], m: int) -> List[int]:
+        """
+        HNSW 논문 heuristic: 이미 고른 이웃보다 후보에 더 가까운 경우만 채택해서
+        그래프가 한 방향으로 뭉치지 않게 함. 모자라면 가까운 순으로 채움
+        """
+        if len(candidates) <= m:
+            return [n for _, n in candidates]
+
+        # 후보끼리의 거리를 한 번의 행렬곱으로 계산
+        nodes = [n for _, n in candidates]
+        rows = g.vectors[nodes]
+        if self._metric == "l2":
+            sq = np.einsum("ij,ij->i", rows, rows)
+            pair = np.sqrt(np.maximum(sq[:, None] + sq[None, :] - 2.0 * (rows @ rows.T), 0.0))
+        else:
+            pair = -(rows @ rows.T)
+
+        # closest[i] = 후보 i 와 지금까지 채택된 이웃 사이의 최소 거리
+        closest = np.full(len(nodes), np.inf, dtype=pair.dtype)
+        selected: List[int] = []
+        skipped: List[int] = []
+        for i, (dist, _) in enumerate(candidates):
+            if len(selected) >= m:
+                break
+            if closest[i] < dist:
+                skipped.append(i)
+                continue
+            selected.append(i)
+            np.minimum(closest, pair[i], out=closest)
+
+        for i in skipped:
+            if len(selected) >= m:
+                break
+            selected.append(i)
+        return [nodes[i] for i in selected]
+
+    @staticmethod
+    def _neighbours(g: _Graph, node: int, level: int) -> List[int]:
+        # 공개 전 노드(삽입 중인 다른 쓰기)는 제외
+        links = g.links[node]
+        if level >= len(links):
+            return []
+        return [n for n in links[level] if n < g.size]
+
+    def _greedy(self, g: _Graph, q: np.ndarray, ep: int, ep_dist: float, level: int) -> Tuple[int, float]:
+        changed = True
+        while changed:
+            changed = False
+            links = self._neighbours(g, ep, level)
+            if not links:
+                break
+            d = self._distances(g, q, links)
+            i = int(np.argmin(d))
+            if d[i] < ep_dist:
+                ep, ep_dist = links[i], float(d[i])
+                changed = True
+        return ep, ep_dist
+
+    def _search_layer(
+        self,
+        g: _Graph,
+        q: np.ndarray,
+        entry_points: List[Tuple[float, int]],
+        ef: int,
+        level: int,
+    ) -> List[Tuple[float, int]]:
+        """
+        ef 크기 beam search. 반환: (거리, 노드) 오름차순
+        """
+        visited = {n for _, n in entry_points}
+        candidates = list(entry_points)
+        heapq.heapify(candidates)
+        # results: max-heap (거리 부호 반전)
+        results = [(-d, n) for d, n in entry_points]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            dist, node = heapq.heappop(candidates)
+            if dist > -results[0][0] and len(results) >= ef:
+                break
+            fresh = [n for n in self._neighbours(g, node, level) if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            d = self._distances(g, q, fresh)
+            worst = -results[0][0]
+            for nd, n in zip(d.tolist(), fresh):
+                if len(results) < ef or nd < worst:
+                    heapq.heappush(candidates, (nd, n))
+                    heapq.heappush(results, (-nd, n))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+                    worst = -results[0][0]
+
+        return sorted((-d, n) for d, n in results)
+
+    def _search(self, g: _Graph, q: np.ndarray, ef: int) -> List[Tuple[float, int]]:
+        ep = g.entry
+        ep_dist = float(self._distances(g, q, [ep])[0])
+        for lc in range(g.max_level, 0, -1):
+            ep, ep_dist = self._greedy(g, q, ep, ep_dist, lc)
+        return self._search_layer(g, q, [(ep_dist, ep)], ef, 0)
+
+    def _reserve(self, g: _Graph, n: int) -> _Graph:
+        """
+        용량이 모자라면 vectors/alive 를 함께 키운 상태를 반환 (두 배열이 항상 같은 상태에 묶임)
+        """
+        if g.vectors is not None and n <= g.vectors.shape[0]:
+            return g
+        cap = self._capacity if g.vectors is None else g.vectors.shape[0]
+        while cap < n:
+            cap *= 2
+        vectors = np.zeros((cap, self._dim), dtype=np.float32)
+        alive = np.zeros(cap, dtype=bool)
+        if g.vectors is not None:
+            vectors[:g.size] = g.vectors[:g.size]
+            alive[:g.size] = g.alive[:g.size]
+        return g._replace(vectors=vectors, alive=alive)
@@ -0,0 +1,538 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from app.rag.types import Chunk, ScoredChunk, Vector
+from app.rag.vectorstores.base import VectorStore
+from app.rag.vectorstores.chunk_table import ChunkTable
+from app.rag.vectorstores.metadata_index import MetadataIndex
+from app.rag.vectorstores.scoring import (
+    Metric,
+    as_matrix,
+    as_vector,
+    check_metric,
+    prepare_query,
+    prepare_rows,
+    score_rows,
+    top_k_indices,
+)
+
+
+def _kmeans(x: np.ndarray, k: int, *, iters: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Lloyd k-means (유클리드). 빈 클러스터는 임의의 점으로 다시 시드
+    """
+    n = x.shape[0]
+    k = min(k, n)
+    centroids = x[rng.choice(n, size=k, replace=False)].copy()
+    x_sq = np.einsum("ij,ij->i", x, x)
+    for _ in range(iters):
+        c_sq = np.einsum("ij,ij->i", centroids, centroids)
+        d2 = x_sq[:, None] - 2.0 * (x @ centroids.T) + c_sq[None, :]
+        assign = np.argmin(d2, axis=1)
+
+        counts = np.bincount(assign, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        empty = counts == 0
+        centroids = sums / np.maximum(counts, 1)[:, None]
+        if empty.any():
+            centroids[empty] = x[rng.choice(n, size=int(empty.sum()), replace=False)]
+    return centroids.astype(np.float32)
+
+
+def _nearest(x: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    c_sq = np.einsum("ij,ij->i", centroids, centroids)
+    return np.argmin(c_sq[None, :] - 2.0 * (x @ centroids.T), axis=1)
+
+
+class _State(NamedTuple):
+    """
+    검색이 한 번 읽어서 끝까지 쓰는 스토어 상태 (MemoryVectorStore._Generation 과 같은 방식)
+    - 행 [0, size) 와 리스트 [0, list_len[c]) 는 이 상태 안에서 바뀌지 않음
+      추가는 빈 칸에 쓰고 새 상태 공개, 삭제/재할당/학습/compaction 은 새 배열로
+    """
+    raw: Optional[np.ndarray]  # 학습 전 또는 rerank 용 원본 벡터
+    codes: Optional[np.ndarray]  # (cap, m) uint8
+    assign: Optional[np.ndarray]  # (cap,) int32
+    alive: np.ndarray
+    size: int
+    dead: int
+    table: ChunkTable
+    meta: MetadataIndex
+    centroids: Optional[np.ndarray]  # (nlist, dim)
+    codebooks: Optional[np.ndarray]  # (m, 256, dim/m)
+    lists: List[np.ndarray]
+    list_len: List[int]
+
+
+class IVFPQVectorStore(VectorStore):
+    """
+    IVF(역파일) + PQ(product quantization) 압축 벡터 스토어
+    - nlist 개의 coarse centroid 로 공간을 나누고, 각 벡터는 centroid 대비 residual 을
+      m 개 부분공간 x 256 centroid 코드북으로 양자화해서 uint8 코드 m 바이트로 저장
+    - 검색: 가까운 nprobe 개 리스트만 보고 ADC(asymmetric distance, LUT 합) 로 점수
+    - rerank=True 면 원본 float32 를 유지하고 ADC shortlist 를 정확 점수로 재정렬
+    - train_size 개가 모일 때까지는 원본으로 정확 검색, 이후 자동 학습 (또는 train() 직접 호출)
+    - 쓰기는 _write_lock 으로 직렬화하고 완성된 상태를 self._state 로 공개. 검색은 self._state 를 한 번 읽어서 사용
+    """
+
+    def __init__(
+        self,
+        *,
+        dim: Optional[int] = None,
+        metric: Metric = "cosine",
+        nlist: int = 256,
+        m: int = 8,
+        nprobe: int = 8,
+        rerank: bool = False,
+        rerank_factor: int = 4,
+        train_size: Optional[int] = None,
+        kmeans_iters: int = 20,
+        seed: int = 0,
+        initial_capacity: int = 1024,
+    ):
+        if m <= 0:
+            raise ValueError("m must be positive")
+        self._metric: Metric = check_metric(metric)
+        self.nlist = nlist
+        self.m = m
+        if dim is not None:
+            self._check_dim(dim)
+        self._dim: Optional[int] = dim
+        self.nprobe = nprobe
+        self.rerank = rerank
+        self.rerank_factor = max(1, rerank_factor)
+        self.train_size = train_size or max(nlist * 32, 256 * 16)
+        self.kmeans_iters = kmeans_iters
+        self._rng = np.random.default_rng(seed)
+
+        self._capacity = max(1, initial_capacity)
+        self._state = _State(
+            raw=None,
+            codes=None,
+            assign=None,
+            alive=np.zeros(self._capacity, dtype=bool),
+            size=0,
+            dead=0,
+            table=ChunkTable(),
+            meta=MetadataIndex(),
+            centroids=None,
+            codebooks=None,
+            lists=[],
+            list_len=[],
+        )
+        self._rows_by_source: Dict[str, List[int]] = {}
+
+        self._write_lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 스냅샷(pickle) 용: lock 은 빼고 복원할 때 새로 만듦
+        with self._write_lock:
+            state = dict(self.__dict__)
+        state.pop("_write_lock")
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._write_lock = threading.Lock()
+
+    @property
+    def metric(self) -> Metric:
+        return self._metric
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._dim
+
+    @property
+    def is_trained(self) -> bool:
+        return self._state.centroids is not None
+
+    def __len__(self) -> int:
+        st = self._state
+        return st.size - st.dead
+
+    def memory_bytes(self) -> int:
+        """
+        벡터 저장에 쓰는 바이트 수 (청크 객체 제외)
+        """
+        st = self._state
+        total = st.alive.nbytes
+        for arr in (st.raw, st.codes, st.assign, st.centroids, st.codebooks):
+            if arr is not None:
+                total += arr.nbytes
+        total += sum(a.nbytes for a in st.lists)
+        return total
+
+    def _check_dim(self, dim: int) -> None:
+        # 쓰기 전에 확인 (학습 시점에 알게 되면 이미 들어간 행을 되돌릴 수 없음)
+        if dim % self.m != 0:
+            raise ValueError(f"dim {dim} is not divisible by m={self.m}")
+
+    def upsert(self, *, source_id: str, chunks: List[Chunk], vectors: List[Vector]) -> None:
+        if len(chunks) != len(vectors):
+            raise ValueError("chunks and vectors length mismatch")
+        x = as_matrix(vectors, self._dim) if chunks else None
+
+        with self._write_lock:
+            self._delete_locked(source_id)
+            self._append_locked(source_id, chunks, x)
+
+    def delete(self, *, source_id: str) -> int:
+        with self._write_lock:
+            return self._delete_locked(source_id)
+
+    def chunk_ids(self, *, source_id: str) -> Set[str]:
+        with self._write_lock:
+            table = self._state.table
+            return {table.id(r) for r in self._rows_by_source.get(source_id, ())}
+
+    def apply_delta(
+        self,
+        *,
+        source_id: str,
+        chunks: List[Chunk],
+        vectors: List[Vector],
+        remove_ids: Iterable[str],
+    ) -> None:
+        if len(chunks) != len(vectors):
+            raise ValueError("chunks and vectors length mismatch")
+        x = as_matrix(vectors, self._dim) if chunks else None
+        remove = set(remove_ids)
+
+        with self._write_lock:
+            rows = self._rows_by_source.get(source_id, [])
+            if remove and rows:
+                table = self._state.table
+                gone = [r for r in rows if table.id(r) in remove]
+                kept = [r for r in rows if table.id(r) not in remove]
+                if kept:
+                    self._rows_by_source[source_id] = kept
+                else:
+                    self._rows_by_source.pop(source_id)
+                self._remove_rows_locked(gone)
+            self._append_locked(source_id, chunks, x)
+
+    def _append_locked(self, source_id: str, chunks: List[Chunk], x: Optional[np.ndarray]) -> None:
+        if x is None:
+            return
+        if self._dim is None:
+            self._check_dim(int(x.shape[1]))
+            self._dim = int(x.shape[1])
+        x = prepare_rows(x, self._metric)
+
+        st = self._state
+        start = st.size
+        n = x.shape[0]
+        st = self._reserve(st, start + n)
+        # [start, start + n) 는 공개된 상태의 size 밖이라 검색이 읽지 않음
+        if st.raw is not None:
+            st.raw[start:start + n] = x
+        if st.centroids is not None:
+            st = self._encode_rows(st, start, x)
+        st.alive[start:start + n] = True
+        st.table.append(chunks)
+        st.meta.add_rows(start, (c.metadata for c in chunks))
+        st = st._replace(size=start + n)
+
+        self._rows_by_source.setdefault(source_id, []).extend(range(start, start + n))
+        self._state = st
+
+        if st.centroids is None and st.size - st.dead >= self.train_size:
+            self._state = self._trained(st, st.raw[:st.size][st.alive[:st.size]])
+
+    def train(self, vectors: Optional[List[Vector]] = None) -> None:
+        """
+        coarse centroid 와 PQ 코드북 학습. vectors 가 없으면 현재 저장된 벡터로 학습
+        rerank=False 로 이미 학습된 스토어는 원본이 없으므로 vectors 를 줘야 재학습 가능
+        (저장된 행은 기존 코드를 복원한 근사 벡터로 다시 인코딩)
+        """
+        with self._write_lock:
+            st = self._state
+            if vectors is not None:
+                x = prepare_rows(as_matrix(vectors, self._dim), self._metric)
+                if self._dim is None:
+                    self._check_dim(int(x.shape[1]))
+                    self._dim = int(x.shape[1])
+                    st = self._reserve(st, self._capacity)
+            elif st.raw is not None and st.size - st.dead > 0:
+                x = st.raw[:st.size][st.alive[:st.size]]
+            elif st.centroids is not None and st.size - st.dead > 0:
+                raise ValueError("raw vectors are not kept when rerank=False; pass vectors= to retrain")
+            else:
+                raise ValueError("no vectors to train on")
+            self._state = self._trained(st, x)
+
+    def similarity_search(
+        self,
+        *,
+        query_vector: Vector,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[ScoredChunk]:
+        st = self._state
+        if st.size - st.dead == 0 or top_k <= 0:
+            return []
+
+        q = prepare_query(as_vector(query_vector, self._dim), self._metric)
+        size = st.size
+        mask = st.alive[:size].copy()
+        if filters:
+            mask &= st.meta.resolve(filters, size)
+            if not mask.any():
+                return []
+
+        trained = st.centroids is not None
+        if trained:
+            rows, scores = self._adc_candidates(st, q)
+        else:
+            rows = np.flatnonzero(mask)
+            scores = score_rows(st.raw[rows], q, self._metric)
+
+        in_range = rows < size
+        rows, scores = rows[in_range], scores[in_range]
+        keep = mask[rows]
+        rows, scores = rows[keep], scores[keep]
+        if rows.size == 0:
+            return []
+
+        if trained and self.rerank:
+            short = top_k_indices(scores, top_k * self.rerank_factor)
+            rows = rows[short]
+            scores = score_rows(st.raw[rows], q, self._metric)
+
+        out: List[ScoredChunk] = []
+        for i in top_k_indices(scores, top_k):
+            s = float(scores[i])
+            if score_threshold is not None and s < score_threshold:
+                break
+            out.append(ScoredChunk(chunk=st.table.chunk(int(rows[i])), score=s))
+        return out
+
+    def _adc_candidates(self, st: _State, q: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        coarse = score_rows(st.centroids, q, self._metric)
+        probe = top_k_indices(coarse, min(self.nprobe, st.centroids.shape[0]))
+
+        sub = q.reshape(self.m, -1)
+        if self._metric != "l2":
+            # 내적은 residual 분해가 선형이라 LUT 를 리스트끼리 공유: q·x = q·c + Σ q_j·r_j
+            lut = np.einsum("jkd,jd->jk", st.codebooks, sub)
+
+        all_rows: List[np.ndarray] = []
+        all_scores: List[np.ndarray] = []
+        ar = np.arange(self.m)
+        for c in probe:
+            n = st.list_len[c]
+            if n == 0:
+                continue
+            rows = st.lists[c][:n]
+            codes = st.codes[rows]
+            if self._metric == "l2":
+                # ||q - c - r||^2 = Σ_j ||(q - c)_j - r_j||^2
+                qr = (q - st.centroids[c]).reshape(self.m, -1)
+                diff = st.codebooks - qr[:, None, :]
+                lut_c = np.einsum("jkd,jkd->jk", diff, diff)
+                s = -np.sqrt(lut_c[ar, codes].sum(axis=1))
+            else:
+                s = lut[ar, codes].sum(axis=1) + coarse[c]
+            all_rows.append(rows)
+            all_scores.append(s.astype(np.float32, copy=False))
+
+        if not all_rows:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        return np.concatenate(all_rows).astype(np.intp), np.concatenate(all_scores)
+
+    def _decode(self, st: _State) -> np.ndarray:
+        """
+        저장된 코드로 복원한 근사 벡터 [0, size) (원본이 없는 스토어의 재학습용)
+        """
+        size = st.size
+        parts = [st.codebooks[j][st.codes[:size, j]] for j in range(self.m)]
+        return st.centroids[np.maximum(st.assign[:size], 0)] + np.concatenate(parts, axis=1)
+
+    def _trained(self, st: _State, x: np.ndarray) -> _State:
+        """
+        x 로 학습한 centroid/코드북으로 기존 행을 모두 인코딩한 새 상태 (진행 중인 검색은 이전 상태 사용)
+        """
+        if x.shape[0] > self.train_size:
+            x = x[self._rng.choice(x.shape[0], size=self.train_size, replace=False)]
+
+        centroids = _kmeans(x, self.nlist, iters=self.kmeans_iters, rng=self._rng)
+        residuals = x - centroids[_nearest(x, centroids)]
+
+        sub_dim = x.shape[1] // self.m
+        books = np.zeros((self.m, 256, sub_dim), dtype=np.float32)
+        for j in range(self.m):
+            part = np.ascontiguousarray(residuals[:, j * sub_dim:(j + 1) * sub_dim])
+            cb = _kmeans(part, 256, iters=self.kmeans_iters, rng=self._rng)
+            books[j, :cb.shape[0]] = cb
+            if cb.shape[0] < 256:
+                # 학습 점이 256개 미만이면 남는 코드는 첫 centroid 로 채워서 선택되지 않게 함
+                books[j, cb.shape[0]:] = cb[0]
+
+        if st.size == 0:
+            existing = None
+        elif st.raw is not None:
+            existing = st.raw[:st.size]
+        else:
+            existing = self._decode(st)
+
+        nlist = centroids.shape[0]
+        cap = st.alive.shape[0]
+        fresh = st._replace(
+            raw=st.raw if self.rerank else None,
+            codes=np.zeros((cap, self.m), dtype=np.uint8),
+            assign=np.full(cap, -1, dtype=np.int32),
+            centroids=centroids,
+            codebooks=books,
+            lists=[np.empty(16, dtype=np.int32) for _ in range(nlist)],
+            list_len=[0] * nlist,
+        )
+        if existing is not None:
+            fresh = self._encode_rows(fresh, 0, existing, alive_only=True)
+        return fresh
+
+    def _encode_rows(self, st: _State, start: int, x: np.ndarray, *, alive_only: bool = False) -> _State:
+        """
+        행 [start, start + len(x)) 의 코드를 쓰고, 역리스트에 추가한 새 상태를 반환
+        리스트 목록은 복사본을 고침 (공개된 상태의 list_len 은 그대로)
+        """
+        assign = _nearest(x, st.centroids)
+        residuals = x - st.centroids[assign]
+
+        sub_dim = x.shape[1] // self.m
+        codes = np.empty((x.shape[0], self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = _nearest(
+                np.ascontiguousarray(residuals[:, j * sub_dim:(j + 1) * sub_dim]),
+                st.codebooks[j],
+            )
+
+        end = start + x.shape[0]
+        st.codes[start:end] = codes
+        st.assign[start:end] = assign
+
+        rows = np.arange(start, end, dtype=np.int32)
+        if alive_only:
+            live = st.alive[start:end]
+            rows, assign = rows[live], assign[live]
+        lists, list_len = list(st.lists), list(st.list_len)
+        _fill_lists(lists, list_len, rows, assign)
+        return st._replace(lists=lists, list_len=list_len)
+
+    def _delete_locked(self, source_id: str) -> int:
+        rows = self._rows_by_source.pop(source_id, None)
+        if not rows:
+            return 0
+        self._remove_rows_locked(rows)
+        return len(rows)
+
+    def _remove_rows_locked(self, rows: List[int]) -> None:
+        if not rows:
+            return
+        st = self._state
+        # 진행 중인 검색이 보는 alive 는 그대로 두고 새 배열로
+        alive = st.alive.copy()
+        alive[rows] = False
+        st = st._replace(alive=alive, dead=st.dead + len(rows))
+        if st.dead > 1024 and st.dead * 2 > st.size:
+            st = self._compacted_locked(st)
+        self._state = st
+
+    def _reserve(self, st: _State, n: int) -> _State:
+        """
+        용량이 모자라면 행 단위 배열을 모두 새로 할당한 상태를 반환
+        """
+        cap = st.alive.shape[0]
+        if n <= cap and (st.raw is not None or st.centroids is not None):
+            return st
+        while cap < n:
+            cap *= 2
+
+        def grow(arr: Optional[np.ndarray], shape, dtype, fill=0) -> np.ndarray:
+            out = np.full(shape, fill, dtype=dtype)
+            if arr is not None:
+                out[:st.size] = arr[:st.size]
+            return out
+
+        trained = st.centroids is not None
+        return st._replace(
+            alive=grow(st.alive, cap, bool),
+            raw=grow(st.raw, (cap, self._dim), np.float32) if not trained or self.rerank else None,
+            codes=grow(st.codes, (cap, self.m), np.uint8) if trained else None,
+            assign=grow(st.assign, cap, np.int32, -1) if trained else None,
+        )
+
+    def _compacted_locked(self, st: _State) -> _State:
+        """
+        살아있는 행만 새 배열/테이블/색인으로 옮긴 상태 (기존 배열은 건드리지 않음)
+        """
+        keep = np.flatnonzero(st.alive[:st.size])
+        remap = np.full(st.size, -1, dtype=np.intp)
+        remap[keep] = np.arange(keep.size)
+        n = keep.size
+        cap = st.alive.shape[0]
+
+        def take(arr: Optional[np.ndarray], fill=0) -> Optional[np.ndarray]:
+            if arr is None:
+                return None
+            out = np.full((cap,) + arr.shape[1:], fill, dtype=arr.dtype)
+            out[:n] = arr[keep]
+            return out
+
+        alive = np.zeros(cap, dtype=bool)
+        alive[:n] = True
+        table = st.table.take(keep.tolist())
+        meta = MetadataIndex()
+        meta.add_rows(0, (table.metadata(r) for r in range(n)))
+        fresh = st._replace(
+            raw=take(st.raw),
+            codes=take(st.codes),
+            assign=take(st.assign, -1),
+            alive=alive,
+            size=n,
+            dead=0,
+            table=table,
+            meta=meta,
+        )
+        if fresh.centroids is not None:
+            nlist = fresh.centroids.shape[0]
+            lists: List[np.ndarray] = [np.empty(16, dtype=np.int32) for _ in range(nlist)]
+            list_len = [0] * nlist
+            _fill_lists(lists, list_len, np.arange(n, dtype=np.int32), fresh.assign[:n])
+            fresh = fresh._replace(lists=lists, list_len=list_len)
+
+        self._rows_by_source = {
+            sid: [int(remap[r]) for r in rows] for sid, rows in self._rows_by_source.items()
+        }
+        return fresh
+
+
+def _fill_lists(lists: List[np.ndarray], list_len: List[int], rows: np.ndarray, assign: np.ndarray) -> None:
+    """
+    rows 를 assign 별 역리스트 뒤에 추가. 자리가 모자란 리스트만 새 배열로 (빈 칸 쓰기는 공개된 길이 밖)
+    """
+    order = np.argsort(assign, kind="stable")
+    rows, assign = rows[order], assign[order]
+    ids, starts = np.unique(assign, return_index=True)
+    bounds = list(starts[1:]) + [rows.size]
+    for c, lo, hi in zip(ids.tolist(), starts.tolist(), bounds):
+        add = rows[lo:hi]
+        n = list_len[c]
+        arr = lists[c]
+        need = n + add.size
+        if need > arr.shape[0]:
+            cap = arr.shape[0]
+            while cap < need:
+                cap *= 2
+            grown = np.empty(cap, dtype=np.int32)
+            grown[:n] = arr[:n]
+            arr = grown
+        arr[n:need] = add
+        lists[c] = arr
+        list_len[c] = need
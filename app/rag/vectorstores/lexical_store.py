@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.rag.retrievers.bm25_index import BM25Index
+from app.rag.types import Chunk, ChunkDelta, ScoredChunk, Vector
+from app.rag.vectorstores.base import VectorStore
+
+
+class LexicalIndexedStore(VectorStore):
+    """
+    벡터 스토어 쓰기를 BM25Index 에도 반영하는 wrapper (검색/조회는 inner 그대로)
+    - 같은 프로세스에서 일어난 쓰기만 색인됨. 다른 프로세스가 WAL 로 쓴 청크(mmap)는 반영 X
+    """
+
+    def __init__(self, inner: VectorStore, lexical: BM25Index):
+        self._inner = inner
+        self._lexical = lexical
+
+    @property
+    def inner(self) -> VectorStore:
+        return self._inner
+
+    @property
+    def lexical(self) -> BM25Index:
+        return self._lexical
+
+    def __len__(self) -> int:
+        return len(self._inner)
+
+    def upsert(self, *, source_id: str, chunks: List[Chunk], vectors: List[Vector]) -> None:
+        self._inner.upsert(source_id=source_id, chunks=chunks, vectors=vectors)
+        self._lexical.remove(source_id)
+        self._lexical.add(source_id, chunks)
+
+    def delete(self, *, source_id: str) -> int:
+        removed = self._inner.delete(source_id=source_id)
+        self._lexical.remove(source_id)
+        return removed
+
+    def chunk_ids(self, *, source_id: str) -> Set[str]:
+        return self._inner.chunk_ids(source_id=source_id)
+
+    def apply_delta(
+        self,
+        *,
+        source_id: str,
+        chunks: List[Chunk],
+        vectors: List[Vector],
+        remove_ids: Iterable[str],
+    ) -> None:
+        remove = set(remove_ids)
+        self._inner.apply_delta(source_id=source_id, chunks=chunks, vectors=vectors, remove_ids=remove)
+        if remove:
+            self._lexical.remove(source_id, remove)
+        self._lexical.add(source_id, chunks)
+
+    def apply_deltas(self, deltas: Sequence[ChunkDelta]) -> None:
+        self._inner.apply_deltas(deltas)
+        for d in deltas:
+            if d.remove_ids:
+                self._lexical.remove(d.source_id, set(d.remove_ids))
+            self._lexical.add(d.source_id, d.chunks)
+
+    def similarity_search(
+        self,
+        *,
+        query_vector: Vector,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[ScoredChunk]:
+        return self._inner.similarity_search(
+            query_vector=query_vector, top_k=top_k, filters=filters, score_threshold=score_threshold
+        )
+
+    def similarity_search_batch(
+        self,
+        *,
+        query_vectors: Sequence[Vector],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[List[ScoredChunk]]:
+        return self._inner.similarity_search_batch(
+            query_vectors=query_vectors, top_k=top_k, filters=filters, score_threshold=score_threshold
+        )
+
+    def similarity_search_with_vectors(
+        self,
+        *,
+        query_vector: Vector,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> Tuple[List[ScoredChunk], Optional[np.ndarray]]:
+        return self._inner.similarity_search_with_vectors(
+            query_vector=query_vector, top_k=top_k, filters=filters, score_threshold=score_threshold
+        )
@@ -1,15 +1,361 @@
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
-from app.rag.types import Chunk, Vector
+import threading
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.rag.types import Chunk, ChunkDelta, ScoredChunk, Vector
 from app.rag.vectorstores.base import VectorStore
+from app.rag.vectorstores.chunk_table import ChunkTable
+from app.rag.vectorstores.metadata_index import MetadataIndex
+from app.rag.vectorstores.scoring import (
+    Metric,
+    as_matrix,
+    as_vector,
+    check_metric,
+    prepare_query,
+    prepare_rows,
+    score_rows,
+    top_k_indices,
+)
+
+
+class _Generation(NamedTuple):
+    """
+    검색이 한 번 읽어서 끝까지 쓰는 스토어 상태
+    - 행 [0, size) 는 이 generation 안에서 바뀌지 않음
+      추가는 size 뒤 빈 칸에 쓰고 새 generation 공개, 삭제/재할당/compaction 은 새 배열로
+    """
+    matrix: Optional[np.ndarray]
+    sq_norms: Optional[np.ndarray]
+    alive: np.ndarray
+    size: int
+    dead: int
+    table: ChunkTable
+    meta: MetadataIndex
 
 
 class MemoryVectorStore(VectorStore):
-    def __init__(self):
-        self._data: Dict[str, List[Tuple[Chunk, Vector]]] = {}
+    """
+    단일 연속 float32 행렬 기반 in-memory 벡터 스토어
+    - 행 i 의 청크 = table 의 i 번째 행 (열 지향 ChunkTable, Chunk 객체는 top-k 에서만 생성)
+    - cosine 은 정규화된 행을 저장해서 검색 = 행렬-벡터 곱 한 번
+    - 삭제는 tombstone(alive=False) 후 죽은 행이 절반을 넘으면 compaction
+    - filters 는 MetadataIndex 로 후보 행을 먼저 고르고 그 행만 점수 계산
+    - 쓰기는 _write_lock 으로 직렬화하고 완성된 상태를 self._gen 으로 공개
+      검색은 self._gen 을 한 번 읽어서 사용 -> ingest 스레드와 검색 스레드가 동시에 돌아도 중간 상태를 보지 않음
+    """
+
+    def __init__(self, *, dim: Optional[int] = None, metric: Metric = "cosine", initial_capacity: int = 1024):
+        self._metric: Metric = check_metric(metric)
+        self._dim: Optional[int] = dim
+        self._capacity = max(1, initial_capacity)
+        self._gen = _Generation(
+            matrix=None,
+            sq_norms=None,
+            alive=np.zeros(self._capacity, dtype=bool),
+            size=0,
+            dead=0,
+            table=ChunkTable(),
+            meta=MetadataIndex(),
+        )
+        self._rows_by_source: Dict[str, array] = {}
+        self._write_lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 스냅샷(pickle) 에는 예약 용량을 빼고 사용 중인 행만. lock 은 복원할 때 새로 만듦
+        with self._write_lock:
+            state = dict(self.__dict__)
+        state.pop("_write_lock")
+        g = state["_gen"]
+        state["_gen"] = g._replace(
+            matrix=None if g.matrix is None else g.matrix[:g.size],
+            sq_norms=None if g.sq_norms is None else g.sq_norms[:g.size],
+            alive=g.alive[:g.size],
+        )
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._write_lock = threading.Lock()
+
+    @property
+    def metric(self) -> Metric:
+        return self._metric
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._dim
+
+    def __len__(self) -> int:
+        g = self._gen
+        return g.size - g.dead
 
     def upsert(self, *, source_id: str, chunks: List[Chunk], vectors: List[Vector]) -> None:
         if len(chunks) != len(vectors):
             raise ValueError("chunks and vectors length mismatch")
-        self._data[source_id] = list(zip(chunks, vectors))
\ No newline at end of file
+        m = as_matrix(vectors, self._dim) if chunks else None
+        with self._write_lock:
+            self._delete_locked(source_id)
+            if m is not None:
+                self._append_groups_locked([(source_id, chunks)], m)
+
+    def delete(self, *, source_id: str) -> int:
+        with self._write_lock:
+            return self._delete_locked(source_id)
+
+    def chunk_ids(self, *, source_id: str) -> Set[str]:
+        with self._write_lock:
+            table = self._gen.table
+            return {table.id(r) for r in self._rows_by_source.get(source_id, ())}
+
+    def apply_delta(
+        self,
+        *,
+        source_id: str,
+        chunks: List[Chunk],
+        vectors: List[Vector],
+        remove_ids: Iterable[str],
+    ) -> None:
+        if len(chunks) != len(vectors):
+            raise ValueError("chunks and vectors length mismatch")
+        m = as_matrix(vectors, self._dim) if chunks else None
+        remove = set(remove_ids)
+        with self._write_lock:
+            self._remove_ids_locked(source_id, remove)
+            if m is not None:
+                self._append_groups_locked([(source_id, chunks)], m)
+
+    def apply_deltas(self, deltas: Sequence[ChunkDelta]) -> None:
+        """
+        삭제는 source 별로, 추가는 모든 delta 의 벡터를 모아 행렬 복사 한 번으로 처리
+        """
+        for d in deltas:
+            if len(d.chunks) != len(d.vectors):
+                raise ValueError("chunks and vectors length mismatch")
+        groups = [(d.source_id, d.chunks) for d in deltas if d.chunks]
+        m = np.concatenate([as_matrix(d.vectors, self._dim) for d in deltas if d.chunks]) if groups else None
+        with self._write_lock:
+            for d in deltas:
+                self._remove_ids_locked(d.source_id, set(d.remove_ids))
+            if m is not None:
+                self._append_groups_locked(groups, m)
+
+    def _delete_locked(self, source_id: str) -> int:
+        rows = self._rows_by_source.pop(source_id, None)
+        if not rows:
+            return 0
+        self._remove_rows_locked(rows)
+        return len(rows)
+
+    def _remove_ids_locked(self, source_id: str, remove: Set[str]) -> None:
+        rows = self._rows_by_source.get(source_id, [])
+        if remove and rows:
+            table = self._gen.table
+            gone = [r for r in rows if table.id(r) in remove]
+            kept = array("i", (r for r in rows if table.id(r) not in remove))
+            if kept:
+                self._rows_by_source[source_id] = kept
+            else:
+                self._rows_by_source.pop(source_id)
+            self._remove_rows_locked(gone)
+
+    def _append_groups_locked(self, groups: List[Tuple[str, List[Chunk]]], m: np.ndarray) -> None:
+        if self._dim is None:
+            self._dim = int(m.shape[1])
+        m = prepare_rows(m, self._metric)
+        n = m.shape[0]
+
+        g = self._reserve_locked(self._gen.size + n)
+        start = g.size
+        # size 뒤쪽 빈 칸이라 공개된 generation 의 검색에는 안 보임
+        g.matrix[start:start + n] = m
+        if g.sq_norms is not None:
+            g.sq_norms[start:start + n] = np.einsum("ij,ij->i", m, m)
+        g.alive[start:start + n] = True
+
+        row = start
+        for source_id, chunks in groups:
+            g.table.append(chunks)
+            self._rows_by_source.setdefault(source_id, array("i")).extend(range(row, row + len(chunks)))
+            g.meta.add_rows(row, (c.metadata for c in chunks))
+            row += len(chunks)
+        self._gen = g._replace(size=start + n)
+
+    def _remove_rows_locked(self, rows: Sequence[int]) -> None:
+        if not rows:
+            return
+        g = self._gen
+        # alive 는 복사 후 교체 (진행 중인 검색은 이전 마스크로 끝남)
+        alive = g.alive.copy()
+        alive[list(rows)] = False
+        g = g._replace(alive=alive, dead=g.dead + len(rows))
+        if g.dead > 1024 and g.dead * 2 > g.size:
+            g = self._compacted_locked(g)
+        self._gen = g
+
+    def items(self) -> Iterator[Tuple[str, List[Chunk], np.ndarray]]:
+        """
+        source 별 (source_id, chunks, 저장된 행 행렬) 순회. 행은 metric 전처리 후 값
+        """
+        with self._write_lock:
+            g = self._gen
+            # rows 배열은 이후 쓰기에서 extend 되므로 복사
+            sources = [(sid, array("i", rows)) for sid, rows in self._rows_by_source.items()]
+        for source_id, rows in sources:
+            yield source_id, g.table.chunks(rows), g.matrix[np.frombuffer(rows, dtype=np.int32)]
+
+    def similarity_search(
+        self,
+        *,
+        query_vector: Vector,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[ScoredChunk]:
+        g = self._gen
+        if g.matrix is None or g.size == g.dead or top_k <= 0:
+            return []
+        hits = self._search_rows(g, query_vector, top_k, filters, score_threshold)
+        return [ScoredChunk(chunk=g.table.chunk(r), score=s) for r, s in hits]
+
+    def similarity_search_with_vectors(
+        self,
+        *,
+        query_vector: Vector,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> Tuple[List[ScoredChunk], Optional[np.ndarray]]:
+        g = self._gen
+        if g.matrix is None or g.size == g.dead or top_k <= 0:
+            return [], None
+        hits = self._search_rows(g, query_vector, top_k, filters, score_threshold)
+        matches = [ScoredChunk(chunk=g.table.chunk(r), score=s) for r, s in hits]
+        return matches, g.matrix[[r for r, _ in hits]]
+
+    def _search_rows(
+        self,
+        g: _Generation,
+        query_vector: Vector,
+        top_k: int,
+        filters: Optional[Dict[str, Any]],
+        score_threshold: Optional[float],
+    ) -> List[Tuple[int, float]]:
+        q = prepare_query(as_vector(query_vector, self._dim), self._metric)
+        rows = self._candidate_rows(g, filters)
+        if rows is None:
+            scores = score_rows(g.matrix[:g.size], q, self._metric, self._l2_norms(g, None))
+            scores[~g.alive[:g.size]] = -np.inf
+        else:
+            if rows.size == 0:
+                return []
+            scores = score_rows(g.matrix[rows], q, self._metric, self._l2_norms(g, rows))
+        return self._collect_rows(scores, rows, top_k, score_threshold)
+
+    def similarity_search_batch(
+        self,
+        *,
+        query_vectors: Sequence[Vector],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[List[ScoredChunk]]:
+        """
+        (n, dim) x (dim, b) 행렬곱 한 번으로 b 개 쿼리 점수 계산 후 열마다 top-k
+        """
+        g = self._gen
+        if g.matrix is None or g.size == g.dead or top_k <= 0 or len(query_vectors) == 0:
+            return [[] for _ in query_vectors]
+
+        qs = prepare_query(as_matrix(query_vectors, self._dim), self._metric)
+        rows = self._candidate_rows(g, filters)
+        if rows is None:
+            scores = score_rows(g.matrix[:g.size], qs.T, self._metric, self._l2_norms(g, None))
+            scores[~g.alive[:g.size]] = -np.inf
+        else:
+            if rows.size == 0:
+                return [[] for _ in query_vectors]
+            scores = score_rows(g.matrix[rows], qs.T, self._metric, self._l2_norms(g, rows))
+
+        return [
+            [ScoredChunk(chunk=g.table.chunk(r), score=s) for r, s in self._collect_rows(scores[:, j], rows, top_k, score_threshold)]
+            for j in range(scores.shape[1])
+        ]
+
+    def _collect_rows(
+        self,
+        scores: np.ndarray,
+        rows: Optional[np.ndarray],
+        top_k: int,
+        score_threshold: Optional[float],
+    ) -> List[Tuple[int, float]]:
+        out: List[Tuple[int, float]] = []
+        for i in top_k_indices(scores, top_k):
+            s = float(scores[i])
+            if s == -np.inf:
+                break
+            if score_threshold is not None and s < score_threshold:
+                break
+            out.append((int(i) if rows is None else int(rows[i]), s))
+        return out
+
+    def _candidate_rows(self, g: _Generation, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        filters 가 없으면 None (= 전체 행). 있으면 조건을 만족하는 살아있는 행 번호 배열.
+        """
+        if not filters:
+            return None
+        mask = g.meta.resolve(filters, g.size)
+        mask &= g.alive[:g.size]
+        return np.flatnonzero(mask)
+
+    def _l2_norms(self, g: _Generation, rows: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        if self._metric != "l2":
+            return None
+        if rows is None:
+            return g.sq_norms[:g.size]
+        return g.sq_norms[rows]
+
+    def _reserve_locked(self, n: int) -> _Generation:
+        g = self._gen
+        if g.matrix is not None and n <= g.matrix.shape[0]:
+            return g
+        cap = self._capacity if g.matrix is None else g.matrix.shape[0]
+        while cap < n:
+            cap *= 2
+        matrix = np.zeros((cap, self._dim), dtype=np.float32)
+        alive = np.zeros(cap, dtype=bool)
+        sq_norms = np.zeros(cap, dtype=np.float32) if self._metric == "l2" else None
+        if g.matrix is not None:
+            matrix[:g.size] = g.matrix[:g.size]
+            alive[:g.size] = g.alive[:g.size]
+            if sq_norms is not None:
+                sq_norms[:g.size] = g.sq_norms[:g.size]
+        return g._replace(matrix=matrix, alive=alive, sq_norms=sq_norms)
+
+    def _compacted_locked(self, g: _Generation) -> _Generation:
+        keep = np.flatnonzero(g.alive[:g.size])
+        remap = np.full(g.size, -1, dtype=np.intp)
+        remap[keep] = np.arange(keep.size)
+
+        n = keep.size
+        cap = g.matrix.shape[0]
+        matrix = np.zeros((cap, self._dim), dtype=np.float32)
+        matrix[:n] = g.matrix[keep]
+        sq_norms = None
+        if g.sq_norms is not None:
+            sq_norms = np.zeros(cap, dtype=np.float32)
+            sq_norms[:n] = g.sq_norms[keep]
+        alive = np.zeros(cap, dtype=bool)
+        alive[:n] = True
+        table = g.table.take(keep.tolist())
+        meta = MetadataIndex()
+        meta.add_rows(0, (table.metadata(r) for r in range(n)))
+        self._rows_by_source = {
+            sid: array("i", remap[np.frombuffer(rows, dtype=np.int32)].astype(np.int32).tobytes())
+            for sid, rows in self._rows_by_source.items()
+        }
+        return _Generation(matrix=matrix, sq_norms=sq_norms, alive=alive, size=n, dead=0, table=table, meta=meta)
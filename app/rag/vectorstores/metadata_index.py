@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from array import array
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from app.core.exceptions import BadRequest
+
+_RANGE_OPS = ("$gt", "$gte", "$lt", "$lte")
+_OPS = ("$eq", "$ne", "$in", "$nin") + _RANGE_OPS
+
+
+def _index_values(value: Any) -> Iterable[Hashable]:
+    """
+    리스트/튜플 값은 원소별로 색인 (tags: ["a", "b"] 는 tags == "a" 로 매칭)
+    """
+    if isinstance(value, (list, tuple)):
+        return [v for v in value if isinstance(v, Hashable)]
+    if isinstance(value, Hashable):
+        return (value,)
+    return ()
+
+
+def _is_number(v: Any) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _check_ops(cond: Dict[str, Any]) -> None:
+    """
+    연산자와 피연산자 형식 검사 (잘못된 필터는 500 이 아니라 400)
+    """
+    for op, arg in cond.items():
+        if op not in _OPS:
+            raise BadRequest(message=f"Unsupported filter operator: {op}", details={"operator": op})
+        if op in _RANGE_OPS and not _is_number(arg):
+            raise BadRequest(
+                message=f"Filter operator {op} requires a number",
+                details={"operator": op, "value": arg},
+            )
+        if op in ("$in", "$nin") and not isinstance(arg, (list, tuple)):
+            raise BadRequest(
+                message=f"Filter operator {op} requires a list",
+                details={"operator": op, "value": arg},
+            )
+
+
+class MetadataIndex:
+    """
+    Chunk.metadata 역색인: key -> value -> 행 번호 posting (array('i'), 행당 4바이트)
+    - 지원 필터: {"k": v} (equality), {"k": {"$eq"|"$ne"|"$in"|"$nin"|"$gt"|"$gte"|"$lt"|"$lte": ...}}
+      여러 key 는 AND
+    - 삭제는 색인에서 지우지 않고 스토어의 alive 마스크와 AND. compaction 때 rebuild
+    - 쓰기(add)는 스토어 쓰기 lock 안에서, 조회는 lock 없이. range 용 정렬 캐시만 _cache_lock 으로 갱신
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[Hashable, array]] = {}
+        self._sorted_numbers: Dict[str, Optional[List[float]]] = {}
+        # key 별 숫자 값 추가 횟수: 정렬 캐시를 만드는 동안 값이 늘었으면 저장하지 않음
+        self._numbers_version: Dict[str, int] = {}
+        self._cache_lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        state.pop("_cache_lock")
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._cache_lock = threading.Lock()
+
+    def add(self, row: int, metadata: Mapping[str, Any]) -> None:
+        for key, value in metadata.items():
+            by_value = self._postings.get(key)
+            if by_value is None:
+                by_value = self._postings[key] = {}
+            for v in _index_values(value):
+                posting = by_value.get(v)
+                if posting is None:
+                    posting = by_value[v] = array("i")
+                    if _is_number(v):
+                        with self._cache_lock:
+                            self._numbers_version[key] = self._numbers_version.get(key, 0) + 1
+                            self._sorted_numbers[key] = None
+                posting.append(row)
+
+    def add_rows(self, start: int, metadatas: Iterable[Mapping[str, Any]]) -> None:
+        for i, md in enumerate(metadatas):
+            self.add(start + i, md)
+
+    def clear(self) -> None:
+        self._postings.clear()
+        with self._cache_lock:
+            self._sorted_numbers.clear()
+            self._numbers_version.clear()
+
+    def resolve(self, filters: Dict[str, Any], n: int) -> np.ndarray:
+        """
+        filters 를 길이 n 의 bool 후보 마스크로 변환 (점수 계산 전에 적용)
+        """
+        mask = np.ones(n, dtype=bool)
+        for key, cond in filters.items():
+            mask &= self._resolve_key(key, cond, n)
+            if not mask.any():
+                break
+        return mask
+
+    def _resolve_key(self, key: str, cond: Any, n: int) -> np.ndarray:
+        if not isinstance(cond, dict):
+            return self._union(key, [cond], n)
+        _check_ops(cond)
+
+        mask = np.ones(n, dtype=bool)
+        if "$eq" in cond:
+            mask &= self._union(key, [cond["$eq"]], n)
+        if "$in" in cond:
+            mask &= self._union(key, cond["$in"], n)
+        if "$ne" in cond:
+            mask &= ~self._union(key, [cond["$ne"]], n)
+        if "$nin" in cond:
+            mask &= ~self._union(key, cond["$nin"], n)
+        ranges = {op: cond[op] for op in _RANGE_OPS if op in cond}
+        if ranges:
+            mask &= self._union(key, self._values_in_range(key, ranges), n)
+        return mask
+
+    def _union(self, key: str, values: Iterable[Any], n: int) -> np.ndarray:
+        mask = np.zeros(n, dtype=bool)
+        by_value = self._postings.get(key)
+        if not by_value:
+            return mask
+        for v in values:
+            if not isinstance(v, Hashable):
+                continue
+            posting = by_value.get(v)
+            if posting:
+                # tobytes 로 복사: 버퍼를 export 한 채로 두면 동시 append 가 BufferError
+                rows = np.frombuffer(posting.tobytes(), dtype=np.int32)
+                mask[rows[rows < n]] = True
+        return mask
+
+    def _values_in_range(self, key: str, cond: Dict[str, Any]) -> List[float]:
+        nums = self._sorted_numbers.get(key)
+        if nums is None:
+            with self._cache_lock:
+                version = self._numbers_version.get(key, 0)
+            # 쓰기가 동시에 값을 추가할 수 있으니 key 목록 복사본으로 정렬 (C 레벨 복사라 도중에 안 바뀜)
+            nums = sorted(v for v in list(self._postings.get(key, {})) if _is_number(v))
+            with self._cache_lock:
+                # 그 사이 새 숫자 값이 들어왔으면 이번 결과는 이번 조회에만 쓰고 캐시하지 않음
+                if self._numbers_version.get(key, 0) == version:
+                    self._sorted_numbers[key] = nums
+        lo, hi = 0, len(nums)
+        if "$gte" in cond:
+            lo = max(lo, bisect.bisect_left(nums, cond["$gte"]))
+        if "$gt" in cond:
+            lo = max(lo, bisect.bisect_right(nums, cond["$gt"]))
+        if "$lte" in cond:
+            hi = min(hi, bisect.bisect_right(nums, cond["$lte"]))
+        if "$lt" in cond:
+            hi = min(hi, bisect.bisect_left(nums, cond["$lt"]))
+        return nums[lo:hi]
@@ -0,0 +1,504 @@
+from __future__ import annotations
+
+import base64
+import fcntl
+import json
+import mmap
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.rag.types import Chunk, ChunkDelta, ScoredChunk, Vector
+from app.rag.vectorstores.base import VectorStore
+from app.rag.vectorstores.memory_vectorstore import MemoryVectorStore
+from app.rag.vectorstores.metadata_index import MetadataIndex
+from app.rag.vectorstores.scoring import (
+    Metric,
+    as_matrix,
+    as_vector,
+    check_metric,
+    prepare_query,
+    prepare_rows,
+    score_rows,
+    top_k_indices,
+)
+
+_CURRENT = "CURRENT"
+_LOCK = "LOCK"
+
+_SEGMENT = "segment.npy"
+_CHUNKS = "chunks.jsonl"
+_CHUNK_OFFSETS = "chunks.idx.npy"
+_SOURCES = "sources.json"
+_SOURCE_ROWS = "source_rows.npy"
+_WAL = "wal.log"
+
+
+def _gen_dir(root: str, generation: int) -> str:
+    return os.path.join(root, f"gen-{generation:08d}")
+
+
+def _fsync_dir(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _read_current(root: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(root, _CURRENT), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_current(root: str, manifest: Dict[str, Any]) -> None:
+    tmp = os.path.join(root, f"{_CURRENT}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(root, _CURRENT))
+    _fsync_dir(root)
+
+
+def _chunk_to_json(source_id: str, c: Chunk) -> Dict[str, Any]:
+    return {"source_id": source_id, "id": c.id, "doc_id": c.doc_id, "text": c.text, "metadata": dict(c.metadata)}
+
+
+def _chunk_from_json(d: Dict[str, Any]) -> Chunk:
+    return Chunk(id=d["id"], doc_id=d["doc_id"], text=d["text"], metadata=d["metadata"])
+
+
+def write_segment(
+    gen_path: str,
+    *,
+    dim: int,
+    rows: np.ndarray,
+    chunks: List[Tuple[str, Chunk]],
+) -> None:
+    """
+    세그먼트 디렉터리 한 개를 기록 (벡터 .npy + 청크 sidecar + 오프셋 인덱스 + source 열 + 빈 WAL)
+    rows 는 metric 전처리가 끝난 (n, dim) float32
+    """
+    os.makedirs(gen_path)
+    n = len(chunks)
+
+    seg = np.lib.format.open_memmap(
+        os.path.join(gen_path, _SEGMENT), mode="w+", dtype=np.float32, shape=(n, dim)
+    )
+    if n:
+        seg[:] = rows
+    seg.flush()
+    del seg
+
+    sources: Dict[str, int] = {}
+    source_rows = np.empty(n, dtype=np.int32)
+    offsets = np.empty(n + 1, dtype=np.int64)
+    pos = 0
+    with open(os.path.join(gen_path, _CHUNKS), "wb") as f:
+        for i, (source_id, c) in enumerate(chunks):
+            source_rows[i] = sources.setdefault(source_id, len(sources))
+            line = (json.dumps(_chunk_to_json(source_id, c), ensure_ascii=False) + "\n").encode("utf-8")
+            offsets[i] = pos
+            f.write(line)
+            pos += len(line)
+        offsets[n] = pos
+        f.flush()
+        os.fsync(f.fileno())
+
+    np.save(os.path.join(gen_path, _CHUNK_OFFSETS), offsets)
+    np.save(os.path.join(gen_path, _SOURCE_ROWS), source_rows)
+    with open(os.path.join(gen_path, _SOURCES), "w", encoding="utf-8") as f:
+        json.dump(list(sources), f, ensure_ascii=False)
+    open(os.path.join(gen_path, _WAL), "wb").close()
+    _fsync_dir(gen_path)
+
+
+class _Segment:
+    """
+    읽기 전용 세그먼트. 벡터/오프셋/source 열은 mmap (zero copy), 청크는 결과에 필요할 때만 디코드
+    """
+
+    def __init__(self, gen_path: str):
+        self.path = gen_path
+        self.vectors: np.ndarray = np.load(os.path.join(gen_path, _SEGMENT), mmap_mode="r")
+        self.offsets: np.ndarray = np.load(os.path.join(gen_path, _CHUNK_OFFSETS), mmap_mode="r")
+        self.source_rows: np.ndarray = np.load(os.path.join(gen_path, _SOURCE_ROWS), mmap_mode="r")
+        with open(os.path.join(gen_path, _SOURCES), "r", encoding="utf-8") as f:
+            self.sources: Dict[str, int] = {s: i for i, s in enumerate(json.load(f))}
+
+        self._chunks_file = open(os.path.join(gen_path, _CHUNKS), "rb")
+        size = os.fstat(self._chunks_file.fileno()).st_size
+        self._chunks_map = mmap.mmap(self._chunks_file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._sq_norms: Optional[np.ndarray] = None
+        self._meta: Optional[MetadataIndex] = None
+        self._meta_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def rows_of(self, source_id: str) -> np.ndarray:
+        idx = self.sources.get(source_id)
+        if idx is None:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.source_rows == idx)
+
+    def record(self, row: int) -> Dict[str, Any]:
+        lo, hi = int(self.offsets[row]), int(self.offsets[row + 1])
+        return json.loads(self._chunks_map[lo:hi])
+
+    def chunk(self, row: int) -> Chunk:
+        return _chunk_from_json(self.record(row))
+
+    def metadata_index(self) -> MetadataIndex:
+        """
+        첫 필터 검색 때 sidecar 를 한 번 훑어서 색인 생성 (오픈 자체는 계속 ms 단위 유지)
+        """
+        if self._meta is None:
+            with self._meta_lock:
+                if self._meta is None:
+                    meta = MetadataIndex()
+                    meta.add_rows(0, (self.record(r)["metadata"] for r in range(len(self))))
+                    self._meta = meta
+        return self._meta
+
+    def sq_norms(self) -> np.ndarray:
+        if self._sq_norms is None:
+            self._sq_norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+        return self._sq_norms
+
+
+class _View:
+    """
+    검색 스레드가 잡는 불변 스냅샷 참조 (세그먼트 + 세그먼트 tombstone + WAL delta)
+    """
+
+    def __init__(self, generation: int, segment: _Segment, alive: np.ndarray, delta: MemoryVectorStore):
+        self.generation = generation
+        self.segment = segment
+        self.alive = alive
+        self.delta = delta
+
+
+class MmapVectorStore(VectorStore):
+    """
+    디스크 영속 벡터 스토어
+    root/
+      CURRENT                 현재 generation manifest (os.replace 로 원자적 교체)
+      LOCK                    writer 간 flock
+      gen-XXXXXXXX/
+        segment.npy           (n, dim) float32, np.load(mmap_mode="r") 로 zero copy 오픈
+        chunks.jsonl          청크 sidecar (행 순서), chunks.idx.npy 가 행 -> 바이트 오프셋
+        sources.json          source_id 목록, source_rows.npy 가 행 -> source 번호
+        wal.log               세그먼트 이후의 upsert/delete append-only 로그 (JSON lines)
+
+    - 모든 워커가 같은 디렉터리를 열고, 쓰기는 flock 아래 WAL 에 append
+    - 각 워커는 refresh_interval 마다 WAL 꼬리를 재생하고 generation 이 바뀌면 새 세그먼트로 교체
+    - WAL 이 compact_wal_bytes 를 넘으면 세그먼트 + WAL 을 새 generation 으로 compaction
+    """
+
+    def __init__(
+        self,
+        root: str,
+        *,
+        dim: Optional[int] = None,
+        metric: Metric = "cosine",
+        readonly: bool = False,
+        refresh_interval: float = 1.0,
+        compact_wal_bytes: int = 64 * 1024 * 1024,
+    ):
+        self._root = root
+        self._readonly = readonly
+        self._refresh_interval = refresh_interval
+        self._compact_wal_bytes = compact_wal_bytes
+        self._lock = threading.RLock()
+        self._last_refresh = 0.0
+        self._wal_offset = 0
+
+        manifest = _read_current(root)
+        if manifest is None:
+            if readonly:
+                raise FileNotFoundError(f"no vector store at {root}")
+            if dim is None:
+                raise ValueError("dim is required to create a new store")
+            os.makedirs(root, exist_ok=True)
+            with self._file_lock():
+                manifest = _read_current(root)
+                if manifest is None:
+                    manifest = {"generation": 1, "dim": dim, "metric": check_metric(metric)}
+                    write_segment(_gen_dir(root, 1), dim=dim, rows=np.empty((0, dim), np.float32), chunks=[])
+                    _write_current(root, manifest)
+
+        self._dim: int = int(manifest["dim"])
+        self._metric: Metric = check_metric(manifest["metric"])
+        if dim is not None and dim != self._dim:
+            raise ValueError(f"store at {root} has dim {self._dim}, not {dim}")
+        self._view = self._open_generation(int(manifest["generation"]))
+
+    @property
+    def metric(self) -> Metric:
+        return self._metric
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    @property
+    def generation(self) -> int:
+        return self._view.generation
+
+    def __len__(self) -> int:
+        view = self._view
+        return int(view.alive.sum()) + len(view.delta)
+
+    def upsert(self, *, source_id: str, chunks: List[Chunk], vectors: List[Vector]) -> None:
+        if len(chunks) != len(vectors):
+            raise ValueError("chunks and vectors length mismatch")
+        self._write({"op": "upsert", "source_id": source_id, **self._encode_chunks(source_id, chunks, vectors)})
+
+    def delete(self, *, source_id: str) -> int:
+        return self._write({"op": "delete", "source_id": source_id})
+
+    def chunk_ids(self, *, source_id: str) -> Set[str]:
+        self.maybe_refresh()
+        view = self._view
+        rows = view.segment.rows_of(source_id)
+        ids = {view.segment.record(int(r))["id"] for r in rows[view.alive[rows]]}
+        return ids | view.delta.chunk_ids(source_id=source_id)
+
+    def apply_delta(
+        self,
+        *,
+        source_id: str,
+        chunks: List[Chunk],
+        vectors: List[Vector],
+        remove_ids: Iterable[str],
+    ) -> None:
+        if len(chunks) != len(vectors):
+            raise ValueError("chunks and vectors length mismatch")
+        self._write({
+            "op": "delta",
+            "source_id": source_id,
+            "remove_ids": sorted(set(remove_ids)),
+            **self._encode_chunks(source_id, chunks, vectors),
+        })
+
+    def apply_deltas(self, deltas: Sequence[ChunkDelta]) -> None:
+        """
+        delta 여러 건을 WAL 에 한 번의 lock/fsync 로 기록
+        """
+        recs = []
+        for d in deltas:
+            if len(d.chunks) != len(d.vectors):
+                raise ValueError("chunks and vectors length mismatch")
+            recs.append({
+                "op": "delta",
+                "source_id": d.source_id,
+                "remove_ids": sorted(set(d.remove_ids)),
+                **self._encode_chunks(d.source_id, d.chunks, d.vectors),
+            })
+        if recs:
+            self._write_many(recs)
+
+    def _encode_chunks(self, source_id: str, chunks: List[Chunk], vectors: List[Vector]) -> Dict[str, Any]:
+        if chunks:
+            x = prepare_rows(as_matrix(vectors, self._dim), self._metric)
+        else:
+            x = np.empty((0, self._dim), np.float32)
+        return {
+            "chunks": [_chunk_to_json(source_id, c) for c in chunks],
+            "vectors": base64.b64encode(np.ascontiguousarray(x, dtype=np.float32).tobytes()).decode("ascii"),
+        }
+
+    def similarity_search(
+        self,
+        *,
+        query_vector: Vector,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[ScoredChunk]:
+        self.maybe_refresh()
+        view = self._view
+        if top_k <= 0:
+            return []
+
+        q = prepare_query(as_vector(query_vector, self._dim), self._metric)
+        out = view.delta.similarity_search(
+            query_vector=q, top_k=top_k, filters=filters, score_threshold=score_threshold
+        )
+
+        seg = view.segment
+        if len(seg):
+            if filters:
+                # 필터는 색인으로 후보 행부터 구하고 그 행만 점수 계산 (세그먼트 전체 스캔 X)
+                rows: Optional[np.ndarray] = np.flatnonzero(seg.metadata_index().resolve(filters, len(seg)) & view.alive)
+                scores = score_rows(seg.vectors[rows], q, self._metric)
+            else:
+                rows = None
+                sq = seg.sq_norms() if self._metric == "l2" else None
+                scores = score_rows(seg.vectors, q, self._metric, sq)
+                scores[~view.alive] = -np.inf
+            if score_threshold is not None:
+                scores[scores < score_threshold] = -np.inf
+            for i in top_k_indices(scores, top_k):
+                s = float(scores[i])
+                if s == -np.inf:
+                    break
+                row = int(i) if rows is None else int(rows[i])
+                out.append(ScoredChunk(chunk=seg.chunk(row), score=s))
+
+        out.sort(key=lambda m: m.score, reverse=True)
+        return out[:top_k]
+
+    def maybe_refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._last_refresh < self._refresh_interval:
+            return
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        다른 워커가 쓴 WAL 꼬리를 재생하고, compaction 으로 generation 이 바뀌었으면 새로 오픈
+        """
+        with self._lock:
+            self._last_refresh = time.monotonic()
+            manifest = _read_current(self._root)
+            if manifest is not None and int(manifest["generation"]) != self._view.generation:
+                self._view = self._open_generation(int(manifest["generation"]))
+                return
+            self._replay(self._view)
+
+    def compact(self) -> int:
+        """
+        세그먼트의 살아있는 행 + WAL delta 를 새 generation 으로 기록하고 CURRENT 를 교체
+        """
+        if self._readonly:
+            raise PermissionError("store is opened read-only")
+        with self._lock, self._file_lock():
+            self._catch_up()
+            view = self._view
+            seg = view.segment
+
+            live = np.flatnonzero(view.alive)
+            chunks: List[Tuple[str, Chunk]] = []
+            for r in live:
+                rec = seg.record(int(r))
+                chunks.append((rec["source_id"], _chunk_from_json(rec)))
+            parts = [np.asarray(seg.vectors[live])]
+            for source_id, delta_chunks, m in view.delta.items():
+                chunks.extend((source_id, c) for c in delta_chunks)
+                parts.append(m)
+            rows = np.concatenate(parts) if parts else np.empty((0, self._dim), np.float32)
+
+            generation = view.generation + 1
+            tmp = os.path.join(self._root, f".tmp-gen-{generation:08d}")
+            shutil.rmtree(tmp, ignore_errors=True)
+            write_segment(tmp, dim=self._dim, rows=rows, chunks=chunks)
+            os.replace(tmp, _gen_dir(self._root, generation))
+            _write_current(self._root, {"generation": generation, "dim": self._dim, "metric": self._metric})
+
+            # 직전 generation 은 막 전환 중인 reader 를 위해 남기고 그 이전 것만 삭제
+            shutil.rmtree(_gen_dir(self._root, generation - 2), ignore_errors=True)
+
+            self._view = self._open_generation(generation)
+            return generation
+
+    def _open_generation(self, generation: int) -> "_View":
+        seg = _Segment(_gen_dir(self._root, generation))
+        view = _View(
+            generation,
+            seg,
+            np.ones(len(seg), dtype=bool),
+            MemoryVectorStore(dim=self._dim, metric=self._metric),
+        )
+        self._wal_offset = 0
+        self._replay(view)
+        return view
+
+    def _wal_path(self, view: "_View") -> str:
+        return os.path.join(view.segment.path, _WAL)
+
+    def _replay(self, view: "_View") -> None:
+        with open(self._wal_path(view), "rb") as f:
+            f.seek(self._wal_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # 쓰는 중인 마지막 줄은 다음 refresh 에서 읽음
+                    break
+                self._apply(view, json.loads(line))
+                self._wal_offset += len(line)
+
+    def _apply(self, view: "_View", rec: Dict[str, Any]) -> int:
+        """
+        WAL 레코드 한 개를 view 에 반영. 반환: 지워진 기존 행 수
+        """
+        op = rec["op"]
+        source_id = rec["source_id"]
+        rows = view.segment.rows_of(source_id)
+        rows = rows[view.alive[rows]]
+
+        if op == "delta":
+            remove = set(rec["remove_ids"])
+            rows = np.asarray([r for r in rows if view.segment.record(int(r))["id"] in remove], dtype=np.intp)
+        view.alive[rows] = False
+        removed = int(rows.size)
+
+        if op == "delete":
+            return removed + view.delta.delete(source_id=source_id)
+
+        chunks = [_chunk_from_json(d) for d in rec["chunks"]]
+        x = np.frombuffer(base64.b64decode(rec["vectors"]), dtype=np.float32).reshape(len(chunks), self._dim)
+        if op == "delta":
+            before = len(view.delta)
+            view.delta.apply_delta(source_id=source_id, chunks=chunks, vectors=x, remove_ids=remove)
+            return removed + before + len(chunks) - len(view.delta)
+
+        removed += view.delta.delete(source_id=source_id)
+        view.delta.upsert(source_id=source_id, chunks=chunks, vectors=x)
+        return removed
+
+    def _catch_up(self) -> None:
+        manifest = _read_current(self._root)
+        if manifest is not None and int(manifest["generation"]) != self._view.generation:
+            self._view = self._open_generation(int(manifest["generation"]))
+        else:
+            self._replay(self._view)
+
+    def _write(self, rec: Dict[str, Any]) -> int:
+        return self._write_many([rec])
+
+    def _write_many(self, recs: List[Dict[str, Any]]) -> int:
+        if self._readonly:
+            raise PermissionError("store is opened read-only")
+        data = b"".join((json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8") for rec in recs)
+        with self._lock:
+            with self._file_lock():
+                self._catch_up()
+                with open(self._wal_path(self._view), "ab") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                removed = sum(self._apply(self._view, rec) for rec in recs)
+                self._wal_offset += len(data)
+                wal_bytes = self._wal_offset
+            if wal_bytes >= self._compact_wal_bytes:
+                self.compact()
+        return removed
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with open(os.path.join(self._root, _LOCK), "a+b") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import Literal, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.rag.types import Vector
+
+
+Metric = Literal["cosine", "dot", "l2"]
+
+METRICS: Tuple[str, ...] = ("cosine", "dot", "l2")
+
+VectorLike = Union[Vector, np.ndarray]
+
+
+def check_metric(metric: str) -> Metric:
+    if metric not in METRICS:
+        raise ValueError(f"unsupported metric: {metric!r} (expected one of {METRICS})")
+    return metric  # type: ignore[return-value]
+
+
+def as_matrix(vectors: Union[Sequence[VectorLike], np.ndarray], dim: Optional[int] = None) -> np.ndarray:
+    """
+    임베딩 입력을 (n, dim) float32 C-contiguous 행렬로 변환
+    """
+    m = np.asarray(vectors, dtype=np.float32)
+    if m.ndim == 1:
+        m = m.reshape(1, -1) if m.size else m.reshape(0, dim or 0)
+    if m.ndim != 2:
+        raise ValueError(f"vectors must be 2-D, got shape {m.shape}")
+    if dim is not None and m.shape[0] and m.shape[1] != dim:
+        raise ValueError(f"vector dim mismatch: expected {dim}, got {m.shape[1]}")
+    return np.ascontiguousarray(m)
+
+
+def as_vector(vector: VectorLike, dim: Optional[int] = None) -> np.ndarray:
+    v = np.asarray(vector, dtype=np.float32).reshape(-1)
+    if dim is not None and v.shape[0] != dim:
+        raise ValueError(f"query dim mismatch: expected {dim}, got {v.shape[0]}")
+    return v
+
+
+def normalize_rows(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=-1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return m / norms
+
+
+def prepare_rows(m: np.ndarray, metric: Metric) -> np.ndarray:
+    """
+    저장 전 행 전처리: cosine 은 미리 정규화해서 검색 시 내적 한 번으로 끝냄
+    """
+    if metric == "cosine":
+        return normalize_rows(m).astype(np.float32, copy=False)
+    return m
+
+
+def prepare_query(q: np.ndarray, metric: Metric) -> np.ndarray:
+    if metric == "cosine":
+        return normalize_rows(q).astype(np.float32, copy=False)
+    return q
+
+
+def score_rows(
+    rows: np.ndarray,
+    q: np.ndarray,
+    metric: Metric,
+    sq_norms: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    rows: (n, dim), q: (dim,) 또는 (dim, b)
+    점수는 항상 "클수록 유사" 기준. l2 는 -거리.
+    """
+    dots = rows @ q
+    if metric != "l2":
+        return dots
+    if sq_norms is None:
+        sq_norms = np.einsum("ij,ij->i", rows, rows)
+    q_sq = np.einsum("i...,i...->...", q, q)
+    if dots.ndim == 2:
+        d2 = sq_norms[:, None] - 2.0 * dots + q_sq[None, :]
+    else:
+        d2 = sq_norms - 2.0 * dots + q_sq
+    return -np.sqrt(np.maximum(d2, 0.0))
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    scores 1-D 에서 상위 k 개 인덱스를 점수 내림차순으로 반환 (argpartition O(n))
+    """
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(n)
+    return idx[np.argsort(-scores[idx], kind="stable")]
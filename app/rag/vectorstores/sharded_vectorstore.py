@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import heapq
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.rag.types import Chunk, ChunkDelta, ScoredChunk, Vector
+from app.rag.vectorstores.base import VectorStore
+
+
+def shard_of(source_id: str, n_shards: int) -> int:
+    # 프로세스/재시작과 무관하게 같은 shard 로 가도록 hash() 대신 crc32
+    return zlib.crc32(source_id.encode("utf-8")) % n_shards
+
+
+def merge_top_k(results: Iterable[List[ScoredChunk]], top_k: int) -> List[ScoredChunk]:
+    """
+    shard 별 점수 내림차순 결과를 heap 으로 병합해서 전체 top_k
+    """
+    return list(islice(heapq.merge(*results, key=lambda m: -m.score), top_k))
+
+
+class ShardedVectorStore(VectorStore):
+    """
+    source_id 해시로 청크를 N 개 shard 에 나눠 담는 스토어
+    - 쓰기/조회는 해당 shard 하나로만
+    - 검색은 모든 shard 에 동시에 보내고 (스레드 풀, NumPy 행렬곱은 GIL 을 놓음)
+      shard 별 top_k 를 heap merge
+    - shard 는 아무 VectorStore 구현이나 가능 (factory(i) 로 생성)
+    """
+
+    def __init__(self, factory: Callable[[int], VectorStore], *, n_shards: int = 4):
+        if n_shards < 1:
+            raise ValueError("n_shards must be >= 1")
+        self._shards: List[VectorStore] = [factory(i) for i in range(n_shards)]
+        self._pool = ThreadPoolExecutor(max_workers=n_shards, thread_name_prefix="vs-shard") if n_shards > 1 else None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"_shards": self._shards}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._shards = state["_shards"]
+        n = len(self._shards)
+        self._pool = ThreadPoolExecutor(max_workers=n, thread_name_prefix="vs-shard") if n > 1 else None
+
+    @property
+    def shards(self) -> List[VectorStore]:
+        return self._shards
+
+    def __len__(self) -> int:
+        return sum(len(s) for s in self._shards)
+
+    def _shard(self, source_id: str) -> VectorStore:
+        return self._shards[shard_of(source_id, len(self._shards))]
+
+    def _scatter(self, fn: Callable[[int, VectorStore], Any]) -> List[Any]:
+        if self._pool is None:
+            return [fn(0, self._shards[0])]
+        return list(self._pool.map(fn, range(len(self._shards)), self._shards))
+
+    def upsert(self, *, source_id: str, chunks: List[Chunk], vectors: List[Vector]) -> None:
+        self._shard(source_id).upsert(source_id=source_id, chunks=chunks, vectors=vectors)
+
+    def delete(self, *, source_id: str) -> int:
+        return self._shard(source_id).delete(source_id=source_id)
+
+    def chunk_ids(self, *, source_id: str) -> Set[str]:
+        return self._shard(source_id).chunk_ids(source_id=source_id)
+
+    def apply_delta(
+        self,
+        *,
+        source_id: str,
+        chunks: List[Chunk],
+        vectors: List[Vector],
+        remove_ids: Iterable[str],
+    ) -> None:
+        self._shard(source_id).apply_delta(source_id=source_id, chunks=chunks, vectors=vectors, remove_ids=remove_ids)
+
+    def apply_deltas(self, deltas: Sequence[ChunkDelta]) -> None:
+        groups: List[List[ChunkDelta]] = [[] for _ in self._shards]
+        for d in deltas:
+            groups[shard_of(d.source_id, len(self._shards))].append(d)
+        self._scatter(lambda i, shard: shard.apply_deltas(groups[i]) if groups[i] else None)
+
+    def similarity_search(
+        self,
+        *,
+        query_vector: Vector,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[ScoredChunk]:
+        q = np.asarray(query_vector, dtype=np.float32)
+        results = self._scatter(lambda _, shard: shard.similarity_search(
+            query_vector=q, top_k=top_k, filters=filters, score_threshold=score_threshold
+        ))
+        return merge_top_k(results, top_k)
+
+    def similarity_search_batch(
+        self,
+        *,
+        query_vectors: Sequence[Vector],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[List[ScoredChunk]]:
+        qs = np.asarray(query_vectors, dtype=np.float32)
+        per_shard = self._scatter(lambda _, shard: shard.similarity_search_batch(
+            query_vectors=qs, top_k=top_k, filters=filters, score_threshold=score_threshold
+        ))
+        return [merge_top_k((r[j] for r in per_shard), top_k) for j in range(len(qs))]
+
+    def similarity_search_with_vectors(
+        self,
+        *,
+        query_vector: Vector,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> Tuple[List[ScoredChunk], Optional[np.ndarray]]:
+        q = np.asarray(query_vector, dtype=np.float32)
+        results = self._scatter(lambda _, shard: shard.similarity_search_with_vectors(
+            query_vector=q, top_k=top_k, filters=filters, score_threshold=score_threshold
+        ))
+        if any(vectors is None and matches for matches, vectors in results):
+            return merge_top_k((matches for matches, _ in results), top_k), None
+
+        # (점수, shard, 행) 로 병합해서 벡터도 같은 순서로 모음
+        tagged = [
+            [(m, s, i) for i, m in enumerate(matches)]
+            for s, (matches, _) in enumerate(results)
+        ]
+        merged = list(islice(heapq.merge(*tagged, key=lambda t: -t[0].score), top_k))
+        if not merged:
+            return [], None
+        vectors = np.stack([results[s][1][i] for _, s, i in merged])
+        return [m for m, _, _ in merged], vectors
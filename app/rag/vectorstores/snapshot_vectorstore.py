@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import copyreg
+import fcntl
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.rag.types import Chunk, ChunkDelta, ScoredChunk, Vector
+from app.rag.vectorstores.base import VectorStore
+from app.rag.vectorstores.scoring import as_matrix
+
+
+def _mapping_proxy(d: Dict[str, Any]) -> MappingProxyType:
+    return MappingProxyType(d)
+
+
+# 청크 metadata 는 MappingProxyType (기본 pickle 불가). 같은 매핑 객체는 pickle memo 로 한 번만 저장됨
+copyreg.pickle(MappingProxyType, lambda m: (_mapping_proxy, (dict(m),)))
+
+_LATEST = "LATEST"
+_LOCK = "LOCK"
+_STORE = "store.pkl"
+_MANIFEST = "manifest.json"
+
+
+class _SourceWrite:
+    """
+    공개 전 source 하나에 대한 쓰기 요약 (다른 버전 위에 다시 적용할 때 사용)
+    - replaced: upsert/delete 가 있었음 -> 최종 청크 집합 = rows
+    - 아니면 delta 만: rows 는 내가 추가한 청크, removed 는 내가 지운 id
+    다시 적용할 때는 대상 스토어의 현재 상태 기준으로 (removed + 추가할 id) 를 지우고 rows 를 넣음
+    -> 같은 delta 를 두 워커가 적용해도 id 중복 없음
+    """
+
+    def __init__(self):
+        self.replaced = False
+        self.rows: Dict[str, Tuple[Chunk, Vector]] = {}
+        self.removed: Set[str] = set()
+
+    def upsert(self, chunks: List[Chunk], vectors: Sequence[Vector]) -> None:
+        self.replaced = True
+        self.rows = {c.id: (c, v) for c, v in zip(chunks, vectors)}
+        self.removed = set()
+
+    def delete(self) -> None:
+        self.replaced = True
+        self.rows = {}
+        self.removed = set()
+
+    def delta(self, chunks: List[Chunk], vectors: Sequence[Vector], remove_ids: Iterable[str]) -> None:
+        for cid in remove_ids:
+            self.rows.pop(cid, None)
+            if not self.replaced:
+                self.removed.add(cid)
+        for c, v in zip(chunks, vectors):
+            self.rows[c.id] = (c, v)
+
+    def chunk_ids(self, published: Set[str]) -> Set[str]:
+        if self.replaced:
+            return set(self.rows)
+        return (published - self.removed) | self.rows.keys()
+
+    def replay(self, store: VectorStore, source_id: str) -> None:
+        chunks = [c for c, _ in self.rows.values()]
+        vectors = [v for _, v in self.rows.values()]
+        if self.replaced:
+            if chunks:
+                store.upsert(source_id=source_id, chunks=chunks, vectors=vectors)
+            else:
+                store.delete(source_id=source_id)
+            return
+        remove = (self.removed | self.rows.keys()) & store.chunk_ids(source_id=source_id)
+        store.apply_delta(source_id=source_id, chunks=chunks, vectors=vectors, remove_ids=remove)
+
+
+def _snap_dir(root: str, version: int) -> str:
+    return os.path.join(root, f"snap-{version:08d}")
+
+
+def _fsync_dir(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def read_latest(root: str) -> int:
+    """
+    현재 공개된 스냅샷 버전 (없으면 0)
+    """
+    try:
+        with open(os.path.join(root, _LATEST), "r", encoding="utf-8") as f:
+            return int(json.load(f)["version"])
+    except FileNotFoundError:
+        return 0
+
+
+def write_snapshot(root: str, version: int, store: VectorStore) -> str:
+    """
+    store 전체(벡터 + 청크 테이블 + metadata/BM25/그래프 색인)를 snap-{version}/ 에 쓰고 LATEST 를 교체
+    - 임시 디렉터리에 쓰고 fsync 후 rename -> LATEST 도 tmp + os.replace. 중간에 죽어도 이전 버전이 그대로 보임
+    """
+    tmp = os.path.join(root, f".tmp-snap-{version:08d}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    with open(os.path.join(tmp, _STORE), "wb") as f:
+        pickle.dump(store, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    manifest = {"version": version, "created_at": time.time(), "kind": type(store).__name__, "chunks": len(store)}
+    with open(os.path.join(tmp, _MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+    path = _snap_dir(root, version)
+    os.replace(tmp, path)
+
+    latest_tmp = os.path.join(root, f"{_LATEST}.tmp")
+    with open(latest_tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(latest_tmp, os.path.join(root, _LATEST))
+    _fsync_dir(root)
+    return path
+
+
+def load_snapshot(root: str, version: int) -> VectorStore:
+    with open(os.path.join(_snap_dir(root, version), _STORE), "rb") as f:
+        return pickle.load(f)
+
+
+class SnapshotVectorStore(VectorStore):
+    """
+    프로세스 메모리 스토어(memory/hnsw/ivfpq, sharded, BM25 wrapper 포함)를 워커 간에 복제하는 wrapper
+    root/
+      LATEST                 공개된 최신 스냅샷 manifest (os.replace 로 원자적 교체)
+      LOCK                   publish 간 flock
+      snap-XXXXXXXX/         store.pkl + manifest.json (불변)
+
+    - 검색은 self._store 를 한 번 읽어서 그 객체로 끝까지 수행 (generation pointer)
+      새 스냅샷은 백그라운드 스레드에서 로드한 뒤 포인터만 바꿈 -> 진행 중인 검색은 이전 객체로 끝남
+    - 쓰기는 스토어에 바로 반영하지 않고 source 단위 요약(_SourceWrite)으로만 쌓음 -> 공개 전 쓰기는 검색에 안 보임
+      chunk_ids 만 공개된 스토어 + 요약 기준 (ingest 의 delta 계산용). 스토어 전체 복사 없음
+    - publish_interval 마다 (0 이면 매번) 요약을 서비스 중인 스토어에 source 단위로 적용하고 스냅샷으로 씀
+      (내부 스토어들은 쓰기 중 검색에 안전 -> 검색은 source 단위로 이전/새 상태 중 하나를 봄)
+      다른 워커가 더 새 버전을 냈으면 그걸 로드해서 그 위에 적용한 뒤 공개 (lost update / 중복 청크 X)
+    - readonly 워커는 refresh_interval 마다 LATEST 만 확인
+    - 스냅샷은 pickle: root 는 신뢰하는 디렉터리여야 함
+    """
+
+    def __init__(
+        self,
+        inner: VectorStore,
+        root: str,
+        *,
+        readonly: bool = False,
+        refresh_interval: float = 1.0,
+        publish_interval: float = 5.0,
+        keep: int = 3,
+    ):
+        self._root = root
+        self._readonly = readonly
+        self._refresh_interval = refresh_interval
+        self._publish_interval = publish_interval
+        self._keep = max(2, keep)
+        os.makedirs(root, exist_ok=True)
+
+        self._store: VectorStore = inner
+        self._version = 0
+        self._pending: Dict[str, _SourceWrite] = {}
+        self._dim: Optional[int] = None
+        self._write_lock = threading.RLock()
+        self._last_refresh = 0.0
+        self._loading = False
+        self._publisher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        latest = read_latest(root)
+        if latest:
+            self._store = load_snapshot(root, latest)
+            self._version = latest
+
+    @property
+    def current(self) -> VectorStore:
+        """
+        지금 서비스 중인 스토어. 한 요청 안에서 같은 버전을 보려면 이걸 잡아서 사용
+        """
+        self.maybe_refresh()
+        return self._store
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    # -- 쓰기 --
+
+    def _check_vectors(self, chunks: List[Chunk], vectors: Sequence[Vector]) -> None:
+        # 스토어 적용은 publish 때라 입력 오류는 여기서 미리 걸러냄 (안 그러면 publish 가 계속 실패)
+        if len(chunks) != len(vectors):
+            raise ValueError("chunks and vectors length mismatch")
+        if len(vectors):
+            m = as_matrix(vectors, self._dim)
+            self._dim = m.shape[1]
+
+    def _write(self, source_ids: Iterable[str], record: Callable[[_SourceWrite, str], None]) -> None:
+        if self._readonly:
+            raise PermissionError("store is opened read-only")
+        with self._write_lock:
+            for source_id in source_ids:
+                record(self._pending.setdefault(source_id, _SourceWrite()), source_id)
+        if self._publish_interval <= 0:
+            self.publish()
+        else:
+            self._ensure_publisher()
+
+    def upsert(self, *, source_id: str, chunks: List[Chunk], vectors: List[Vector]) -> None:
+        self._check_vectors(chunks, vectors)
+        self._write((source_id,), lambda w, _: w.upsert(chunks, vectors))
+
+    def delete(self, *, source_id: str) -> int:
+        removed = len(self.chunk_ids(source_id=source_id))
+        self._write((source_id,), lambda w, _: w.delete())
+        return removed
+
+    def apply_delta(
+        self,
+        *,
+        source_id: str,
+        chunks: List[Chunk],
+        vectors: List[Vector],
+        remove_ids: Iterable[str],
+    ) -> None:
+        self._check_vectors(chunks, vectors)
+        remove = frozenset(remove_ids)
+        self._write((source_id,), lambda w, _: w.delta(chunks, vectors, remove))
+
+    def apply_deltas(self, deltas: Sequence[ChunkDelta]) -> None:
+        by_source: Dict[str, List[ChunkDelta]] = {}
+        for d in deltas:
+            self._check_vectors(d.chunks, d.vectors)
+            by_source.setdefault(d.source_id, []).append(d)
+
+        def record(w: _SourceWrite, source_id: str) -> None:
+            for d in by_source[source_id]:
+                w.delta(d.chunks, d.vectors, d.remove_ids)
+
+        self._write(list(by_source), record)
+
+    def publish(self) -> int:
+        """
+        공개 전 쓰기가 있으면 새 버전 스냅샷으로 공개. 반환: 현재 버전
+        """
+        with self._write_lock:
+            if not self._pending:
+                return self._version
+            with self._file_lock():
+                latest = read_latest(self._root)
+                # 다른 워커가 먼저 공개했으면 그 버전 위에, 아니면 서비스 중인 스토어에 바로 적용
+                # (replay 는 멱등 -> 스냅샷 쓰기가 실패해도 다음 publish 에서 다시 적용하면 됨)
+                store = load_snapshot(self._root, latest) if latest > self._version else self._store
+                for source_id, w in self._pending.items():
+                    w.replay(store, source_id)
+                version = max(latest, self._version) + 1
+                write_snapshot(self._root, version, store)
+                self._store = store
+                self._version = version
+                self._pending = {}
+            self._gc(version)
+            return version
+
+    def _ensure_publisher(self) -> None:
+        if self._publisher is not None:
+            return
+        with self._write_lock:
+            if self._publisher is None:
+                self._publisher = threading.Thread(target=self._publish_loop, name="vs-snapshot-publisher", daemon=True)
+                self._publisher.start()
+
+    def _publish_loop(self) -> None:
+        while not self._stop.wait(self._publish_interval):
+            try:
+                self.publish()
+            except OSError:
+                # 디스크 오류 등: 쓰기는 메모리에 남아 있으니 다음 주기에 다시 시도
+                continue
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._pending and not self._readonly:
+            self.publish()
+
+    # -- 읽기 --
+
+    def maybe_refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._last_refresh < self._refresh_interval or self._loading:
+            return
+        self._last_refresh = now
+        latest = read_latest(self._root)
+        if latest > self._version:
+            self._loading = True
+            threading.Thread(target=self._load, args=(latest,), name="vs-snapshot-loader", daemon=True).start()
+
+    def refresh(self) -> int:
+        """
+        최신 스냅샷으로 동기 교체 (테스트/워커 시작용). 반환: 현재 버전
+        """
+        latest = read_latest(self._root)
+        if latest > self._version:
+            self._load(latest)
+        return self._version
+
+    def _load(self, version: int) -> None:
+        try:
+            try:
+                store = load_snapshot(self._root, version)
+            except FileNotFoundError:
+                return  # 로드 전에 gc 됨. 다음 refresh 에서 더 새 버전을 봄
+            with self._write_lock:
+                if version <= self._version:
+                    return
+                # 공개 전 쓰기는 다음 publish 때 새 버전 위에 적용
+                self._store = store
+                self._version = version
+        finally:
+            self._loading = False
+
+    def chunk_ids(self, *, source_id: str) -> Set[str]:
+        # ingest 는 이 결과로 delta 를 계산하므로 공개 전 쓰기까지 포함한 상태 기준
+        with self._write_lock:
+            w = self._pending.get(source_id)
+            if w is not None:
+                return w.chunk_ids(self._store.chunk_ids(source_id=source_id))
+        return self.current.chunk_ids(source_id=source_id)
+
+    def similarity_search(
+        self,
+        *,
+        query_vector: Vector,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[ScoredChunk]:
+        return self.current.similarity_search(
+            query_vector=query_vector, top_k=top_k, filters=filters, score_threshold=score_threshold
+        )
+
+    def similarity_search_batch(
+        self,
+        *,
+        query_vectors: Sequence[Vector],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[List[ScoredChunk]]:
+        return self.current.similarity_search_batch(
+            query_vectors=query_vectors, top_k=top_k, filters=filters, score_threshold=score_threshold
+        )
+
+    def similarity_search_with_vectors(
+        self,
+        *,
+        query_vector: Vector,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> Tuple[List[ScoredChunk], Optional[np.ndarray]]:
+        return self.current.similarity_search_with_vectors(
+            query_vector=query_vector, top_k=top_k, filters=filters, score_threshold=score_threshold
+        )
+
+    # -- 내부 --
+
+    def _gc(self, version: int) -> None:
+        for name in os.listdir(self._root):
+            if name.startswith("snap-") and int(name[5:]) <= version - self._keep:
+                shutil.rmtree(os.path.join(self._root, name), ignore_errors=True)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with open(os.path.join(self._root, _LOCK), "a+b") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -25,6 +25,7 @@ class ChatRequest(BaseModel):
 
     system: Optional[str] = Field(default=None, description="override system prompt (optional)")
     vars: Optional[Dict[str, Any]] = Field(default=None, description="template variables")
+    cache: bool = Field(default=True, description="use the response cache (false = always call the provider)")
 
 
 class ChatResponse(BaseModel):
@@ -1,24 +1,50 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class RagIngestRequest(BaseModel):
+    # text 가 있으면 source 는 문서 id, 없으면 RAG_LOADER_ROOT 기준 파일/디렉터리/JSONL 경로
     source: str = Field(min_length=1)
+    text: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
 
 
-class RagIngestResponse(BaseModel):
-    document_id: str
-    chunk_count: int
+class RagIngestJobResponse(BaseModel):
+    job_id: str
+    status: str
+    source: Optional[str] = None
+    total_documents: int
+    documents_done: int = 0
+    skipped: int = 0
+    chunk_count: int = 0
+    added: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    queue_ms: Optional[float] = None
+    run_ms: Optional[float] = None
 
 
 class RagSearchRequest(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     query: str = Field(min_length=1)
-    top_k: int = 5
+    top_k: int = Field(default=5, ge=1, le=100)
     score_threshold: Optional[float] = None
     filters: Optional[Dict[str, Any]] = None
 
+    # 결과 다양화: mode="mmr" 또는 max_per_doc / dedup_threshold 중 하나라도 주면 적용
+    mode: Literal["similarity", "mmr"] = "similarity"
+    fetch_k: Optional[int] = Field(default=None, ge=1, le=1000)
+    lambda_mult: float = Field(default=0.5, ge=0.0, le=1.0, alias="lambda")
+    max_per_doc: Optional[int] = Field(default=None, ge=1)
+    dedup_threshold: Optional[float] = Field(default=None, ge=-1.0, le=1.0)
+
 
 class RagMatch(BaseModel):
     chunk_id: str
@@ -30,4 +56,62 @@ class RagMatch(BaseModel):
 
 class RagSearchResponse(BaseModel):
     query: str
-    matches: List[RagMatch]
\ No newline at end of file
+    matches: List[RagMatch]
+
+
+class RagBatchQuery(BaseModel):
+    query: str = Field(min_length=1)
+    top_k: int = Field(default=5, ge=1, le=100)
+    score_threshold: Optional[float] = None
+    filters: Optional[Dict[str, Any]] = None
+
+
+class RagBatchSearchRequest(BaseModel):
+    queries: List[RagBatchQuery] = Field(min_length=1)
+
+
+class RagBatchSearchResponse(BaseModel):
+    results: List[RagSearchResponse]
+
+
+class RagChatRequest(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    prompt: str = Field(min_length=1)
+    tag: Optional[str] = Field(default=None, description="prompt definition tag in DB")
+    version: Optional[int] = Field(default=None, description="prompt definition version (default=1 if omitted)")
+    system: Optional[str] = Field(default=None, description="override system prompt (optional)")
+    vars: Optional[Dict[str, Any]] = Field(default=None, description="template variables")
+    cache: bool = Field(default=True, description="use the response cache (false = always call the provider)")
+
+    # 검색 쿼리 (없으면 prompt). top_k 는 budget 에 다 안 들어갈 만큼 넉넉히
+    query: Optional[str] = None
+    top_k: Optional[int] = Field(default=None, ge=1, le=100)
+    score_threshold: Optional[float] = None
+    filters: Optional[Dict[str, Any]] = None
+    max_context_tokens: Optional[int] = Field(default=None, ge=0, description="context token cap (<= budget from llm_config)")
+
+    mode: Literal["similarity", "mmr"] = "similarity"
+    fetch_k: Optional[int] = Field(default=None, ge=1, le=1000)
+    lambda_mult: float = Field(default=0.5, ge=0.0, le=1.0, alias="lambda")
+    max_per_doc: Optional[int] = Field(default=None, ge=1)
+    dedup_threshold: Optional[float] = Field(default=None, ge=-1.0, le=1.0)
+
+
+class RagContextUsage(BaseModel):
+    tokens: int
+    budget: int
+    prompt_tokens: int
+    chunks: int
+    truncated: bool
+    duplicates: int
+    dropped: int
+
+
+class RagChatResponse(BaseModel):
+    reply: str
+    provider: str
+    tag: Optional[str] = None
+    version: Optional[int] = None
+    context: RagContextUsage
+    sources: List[RagMatch]
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Any, Callable, Deque, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.rag.chunkers.base import Chunker
+from app.rag.chunkers.streaming_chunker import StreamingChunker
+from app.rag.embedders.base import Embedder
+from app.rag.types import Chunk, ChunkDelta, Document, IngestResult, LoadedDocument, StreamedDocument
+from app.rag.vectorstores.base import VectorStore
+from app.services.ingestion_service import IngestionService, iter_content_addressed
+
+
+@dataclass
+class BulkIngestStats:
+    documents: int = 0
+    chunks: int = 0
+    added: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def docs_per_s(self) -> float:
+        return self.documents / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    @property
+    def chunks_per_s(self) -> float:
+        return self.chunks / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class _Prepared:
+    """
+    워커 -> 메인 전달용 (Chunk.metadata 는 MappingProxyType 라 pickle 불가, 메인에서 다시 붙임)
+    """
+    source_id: str
+    chunk_count: int
+    added_ids: List[str]
+    added_texts: List[str]
+    vectors: np.ndarray
+    removed_ids: List[str]
+
+
+_Task = Tuple[Document, FrozenSet[str]]
+
+# 워커 프로세스별 chunker/embedder (initializer 에서 한 번만 unpickle)
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(chunker: Chunker, embedder: Embedder) -> None:
+    _worker["chunker"] = chunker
+    _worker["embedder"] = embedder
+
+
+def _prepare_in_worker(tasks: List[_Task]) -> List[_Prepared]:
+    return _prepare(_worker["chunker"], _worker["embedder"], tasks)
+
+
+def _prepare(chunker: Chunker, embedder: Embedder, tasks: List[_Task]) -> List[_Prepared]:
+    """
+    문서 묶음을 청킹 + content hash diff 후, 새 청크 전체를 embed_texts 한 번으로 임베딩
+    """
+    pending: List[Tuple[str, int, List[Chunk], List[str]]] = []
+    texts: List[str] = []
+    for doc, existing in tasks:
+        chunks = list(iter_content_addressed(doc.id, chunker.iter_chunks(doc)))
+        ids = {c.id for c in chunks}
+        added = [c for c in chunks if c.id not in existing]
+        pending.append((doc.id, len(chunks), added, sorted(existing - ids)))
+        texts.extend(c.text for c in added)
+
+    vectors = embedder.embed_texts(texts) if texts else np.empty((0, embedder.dim), np.float32)
+    out: List[_Prepared] = []
+    offset = 0
+    for source_id, count, added, removed in pending:
+        out.append(_Prepared(
+            source_id=source_id,
+            chunk_count=count,
+            added_ids=[c.id for c in added],
+            added_texts=[c.text for c in added],
+            vectors=vectors[offset:offset + len(added)],
+            removed_ids=removed,
+        ))
+        offset += len(added)
+    return out
+
+
+_FLUSH = object()
+_STOP = object()
+
+
+class BulkIngestionService:
+    """
+    대량 backfill 용 파이프라인
+    - 읽기(메인 스레드) -> 청킹/임베딩(ProcessPoolExecutor) -> 쓰기(writer 스레드)
+    - 제출된 작업 수(max_inflight)와 쓰기 큐(max_pending_writes)가 모두 bounded 라서
+      느린 단계가 앞 단계를 막음 (입력을 끝없이 읽어 메모리에 쌓지 않음)
+    - 쓰기는 upsert_batch 청크 단위로 모아 VectorStore.apply_deltas 한 번
+    - workers=0 이면 프로세스 풀 없이 메인 스레드에서 청킹/임베딩 (pickle 불가 embedder 용)
+    - 같은 source_id 가 한 실행에서 다시 나오면 앞 작업을 모두 쓴 뒤 diff (재수집 결과가 꼬이지 않게)
+    - StreamedDocument(큰 파일)는 앞 작업을 모두 쓴 뒤 메인 스레드에서 ingest_stream 으로 (본문을 워커로 보내지 않음)
+    """
+
+    def __init__(
+        self,
+        chunker: Chunker,
+        embedder: Embedder,
+        vectorstore: VectorStore,
+        *,
+        workers: int = 4,
+        docs_per_task: int = 32,
+        max_inflight: Optional[int] = None,
+        max_pending_writes: int = 64,
+        upsert_batch: int = 4096,
+        stream_chunker: Optional[StreamingChunker] = None,
+    ):
+        self._chunker = chunker
+        self._embedder = embedder
+        self._vs = vectorstore
+        self._streaming = IngestionService(chunker, embedder, vectorstore, stream_chunker=stream_chunker)
+        self._workers = workers
+        self._docs_per_task = max(1, docs_per_task)
+        self._max_inflight = max_inflight or max(2, workers * 2)
+        self._max_pending_writes = max_pending_writes
+        self._upsert_batch = upsert_batch
+        # 메인 스레드의 chunk_ids 조회와 writer 의 apply_deltas 직렬화
+        self._store_lock = threading.Lock()
+
+    def ingest(
+        self,
+        documents: Iterable[LoadedDocument],
+        *,
+        on_progress: Optional[Callable[[BulkIngestStats], None]] = None,
+    ) -> BulkIngestStats:
+        stats = BulkIngestStats()
+        started = time.perf_counter()
+        writes: "queue.Queue[Any]" = queue.Queue(maxsize=self._max_pending_writes)
+        errors: List[BaseException] = []
+
+        def write(batch: List[Tuple[Document, _Prepared]]) -> None:
+            deltas = [self._delta(doc, p) for doc, p in batch if p.added_ids or p.removed_ids]
+            if deltas:
+                with self._store_lock:
+                    self._vs.apply_deltas(deltas)
+            for _, p in batch:
+                stats.documents += 1
+                stats.chunks += p.chunk_count
+                stats.added += len(p.added_ids)
+                stats.removed += len(p.removed_ids)
+                stats.unchanged += p.chunk_count - len(p.added_ids)
+            progress()
+
+        def progress() -> None:
+            stats.elapsed_s = time.perf_counter() - started
+            if on_progress is not None:
+                on_progress(replace(stats))
+
+        def ingest_streamed(doc: StreamedDocument) -> None:
+            # drain 직후라 writer 는 쉬는 중 -> 같은 lock 으로 스토어 접근만 직렬화
+            with self._store_lock:
+                r: IngestResult = self._streaming.ingest_stream(
+                    source_id=doc.id, stream=doc.open(), metadata=dict(doc.metadata)
+                )
+            stats.documents += 1
+            stats.chunks += r.chunk_count
+            stats.added += r.added
+            stats.removed += r.removed
+            stats.unchanged += r.unchanged
+            progress()
+
+        def writer() -> None:
+            buf: List[Tuple[Document, _Prepared]] = []
+            buffered = 0
+            while True:
+                item = writes.get()
+                try:
+                    if item is _STOP or item is _FLUSH:
+                        if buf and not errors:
+                            write(buf)
+                        buf, buffered = [], 0
+                        if item is _STOP:
+                            return
+                        continue
+                    if errors:
+                        continue  # 실패 후에도 큐는 비워서 메인 스레드가 put 에서 멈추지 않게
+                    buf.append(item)
+                    buffered += len(item[1].added_ids) + 1
+                    if buffered >= self._upsert_batch:
+                        write(buf)
+                        buf, buffered = [], 0
+                except BaseException as e:  # noqa: BLE001 - 메인 스레드에서 다시 raise
+                    errors.append(e)
+                finally:
+                    writes.task_done()
+
+        writer_thread = threading.Thread(target=writer, name="bulk-ingest-writer", daemon=True)
+        writer_thread.start()
+        executor = self._executor()
+        try:
+            self._run(documents, executor, writes, errors, ingest_streamed)
+        finally:
+            writes.put(_STOP)
+            writer_thread.join()
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        if errors:
+            raise errors[0]
+        stats.elapsed_s = time.perf_counter() - started
+        return replace(stats)
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self._workers <= 0:
+            return None
+        # spawn: uvicorn/embedder 스레드가 떠 있는 프로세스를 fork 하지 않도록
+        return ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self._chunker, self._embedder),
+        )
+
+    def _run(
+        self,
+        documents: Iterable[LoadedDocument],
+        executor: Optional[ProcessPoolExecutor],
+        writes: "queue.Queue[Any]",
+        errors: List[BaseException],
+        ingest_streamed: Callable[[StreamedDocument], None],
+    ) -> None:
+        inflight: Deque[Tuple[Future, List[Document]]] = deque()
+        batch: List[Document] = []
+        unwritten: Set[str] = set()
+
+        def collect_oldest() -> None:
+            fut, docs = inflight.popleft()
+            for doc, prepared in zip(docs, fut.result()):
+                writes.put((doc, prepared))  # 큐가 차면 writer 가 따라올 때까지 대기
+
+        def submit() -> None:
+            nonlocal batch
+            if not batch:
+                return
+            with self._store_lock:
+                tasks = [(doc, frozenset(self._vs.chunk_ids(source_id=doc.id))) for doc in batch]
+            if executor is None:
+                for doc, prepared in zip(batch, _prepare(self._chunker, self._embedder, tasks)):
+                    writes.put((doc, prepared))
+            else:
+                while len(inflight) >= self._max_inflight:
+                    collect_oldest()
+                inflight.append((executor.submit(_prepare_in_worker, tasks), batch))
+            batch = []
+
+        def drain() -> None:
+            submit()
+            while inflight:
+                collect_oldest()
+            writes.put(_FLUSH)
+            writes.join()
+            unwritten.clear()
+
+        for doc in documents:
+            if errors:
+                break
+            if isinstance(doc, StreamedDocument):
+                drain()
+                if errors:
+                    break
+                ingest_streamed(doc)
+                continue
+            if doc.id in unwritten:
+                drain()
+            unwritten.add(doc.id)
+            batch.append(doc)
+            if len(batch) >= self._docs_per_task:
+                submit()
+        if not errors:
+            drain()
+
+    @staticmethod
+    def _delta(doc: Document, p: _Prepared) -> ChunkDelta:
+        metadata = MappingProxyType(dict(doc.metadata))
+        chunks = [
+            Chunk(id=cid, doc_id=doc.id, text=text, metadata=metadata)
+            for cid, text in zip(p.added_ids, p.added_texts)
+        ]
+        return ChunkDelta(source_id=p.source_id, chunks=chunks, vectors=p.vectors, remove_ids=frozenset(p.removed_ids))
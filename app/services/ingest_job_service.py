@@ -0,0 +1,468 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import redis
+
+from app.core.exceptions import BadRequest, NotFound, RateLimited
+from app.rag.loaders.directory_loader import loader_for
+from app.rag.loaders.file_state import FileStateIndex
+from app.rag.types import Document, IngestResult, LoadedDocument, StreamedDocument
+from app.services.ingestion_service import IngestionService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestJob:
+    id: str
+    status: str  # queued | running | succeeded | failed
+    total_documents: int  # source(경로) 작업은 끝나기 전까지 0 (개수를 미리 세지 않음)
+    source: Optional[str] = None
+    documents_done: int = 0
+    skipped: int = 0
+    chunk_count: int = 0
+    added: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    error: Optional[str] = None
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def queue_ms(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return (self.started_at - self.created_at) * 1000
+
+    @property
+    def run_ms(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        end = self.finished_at if self.finished_at is not None else time.time()
+        return (end - self.started_at) * 1000
+
+
+@dataclass(frozen=True)
+class IngestTask:
+    """
+    작업 payload: 문서 목록 또는 서버 로컬 경로(source) 중 하나
+    """
+    documents: List[Document]
+    source: Optional[str] = None
+
+    def to_json(self) -> str:
+        return json.dumps({"documents": [_doc_to_json(d) for d in self.documents], "source": self.source}, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "IngestTask":
+        d = json.loads(raw)
+        return cls(documents=[_doc_from_json(x) for x in d["documents"]], source=d.get("source"))
+
+
+def _doc_to_json(doc: Document) -> Dict[str, Any]:
+    return {"id": doc.id, "text": doc.text, "metadata": dict(doc.metadata)}
+
+
+def _doc_from_json(d: Dict[str, Any]) -> Document:
+    return Document(id=d["id"], text=d["text"], metadata=d.get("metadata") or {})
+
+
+class IngestJobQueue(ABC):
+    """
+    ingest 작업 큐 + 작업 상태 저장소
+    """
+
+    @abstractmethod
+    def submit(self, task: IngestTask) -> IngestJob:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def take(self, timeout: float) -> Optional[Tuple[IngestJob, IngestTask]]:
+        """
+        다음 작업을 꺼냄. timeout 초 안에 없으면 None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, job: IngestJob) -> None:
+        raise NotImplementedError
+
+    def ack(self, job: IngestJob) -> None:
+        """
+        take 로 꺼낸 작업의 처리가 끝남 (성공/실패 무관). ack 전에 워커가 죽으면 큐가 작업을 다시 내줄 수 있음
+        """
+
+    @staticmethod
+    def _new_job(task: IngestTask) -> IngestJob:
+        return IngestJob(
+            id=uuid.uuid4().hex,
+            status="queued",
+            total_documents=len(task.documents),
+            source=task.source,
+            created_at=time.time(),
+        )
+
+
+class InProcessJobQueue(IngestJobQueue):
+    """
+    프로세스 내 큐. 상태는 최근 max_jobs 개만 보관 (오래된 것부터 제거)
+    """
+
+    def __init__(self, *, max_queued: int = 1000, max_jobs: int = 10000):
+        self._queue: "queue.Queue[Tuple[str, IngestTask]]" = queue.Queue(maxsize=max_queued)
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._max_jobs = max_jobs
+        self._lock = threading.Lock()
+
+    def submit(self, task: IngestTask) -> IngestJob:
+        job = self._new_job(task)
+        self.save(job)
+        try:
+            self._queue.put_nowait((job.id, task))
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            raise RateLimited(message="Ingest queue is full", details={"queued": self._queue.qsize()})
+        return replace(job)
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job is not None else None
+
+    def take(self, timeout: float) -> Optional[Tuple[IngestJob, IngestTask]]:
+        try:
+            job_id, task = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        job = self.get(job_id)
+        return (job, task) if job is not None else None
+
+    def save(self, job: IngestJob) -> None:
+        with self._lock:
+            self._jobs[job.id] = replace(job)
+            self._jobs.move_to_end(job.id)
+            while len(self._jobs) > self._max_jobs:
+                self._jobs.popitem(last=False)
+
+
+class RedisJobQueue(IngestJobQueue):
+    """
+    Redis list 를 큐로 사용 -> API 프로세스와 별도 워커 프로세스가 나눠 처리 가능
+    - {prefix}:queue           : job id list (LPUSH / 꺼낼 때는 WATCH + MULTI)
+    - {prefix}:processing      : 워커가 꺼냈지만 아직 ack 안 된 job id
+    - {prefix}:lease:{id}      : 처리 중 표시 (TTL, save 마다 연장). 만료되면 워커가 죽은 것으로 보고 다시 queue 로
+      processing 으로 옮기기와 lease 설정은 한 트랜잭션 -> lease 없는 처리 중 작업이 보이는 순간이 없음
+    - {prefix}:job:{id}        : 작업 상태 JSON (TTL)
+    - {prefix}:payload:{id}    : IngestTask JSON, ack 할 때 삭제
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        *,
+        prefix: str = "rag:ingest",
+        ttl_seconds: int = 86400,
+        max_queued: int = 1000,
+        lease_seconds: int = 600,
+    ):
+        self._r = client
+        self._prefix = prefix
+        self._ttl = ttl_seconds
+        self._max_queued = max_queued
+        self._lease = lease_seconds
+        self._next_recover = 0.0
+
+    def _queue_key(self) -> str:
+        return f"{self._prefix}:queue"
+
+    def _processing_key(self) -> str:
+        return f"{self._prefix}:processing"
+
+    def _lease_key(self, job_id: str) -> str:
+        return f"{self._prefix}:lease:{job_id}"
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self._prefix}:job:{job_id}"
+
+    def _payload_key(self, job_id: str) -> str:
+        return f"{self._prefix}:payload:{job_id}"
+
+    def submit(self, task: IngestTask) -> IngestJob:
+        queued = self._r.llen(self._queue_key())
+        if queued >= self._max_queued:
+            raise RateLimited(message="Ingest queue is full", details={"queued": queued})
+        job = self._new_job(task)
+        pipe = self._r.pipeline()
+        pipe.setex(self._job_key(job.id), self._ttl, json.dumps(asdict(job)))
+        pipe.setex(self._payload_key(job.id), self._ttl, task.to_json())
+        pipe.lpush(self._queue_key(), job.id)
+        pipe.execute()
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        raw = self._r.get(self._job_key(job_id))
+        if not raw:
+            return None
+        return IngestJob(**json.loads(raw))
+
+    def take(self, timeout: float) -> Optional[Tuple[IngestJob, IngestTask]]:
+        self._maybe_recover()
+        deadline = time.monotonic() + timeout
+        while True:
+            job_id = self._claim()
+            if job_id is not None:
+                break
+            left = deadline - time.monotonic()
+            # 대기만 함: 같은 list 의 꼬리를 꼬리로 옮기는 건 내용 변화 없음
+            if left <= 0 or self._r.blmove(self._queue_key(), self._queue_key(), max(1, int(left)), "RIGHT", "RIGHT") is None:
+                return None
+        raw = self._r.get(self._payload_key(job_id))
+        job = self.get(job_id)
+        if job is None or raw is None:
+            # 상태나 payload 가 TTL 로 사라진 작업은 처리할 수 없음
+            self._release(job_id)
+            return None
+        return job, IngestTask.from_json(raw)
+
+    def _claim(self) -> Optional[str]:
+        """
+        queue 꼬리 작업을 processing 으로 옮기고 lease 를 거는 것을 한 트랜잭션으로. 비어 있으면 None
+        """
+        with self._r.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(self._queue_key())
+                    job_id = pipe.lindex(self._queue_key(), -1)
+                    if job_id is None:
+                        pipe.unwatch()
+                        return None
+                    pipe.multi()
+                    pipe.lmove(self._queue_key(), self._processing_key(), "RIGHT", "LEFT")
+                    pipe.setex(self._lease_key(job_id), self._lease, "1")
+                    pipe.execute()
+                    return job_id
+                except redis.WatchError:
+                    continue  # 다른 워커/submit 이 queue 를 바꿈 -> 다시 시도
+
+    def save(self, job: IngestJob) -> None:
+        pipe = self._r.pipeline()
+        pipe.setex(self._job_key(job.id), self._ttl, json.dumps(asdict(job)))
+        if job.status == "running":
+            pipe.setex(self._lease_key(job.id), self._lease, "1")
+        pipe.execute()
+
+    def ack(self, job: IngestJob) -> None:
+        self._release(job.id)
+
+    def _release(self, job_id: str) -> None:
+        pipe = self._r.pipeline()
+        pipe.lrem(self._processing_key(), 1, job_id)
+        pipe.delete(self._lease_key(job_id), self._payload_key(job_id))
+        pipe.execute()
+
+    def _maybe_recover(self) -> None:
+        # lease 만료 확인은 lease 의 절반 주기로만 (take 마다 processing 전체를 읽지 않음)
+        now = time.monotonic()
+        if now < self._next_recover:
+            return
+        self._next_recover = now + self._lease / 2
+        self.recover()
+
+    def recover(self) -> int:
+        """
+        lease 가 만료된 (ack 전에 워커가 죽은) 작업을 진행 상황을 비우고 queue 맨 앞으로 되돌림
+        다시 처리해도 content hash diff 라 결과는 같음
+        """
+        requeued = 0
+        for job_id in self._r.lrange(self._processing_key(), 0, -1):
+            if not self._r.exists(self._lease_key(job_id)) and self._requeue(job_id):
+                requeued += 1
+        return requeued
+
+    def _requeue(self, job_id: str) -> bool:
+        """
+        processing -> queue 이동과 상태 초기화를 한 트랜잭션으로 (중간에 죽어도 작업이 사라지지 않음)
+        그 사이 lease 가 생겼거나 다른 워커가 먼저 되돌렸으면 False
+        """
+        with self._r.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(self._processing_key(), self._lease_key(job_id))
+                    if pipe.exists(self._lease_key(job_id)) or pipe.lpos(self._processing_key(), job_id) is None:
+                        pipe.unwatch()
+                        return False
+                    raw = pipe.get(self._job_key(job_id))
+                    pipe.multi()
+                    pipe.lrem(self._processing_key(), 1, job_id)
+                    if raw:
+                        job = replace(
+                            IngestJob(**json.loads(raw)),
+                            status="queued",
+                            documents_done=0,
+                            skipped=0,
+                            chunk_count=0,
+                            added=0,
+                            removed=0,
+                            unchanged=0,
+                            error=None,
+                            started_at=None,
+                            finished_at=None,
+                        )
+                        pipe.setex(self._job_key(job_id), self._ttl, json.dumps(asdict(job)))
+                    pipe.rpush(self._queue_key(), job_id)
+                    pipe.execute()
+                    return True
+                except redis.WatchError:
+                    continue
+
+
+_MAX_BACKOFF_SECONDS = 30.0
+
+
+class IngestWorkerPool:
+    """
+    큐에서 작업을 꺼내 IngestionService 로 처리하는 daemon 스레드 묶음
+    - 요청 스레드는 enqueue 만 하고 바로 응답 -> 큰 ingest 가 chat 요청 스레드를 점유하지 않음
+    - 문서 하나 끝날 때마다 진행 상황(documents_done, 청크 수)을 저장
+    - source(경로) 작업은 loader 가 문서를 하나씩 읽어옴. file_state 로 변경 없는 파일 skip
+      stream_bytes 이상인 파일은 본문을 올리지 않고 ingest_stream 으로 (블록 단위 decode -> 청크 -> 배치 임베딩)
+    """
+
+    def __init__(
+        self,
+        jobs: IngestJobQueue,
+        ingestion: IngestionService,
+        *,
+        workers: int = 1,
+        poll_seconds: float = 1.0,
+        file_state: Optional[FileStateIndex] = None,
+        stream_bytes: Optional[int] = None,
+    ):
+        self._jobs = jobs
+        self._ingestion = ingestion
+        self._file_state = file_state
+        self._stream_bytes = stream_bytes
+        self._workers = workers
+        self._poll = poll_seconds
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(self._workers):
+            t = threading.Thread(target=self._loop, name=f"ingest-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _loop(self) -> None:
+        # 큐 백엔드 오류(Redis 끊김 등)로 스레드가 죽지 않게: 기록하고 점점 길게 쉬었다가 재시도
+        backoff = self._poll
+        while not self._stop.is_set():
+            try:
+                item = self._jobs.take(self._poll)
+                if item is not None:
+                    job = self.run(*item)
+                    # run 이 끝까지 간 작업만 ack. 상태 저장 중 예외면 ack 하지 않아 lease 만료 후 재처리
+                    self._jobs.ack(job)
+                backoff = self._poll
+            except Exception:  # noqa: BLE001
+                logger.exception("ingest worker error, retrying in %.1fs", backoff)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, _MAX_BACKOFF_SECONDS)
+
+    def run(self, job: IngestJob, task: IngestTask) -> IngestJob:
+        job.status = "running"
+        job.started_at = time.time()
+        self._jobs.save(job)
+        loader = (
+            loader_for(task.source, state=self._file_state, stream_bytes=self._stream_bytes)
+            if task.source
+            else None
+        )
+        documents: Iterable[LoadedDocument] = loader.iter_documents(source=task.source) if loader else task.documents
+        try:
+            for doc in documents:
+                r = self._ingest(doc)
+                job.documents_done += 1
+                job.chunk_count += r.chunk_count
+                job.added += r.added
+                job.removed += r.removed
+                job.unchanged += r.unchanged
+                self._jobs.save(job)
+            if loader is not None:
+                job.total_documents = job.documents_done
+                job.skipped = loader.skipped
+                if self._file_state is not None:
+                    self._file_state.save()
+            job.status = "succeeded"
+        except Exception as e:  # noqa: BLE001 - 실패 원인은 작업 상태로 노출
+            job.status = "failed"
+            job.error = f"{e.__class__.__name__}: {e}"
+        job.finished_at = time.time()
+        self._jobs.save(job)
+        return job
+
+    def _ingest(self, doc: LoadedDocument) -> IngestResult:
+        if isinstance(doc, StreamedDocument):
+            return self._ingestion.ingest_stream(source_id=doc.id, stream=doc.open(), metadata=dict(doc.metadata))
+        return self._ingestion.ingest_text(source_id=doc.id, text=doc.text, metadata=dict(doc.metadata))
+
+
+class IngestJobService:
+    def __init__(self, jobs: IngestJobQueue, *, loader_root: Optional[str] = None):
+        self._jobs = jobs
+        self._loader_root = loader_root
+
+    def submit_text(self, *, source_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> IngestJob:
+        return self._jobs.submit(IngestTask(documents=[Document(id=source_id, text=text, metadata=metadata or {})]))
+
+    def submit(self, documents: List[Document]) -> IngestJob:
+        return self._jobs.submit(IngestTask(documents=documents))
+
+    def submit_path(self, source: str) -> IngestJob:
+        """
+        loader_root 아래 파일/디렉터리/JSONL 을 ingest. root 밖 경로는 거부
+        """
+        return self._jobs.submit(IngestTask(documents=[], source=self._resolve(source)))
+
+    def _resolve(self, source: str) -> str:
+        if not self._loader_root:
+            raise BadRequest(message="File ingestion is disabled (RAG_LOADER_ROOT is not set)")
+        root = os.path.realpath(self._loader_root)
+        path = os.path.realpath(os.path.join(root, source))
+        if os.path.commonpath([root, path]) != root:
+            raise BadRequest(message="Source is outside the loader root", details={"source": source})
+        if not os.path.exists(path):
+            raise BadRequest(message="Source not found", details={"source": source})
+        return path
+
+    def get(self, job_id: str) -> IngestJob:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise NotFound(message="Ingest job not found", details={"job_id": job_id})
+        return job
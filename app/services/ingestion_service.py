@@ -1,22 +1,146 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set
 
-from app.rag.types import Document
+from app.rag.types import Chunk, Document, IngestResult
 from app.rag.chunkers.base import Chunker
+from app.rag.chunkers.streaming_chunker import StreamingChunker, TextSource
 from app.rag.embedders.base import Embedder
 from app.rag.vectorstores.base import VectorStore
 
 
+def canonical_metadata(metadata: Optional[Mapping[str, Any]]) -> bytes:
+    """
+    metadata 의 순서 무관 직렬화 (빈 metadata 는 b"")
+    """
+    if not metadata:
+        return b""
+    return json.dumps(dict(metadata), sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def content_hash(text: str, metadata: bytes = b"") -> str:
+    h = hashlib.blake2b(text.encode("utf-8"), digest_size=8)
+    if metadata:
+        h.update(b"\x00" + metadata)
+    return h.hexdigest()
+
+
+def iter_content_addressed(source_id: str, chunks: Iterable[Chunk]) -> Iterator[Chunk]:
+    """
+    청크 id 를 위치가 아닌 내용 해시로 부여: {source_id}::{hash}[:n]
+    문서 중간에 줄이 추가돼도 나머지 청크 id 는 그대로라서 재임베딩 대상에서 빠짐
+    hash 에는 metadata 도 포함 -> 텍스트가 같아도 metadata 가 바뀌면 새 청크로 교체됨
+    같은 내용이 여러 번 나오면 :1, :2 ... 로 구분
+    중복 판정 때문에 청크당 해시 하나(int)를 기억함 -> 메모리는 O(청크 수), 텍스트는 들고 있지 않음
+    """
+    seen: Set[int] = set()
+    # 두 번 이상 나온 해시만 횟수 기록 (대부분의 문서는 비어 있음)
+    repeats: Dict[int, int] = {}
+    # 한 문서의 청크는 같은 metadata 매핑을 공유하므로 직렬화는 매핑이 바뀔 때만
+    last_md: Any = None
+    md_bytes = b""
+    for c in chunks:
+        if c.metadata is not last_md:
+            last_md, md_bytes = c.metadata, canonical_metadata(c.metadata)
+        h = content_hash(c.text, md_bytes)
+        key = int(h, 16)
+        if key in seen:
+            n = repeats.get(key, 1)
+            repeats[key] = n + 1
+        else:
+            seen.add(key)
+            n = 0
+        cid = f"{source_id}::{h}" if n == 0 else f"{source_id}::{h}:{n}"
+        yield Chunk(id=cid, doc_id=c.doc_id, text=c.text, metadata=c.metadata)
+
+
+def content_addressed(source_id: str, chunks: Iterable[Chunk]) -> List[Chunk]:
+    return list(iter_content_addressed(source_id, chunks))
+
+
 class IngestionService:
-    def __init__(self, chunker: Chunker, embedder: Embedder, vectorstore: VectorStore):
+    def __init__(
+        self,
+        chunker: Chunker,
+        embedder: Embedder,
+        vectorstore: VectorStore,
+        *,
+        stream_chunker: Optional[StreamingChunker] = None,
+        embed_batch_size: int = 256,
+    ):
         self._chunker = chunker
         self._embedder = embedder
         self._vs = vectorstore
+        self._stream_chunker = stream_chunker or StreamingChunker()
+        self._embed_batch_size = embed_batch_size
 
-    def ingest_text(self, *, source_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> int:
+    def ingest_text(self, *, source_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> IngestResult:
+        """
+        재수집 시 바뀐/새 청크만 임베딩하고, 사라진 청크만 삭제
+        """
         doc = Document(id=source_id, text=text, metadata=metadata or {})
-        chunks = self._chunker.chunk(doc)
-        vectors = self._embedder.embed_chunks(chunks)
-        self._vs.upsert(source_id=source_id, chunks=chunks, vectors=vectors)
-        return len(chunks)
\ No newline at end of file
+        chunks = content_addressed(source_id, self._chunker.chunk(doc))
+
+        existing = self._vs.chunk_ids(source_id=source_id)
+        new_ids = {c.id for c in chunks}
+        added = [c for c in chunks if c.id not in existing]
+        removed = existing - new_ids
+
+        if added or removed:
+            vectors = self._embedder.embed_chunks(added) if added else []
+            self._vs.apply_delta(source_id=source_id, chunks=added, vectors=vectors, remove_ids=removed)
+
+        return IngestResult(
+            doc_id=source_id,
+            chunk_count=len(chunks),
+            added=len(added),
+            removed=len(removed),
+            unchanged=len(chunks) - len(added),
+        )
+
+    def ingest_stream(
+        self,
+        *,
+        source_id: str,
+        stream: TextSource,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> IngestResult:
+        """
+        큰 파일/스트림용: 청크를 embed_batch_size 개씩 임베딩해서 바로 반영
+        전체 텍스트나 청크 목록은 메모리에 올리지 않음
+        남는 건 기존 청크 id 집합(삭제 대상 계산)과 청크당 해시 하나(중복 번호) -> O(size + 블록 + 청크 수)
+        옛 청크 삭제는 마지막 배치와 같은 apply_delta 로 -> 마지막 새 청크가 들어가는 순간 옛 청크가 같이 빠짐 (끝난 뒤 따로 지우는 틈 없음)
+        """
+        # 스트림에 다시 나온 id 를 지워 가면 끝에 남은 것이 삭제 대상 (새 id 집합을 따로 두지 않음)
+        remaining = set(self._vs.chunk_ids(source_id=source_id))
+        total = 0
+        added = 0
+        batch: List[Chunk] = []
+
+        chunks = self._stream_chunker.iter_stream(stream, doc_id=source_id, metadata=metadata)
+        for c in iter_content_addressed(source_id, chunks):
+            total += 1
+            if c.id in remaining:
+                remaining.discard(c.id)
+                continue
+            batch.append(c)
+            if len(batch) >= self._embed_batch_size:
+                added += self._flush(source_id, batch)
+                batch = []
+        if batch or remaining:
+            added += self._flush(source_id, batch, remove_ids=remaining)
+
+        return IngestResult(
+            doc_id=source_id,
+            chunk_count=total,
+            added=added,
+            removed=len(remaining),
+            unchanged=total - added,
+        )
+
+    def _flush(self, source_id: str, batch: List[Chunk], remove_ids: Optional[Set[str]] = None) -> int:
+        vectors = self._embedder.embed_chunks(batch) if batch else []
+        self._vs.apply_delta(source_id=source_id, chunks=batch, vectors=vectors, remove_ids=remove_ids or set())
+        return len(batch)
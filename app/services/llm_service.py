@@ -1,7 +1,12 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterator, List, Optional, Tuple
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional, Tuple
 
+from app.cache.response_cache import ResponseCache, response_key
+from app.cache.semantic_cache import SemanticCache
+from app.cache.single_flight import SingleFlight
 from app.providers.llm_provider import LLMProvider, Message
 from app.services.prompt_service import PromptService
 
@@ -11,10 +16,55 @@ class _SafeDict(dict):
         return "{" + key + "}"
 
 
+def _deterministic(llm_config: Mapping[str, Any]) -> bool:
+    # temperature 를 0 으로 명시한 요청만 (provider 기본값은 샘플링)
+    t = llm_config.get("temperature")
+    return isinstance(t, (int, float)) and t == 0
+
+
+def _replay_tokens(reply: str, max_chars: int = 64) -> Iterator[str]:
+    """
+    캐시된 응답을 스트림 토큰처럼 나눔: 줄 단위, 긴 줄은 max_chars 씩
+    """
+    for line in reply.splitlines(keepends=True):
+        for i in range(0, len(line), max_chars):
+            yield line[i:i + max_chars]
+
+
+def _field(obj: Any, name: str) -> Any:
+    # PromptService.resolve 는 캐시 hit 이면 dict, miss 면 ORM 객체를 돌려줌
+    if isinstance(obj, Mapping):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+@dataclass
+class PreparedChat:
+    """
+    provider 호출 직전 상태 (메시지 + 프롬프트 정의의 llm_config)
+    """
+    messages: List[Message]
+    tag: Optional[str]
+    version: Optional[int]
+    llm_config: Dict[str, Any] = field(default_factory=dict)
+    cache: bool = True  # False 면 응답 캐시를 읽지도 쓰지도 않음
+
+
 class LLMService:
-    def __init__(self, provider: LLMProvider, prompt_service: PromptService):
+    def __init__(
+        self,
+        provider: LLMProvider,
+        prompt_service: PromptService,
+        *,
+        response_cache: Optional[ResponseCache] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+    ):
         self._provider = provider
         self._prompts = prompt_service
+        self._responses = response_cache
+        self._semantic = semantic_cache
+        self._flights = single_flight
 
     def provider_name(self) -> str:
         return self._provider.name()
@@ -39,7 +89,7 @@ class LLMService:
         version: Optional[int],
         system_override: Optional[str],
         vars: Optional[Dict[str, Any]],
-    ) -> Tuple[List[Message], Optional[str], Optional[int]]:
+    ) -> PreparedChat:
 
         if tag is not None:
             used_tag = tag
@@ -58,9 +108,9 @@ class LLMService:
                 else "\n\n".join(
                     p
                     for p in [
-                        definition.persona,
-                        definition.system_guardrails,
-                        definition.output_guideline,
+                        _field(definition, "persona"),
+                        _field(definition, "system_guardrails"),
+                        _field(definition, "output_guideline"),
                     ]
                     if p
                 )
@@ -69,41 +119,157 @@ class LLMService:
                 messages.append({"role": "system", "content": system_text})
 
             for s in few_shots:
-                messages.append({"role": "user", "content": s.input_text})
-                messages.append({"role": "assistant", "content": s.output_text})
+                messages.append({"role": "user", "content": _field(s, "input_text")})
+                messages.append({"role": "assistant", "content": _field(s, "output_text")})
 
             user_text = self._apply_vars(prompt, prompt, vars)
             messages.append({"role": "user", "content": user_text})
 
-            return messages, used_tag, used_version
+            return PreparedChat(
+                messages=messages,
+                tag=used_tag,
+                version=used_version,
+                llm_config=dict(_field(definition, "llm_config") or {}),
+            )
 
         messages: List[Message] = []
         if system_override:
             messages.append({"role": "system", "content": system_override})
         messages.append({"role": "user", "content": prompt})
-        return messages, None, None
+        return PreparedChat(messages=messages, tag=None, version=None)
 
-    def chat(
+    def prepare(
         self,
         prompt: str,
         tag: Optional[str] = None,
         version: Optional[int] = None,
         system: Optional[str] = None,
         vars: Optional[Dict[str, Any]] = None,
-    ) -> Tuple[str, Optional[str], Optional[int]]:
-
-        messages, used_tag, used_version = self._build_messages(
+        cache: bool = True,
+    ) -> PreparedChat:
+        prepared = self._build_messages(
             prompt=prompt,
             tag=tag,
             version=version,
             system_override=system,
             vars=vars,
         )
+        # 프롬프트 정의 단위 opt-out: llm_config 에 "cache": false
+        prepared.cache = cache and prepared.llm_config.get("cache", True) is not False
+        return prepared
+
+    def _caching(self, prepared: PreparedChat) -> bool:
+        # 샘플링 응답을 캐시하면 같은 질문에 항상 같은 답 -> temperature=0 인 요청만 저장/조회
+        if not prepared.cache or not _deterministic(prepared.llm_config):
+            return False
+        return self._responses is not None or self._semantic is not None
+
+    def _coalescing(self, prepared: PreparedChat) -> bool:
+        # cache=false 는 "새 응답" 요청이므로 진행 중인 같은 호출에도 합치지 않음
+        return prepared.cache and self._flights is not None
+
+    def _key(self, messages: List[Message], prepared: PreparedChat) -> str:
+        return response_key(
+            provider=self._provider.name(),
+            model=self._provider.model_id,
+            messages=messages,
+            llm_config=prepared.llm_config,
+        )
+
+    def _semantic_args(self, prepared: PreparedChat) -> Dict[str, Any]:
+        # 마지막 user 메시지만 임베딩. 나머지 메시지/설정이 같은 항목 중에서만 찾도록 context 로 묶음
+        return dict(
+            text=prepared.messages[-1]["content"],
+            tag=prepared.tag,
+            version=prepared.version,
+            context=self._key(prepared.messages[:-1], prepared),
+        )
+
+    def _cache_get(self, prepared: PreparedChat) -> Optional[str]:
+        # exact-match -> semantic 순
+        if self._responses is not None:
+            reply = self._responses.get(self._key(prepared.messages, prepared))
+            if reply is not None:
+                return reply
+        if self._semantic is not None:
+            return self._semantic.lookup(**self._semantic_args(prepared))
+        return None
+
+    def _cache_set(self, prepared: PreparedChat, reply: str) -> None:
+        if self._responses is not None:
+            self._responses.set(self._key(prepared.messages, prepared), reply)
+        if self._semantic is not None:
+            args = self._semantic_args(prepared)
+            self._semantic.add(args.pop("text"), reply, **args)
+
+    async def _acache_get(self, prepared: PreparedChat) -> Optional[str]:
+        if self._responses is not None:
+            reply = await self._responses.aget(self._key(prepared.messages, prepared))
+            if reply is not None:
+                return reply
+        if self._semantic is not None:
+            # 임베딩 + 벡터 검색은 CPU/blocking -> 이벤트 루프 밖에서
+            return await asyncio.to_thread(lambda: self._semantic.lookup(**self._semantic_args(prepared)))
+        return None
+
+    async def _acache_set(self, prepared: PreparedChat, reply: str) -> None:
+        if self._responses is not None:
+            await self._responses.aset(self._key(prepared.messages, prepared), reply)
+        if self._semantic is not None:
+            args = self._semantic_args(prepared)
+            await asyncio.to_thread(self._semantic.add, args.pop("text"), reply, **args)
+
+    def complete(self, prepared: PreparedChat) -> str:
+        caching = self._caching(prepared)
+        if caching:
+            reply = self._cache_get(prepared)
+            if reply is not None:
+                return reply
+        if self._coalescing(prepared):
+            return self._flights.do(self._key(prepared.messages, prepared), lambda: self._complete(prepared, caching))
+        return self._complete(prepared, caching)
 
-        print("FINAL_MESSAGES =>", messages)
+    def _complete(self, prepared: PreparedChat, caching: bool) -> str:
+        reply = self._provider.chat_messages(prepared.messages, llm_config=prepared.llm_config)
+        if caching:
+            self._cache_set(prepared, reply)
+        return reply
 
-        reply = self._provider.chat_messages(messages)
-        return reply, used_tag, used_version
+    def stream(self, prepared: PreparedChat) -> Iterator[str]:
+        caching = self._caching(prepared)
+        if caching:
+            reply = self._cache_get(prepared)
+            if reply is not None:
+                return _replay_tokens(reply)
+        if self._coalescing(prepared):
+            return self._flights.stream(self._key(prepared.messages, prepared), lambda: self._stream(prepared, caching))
+        return self._stream(prepared, caching)
+
+    def _stream(self, prepared: PreparedChat, caching: bool) -> Iterator[str]:
+        tokens = self._provider.stream_messages(prepared.messages, llm_config=prepared.llm_config)
+        return self._record(prepared, tokens) if caching else tokens
+
+    def _record(self, prepared: PreparedChat, tokens: Iterator[str]) -> Iterator[str]:
+        # 끝까지 정상으로 받은 응답만 저장 (중간 오류/클라이언트 끊김은 저장 X)
+        parts: List[str] = []
+        for t in tokens:
+            parts.append(t)
+            yield t
+        self._cache_set(prepared, "".join(parts))
+
+    def chat(
+        self,
+        prompt: str,
+        tag: Optional[str] = None,
+        version: Optional[int] = None,
+        system: Optional[str] = None,
+        vars: Optional[Dict[str, Any]] = None,
+        cache: bool = True,
+    ) -> Tuple[str, Optional[str], Optional[int]]:
+
+        prepared = self.prepare(prompt, tag=tag, version=version, system=system, vars=vars, cache=cache)
+        reply = self.complete(prepared)
+        return reply, prepared.tag, prepared.version
 
     def stream_tokens(
         self,
@@ -112,15 +278,91 @@ class LLMService:
         version: Optional[int] = None,
         system: Optional[str] = None,
         vars: Optional[Dict[str, Any]] = None,
+        cache: bool = True,
     ) -> Tuple[Iterator[str], Optional[str], Optional[int]]:
 
-        messages, used_tag, used_version = self._build_messages(
-            prompt=prompt,
-            tag=tag,
-            version=version,
-            system_override=system,
-            vars=vars,
-        )
+        prepared = self.prepare(prompt, tag=tag, version=version, system=system, vars=vars, cache=cache)
+        return self.stream(prepared), prepared.tag, prepared.version
+
+    async def aprepare(
+        self,
+        prompt: str,
+        tag: Optional[str] = None,
+        version: Optional[int] = None,
+        system: Optional[str] = None,
+        vars: Optional[Dict[str, Any]] = None,
+        cache: bool = True,
+    ) -> PreparedChat:
+        if tag is None:
+            return self.prepare(prompt, system=system, vars=vars, cache=cache)
+        # 프롬프트 정의 조회는 blocking (Redis/DB) -> 이벤트 루프 밖에서
+        return await asyncio.to_thread(self.prepare, prompt, tag, version, system, vars, cache)
+
+    async def acomplete(self, prepared: PreparedChat) -> str:
+        caching = self._caching(prepared)
+        if caching:
+            reply = await self._acache_get(prepared)
+            if reply is not None:
+                return reply
+        if self._coalescing(prepared):
+            return await self._flights.ado(self._key(prepared.messages, prepared), lambda: self._acomplete(prepared, caching))
+        return await self._acomplete(prepared, caching)
+
+    async def _acomplete(self, prepared: PreparedChat, caching: bool) -> str:
+        reply = await self._provider.achat_messages(prepared.messages, llm_config=prepared.llm_config)
+        if caching:
+            await self._acache_set(prepared, reply)
+        return reply
 
-        tokens = self._provider.stream_messages(messages)
-        return tokens, used_tag, used_version
\ No newline at end of file
+    def astream(self, prepared: PreparedChat) -> AsyncIterator[str]:
+        caching = self._caching(prepared)
+        if not caching and not self._coalescing(prepared):
+            return self._provider.astream_messages(prepared.messages, llm_config=prepared.llm_config)
+        return self._astream_cached(prepared, caching)
+
+    async def _astream_cached(self, prepared: PreparedChat, caching: bool) -> AsyncIterator[str]:
+        if caching:
+            reply = await self._acache_get(prepared)
+            if reply is not None:
+                for t in _replay_tokens(reply):
+                    yield t
+                return
+        if self._coalescing(prepared):
+            tokens = self._flights.astream(self._key(prepared.messages, prepared), lambda: self._astream(prepared, caching))
+        else:
+            tokens = self._astream(prepared, caching)
+        async for t in tokens:
+            yield t
+
+    async def _astream(self, prepared: PreparedChat, caching: bool) -> AsyncIterator[str]:
+        parts: List[str] = []
+        async for t in self._provider.astream_messages(prepared.messages, llm_config=prepared.llm_config):
+            parts.append(t)
+            yield t
+        if caching:
+            await self._acache_set(prepared, "".join(parts))
+
+    async def achat(
+        self,
+        prompt: str,
+        tag: Optional[str] = None,
+        version: Optional[int] = None,
+        system: Optional[str] = None,
+        vars: Optional[Dict[str, Any]] = None,
+        cache: bool = True,
+    ) -> Tuple[str, Optional[str], Optional[int]]:
+        prepared = await self.aprepare(prompt, tag=tag, version=version, system=system, vars=vars, cache=cache)
+        reply = await self.acomplete(prepared)
+        return reply, prepared.tag, prepared.version
+
+    async def astream_tokens(
+        self,
+        prompt: str,
+        tag: Optional[str] = None,
+        version: Optional[int] = None,
+        system: Optional[str] = None,
+        vars: Optional[Dict[str, Any]] = None,
+        cache: bool = True,
+    ) -> Tuple[AsyncIterator[str], Optional[str], Optional[int]]:
+        prepared = await self.aprepare(prompt, tag=tag, version=version, system=system, vars=vars, cache=cache)
+        return self.astream(prepared), prepared.tag, prepared.version
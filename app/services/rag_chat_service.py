@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from app.rag.context_packer import PackedContext, context_budget, estimate_tokens, pack_context
+from app.rag.types import Diversity, ScoredChunk
+from app.services.llm_service import LLMService, PreparedChat
+from app.services.rag_service import RagService
+
+DEFAULT_CONTEXT_TEMPLATE = "다음 참고 문서를 근거로 답하세요.\n\n{context}\n\n질문: {question}"
+
+
+@dataclass(frozen=True)
+class RagChatPlan:
+    prepared: PreparedChat
+    context: PackedContext
+    prompt_tokens: int  # 컨텍스트 포함 전체 입력 추정 토큰
+
+
+@dataclass(frozen=True)
+class RagChatResult:
+    reply: str
+    plan: RagChatPlan
+
+
+class RagChatService:
+    """
+    retrieve -> 토큰 budget 안에 컨텍스트 packing -> provider 호출
+    - budget = llm_config.max_context_tokens - llm_config.max_tokens - (시스템/few-shot/질문 토큰)
+    - 검색은 budget 에 다 안 들어갈 만큼 넉넉히 (top_k) 가져오고, 점수 순으로 채우면서 중복 제거 / 마지막 청크 자르기
+    - 컨텍스트는 마지막 user 메시지에 template 으로 합침
+    """
+
+    def __init__(
+        self,
+        llm: LLMService,
+        rag: RagService,
+        *,
+        default_context_tokens: int = 8192,
+        default_max_tokens: int = 1024,
+        min_chunk_tokens: int = 64,
+        template: str = DEFAULT_CONTEXT_TEMPLATE,
+    ):
+        self._llm = llm
+        self._rag = rag
+        self._default_context_tokens = default_context_tokens
+        self._default_max_tokens = default_max_tokens
+        self._min_chunk_tokens = min_chunk_tokens
+        self._template = template
+
+    def provider_name(self) -> str:
+        return self._llm.provider_name()
+
+    def plan(
+        self,
+        prompt: str,
+        *,
+        tag: Optional[str] = None,
+        version: Optional[int] = None,
+        system: Optional[str] = None,
+        vars: Optional[Dict[str, Any]] = None,
+        query: Optional[str] = None,
+        top_k: int = 8,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+        diversity: Optional[Diversity] = None,
+        max_context_tokens: Optional[int] = None,
+        cache: bool = True,
+    ) -> RagChatPlan:
+        prepared = self._llm.prepare(prompt, tag=tag, version=version, system=system, vars=vars, cache=cache)
+        question = prepared.messages[-1]["content"]
+        # 템플릿 고정 문구까지 포함해서 컨텍스트 외 토큰을 셈
+        base_tokens = sum(estimate_tokens(m["content"]) for m in prepared.messages[:-1])
+        base_tokens += estimate_tokens(self._template.format(context="", question=question))
+        budget = context_budget(
+            prepared.llm_config,
+            prompt_tokens=base_tokens,
+            default_context_tokens=self._default_context_tokens,
+            default_max_tokens=self._default_max_tokens,
+            cap=max_context_tokens,
+        )
+
+        matches: List[ScoredChunk] = []
+        if budget > 0:
+            matches = self._rag.search(
+                query=query or prompt,
+                top_k=top_k,
+                filters=filters,
+                score_threshold=score_threshold,
+                diversity=diversity,
+            ).matches
+        context = pack_context(matches, budget, min_chunk_tokens=self._min_chunk_tokens)
+
+        messages = list(prepared.messages)
+        if context.chunks:
+            messages[-1] = {"role": "user", "content": self._template.format(context=context.text, question=question)}
+        return RagChatPlan(
+            prepared=replace(prepared, messages=messages),
+            context=context,
+            prompt_tokens=sum(estimate_tokens(m["content"]) for m in messages),
+        )
+
+    def chat(self, prompt: str, **kwargs: Any) -> RagChatResult:
+        plan = self.plan(prompt, **kwargs)
+        return RagChatResult(reply=self._llm.complete(plan.prepared), plan=plan)
+
+    def stream(self, prompt: str, **kwargs: Any) -> Tuple[Iterator[str], RagChatPlan]:
+        plan = self.plan(prompt, **kwargs)
+        return self._llm.stream(plan.prepared), plan
+
+    async def achat(self, prompt: str, **kwargs: Any) -> RagChatResult:
+        # 검색/packing 은 CPU + blocking 조회라 스레드에서, provider 호출만 이벤트 루프에서 기다림
+        plan = await asyncio.to_thread(self.plan, prompt, **kwargs)
+        return RagChatResult(reply=await self._llm.acomplete(plan.prepared), plan=plan)
+
+    async def astream(self, prompt: str, **kwargs: Any) -> Tuple[AsyncIterator[str], RagChatPlan]:
+        plan = await asyncio.to_thread(self.plan, prompt, **kwargs)
+        return self._llm.astream(plan.prepared), plan
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
-from app.services.retrieval_service import RetrievalService
+from app.rag.retrievers.base import Retriever
+from app.rag.types import Diversity, RetrieveQuery, RetrieveResult
 
 
 class RagService:
@@ -11,7 +12,7 @@ class RagService:
     - retrieve 까지만 책임 (LLM 합성/프롬프트는 상위 LLMService에서)
     """
 
-    def __init__(self, retrieval: RetrievalService):
+    def __init__(self, retrieval: Retriever):
         self._retrieval = retrieval
 
     def search(
@@ -21,10 +22,15 @@ class RagService:
         top_k: int = 5,
         filters: Optional[Dict[str, Any]] = None,
         score_threshold: Optional[float] = None,
+        diversity: Optional[Diversity] = None,
     ):
         return self._retrieval.retrieve(
             query=query,
             top_k=top_k,
             filters=filters,
             score_threshold=score_threshold,
-        )
\ No newline at end of file
+            diversity=diversity,
+        )
+
+    def search_batch(self, queries: Sequence[RetrieveQuery]) -> List[RetrieveResult]:
+        return self._retrieval.retrieve_batch(queries)
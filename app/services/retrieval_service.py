@@ -1,12 +1,16 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
 from app.rag.embedders.base import Embedder
+from app.rag.retrievers.base import Retriever
+from app.rag.retrievers.mmr import fetch_size, rerank
 from app.rag.vectorstores.base import VectorStore
-from app.rag.types import RetrieveResult, ScoredChunk
+from app.rag.types import Diversity, RetrieveQuery, RetrieveResult, ScoredChunk
 
 
-class RetrievalService:
+class RetrievalService(Retriever):
     def __init__(self, embedder: Embedder, store: VectorStore):
         self._embedder = embedder
         self._store = store
@@ -18,12 +22,64 @@ class RetrievalService:
         top_k: int = 5,
         filters: Optional[Dict[str, Any]] = None,
         score_threshold: Optional[float] = None,
+        diversity: Optional[Diversity] = None,
     ) -> RetrieveResult:
         qv = self._embedder.embed_query(query)
-        matches: list[ScoredChunk] = self._store.similarity_search(
-            query_vector=qv,
-            top_k=top_k,
-            filters=filters,
-            score_threshold=score_threshold,
-        )
-        return RetrieveResult(query=query, matches=matches, used_top_k=top_k, score_threshold=score_threshold)
\ No newline at end of file
+        if diversity is None:
+            matches: list[ScoredChunk] = self._store.similarity_search(
+                query_vector=qv,
+                top_k=top_k,
+                filters=filters,
+                score_threshold=score_threshold,
+            )
+            return RetrieveResult(query=query, matches=matches, used_top_k=top_k, score_threshold=score_threshold)
+
+        fetch_k = fetch_size(top_k, diversity)
+        if diversity.needs_vectors:
+            matches, vectors = self._store.similarity_search_with_vectors(
+                query_vector=qv, top_k=fetch_k, filters=filters, score_threshold=score_threshold
+            )
+        else:
+            matches = self._store.similarity_search(
+                query_vector=qv, top_k=fetch_k, filters=filters, score_threshold=score_threshold
+            )
+            vectors = None
+        matches = rerank(matches, top_k=top_k, diversity=diversity, embedder=self._embedder, vectors=vectors)
+        return RetrieveResult(query=query, matches=matches, used_top_k=top_k, score_threshold=score_threshold)
+
+    def retrieve_batch(self, queries: Sequence[RetrieveQuery]) -> List[RetrieveResult]:
+        """
+        쿼리 전체를 embed_texts 한 번으로 임베딩하고, 같은 filters 끼리 묶어
+        스토어 similarity_search_batch (행렬-행렬 곱 한 번) 로 검색
+        묶음 안에서는 가장 큰 top_k / 가장 낮은 threshold 로 찾은 뒤 쿼리별로 자름
+        """
+        if not queries:
+            return []
+        qvs = self._embedder.embed_texts([q.query for q in queries])
+
+        groups: Dict[str, List[int]] = {}
+        for i, q in enumerate(queries):
+            key = json.dumps(q.filters, sort_keys=True, default=str) if q.filters else ""
+            groups.setdefault(key, []).append(i)
+
+        # 쿼리 순서는 묶음과 다르므로 인덱스로 모았다가 원래 순서로
+        out: Dict[int, RetrieveResult] = {}
+        for idx in groups.values():
+            group = [queries[i] for i in idx]
+            thresholds = [q.score_threshold for q in group]
+            batches = self._store.similarity_search_batch(
+                query_vectors=qvs[idx],
+                top_k=max(q.top_k for q in group),
+                filters=group[0].filters,
+                score_threshold=None if None in thresholds else min(thresholds),
+            )
+            for i, q, matches in zip(idx, group, batches):
+                if q.score_threshold is not None:
+                    matches = [m for m in matches if m.score >= q.score_threshold]
+                out[i] = RetrieveResult(
+                    query=q.query,
+                    matches=matches[:q.top_k],
+                    used_top_k=q.top_k,
+                    score_threshold=q.score_threshold,
+                )
+        return [out[i] for i in range(len(queries))]